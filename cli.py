@@ -0,0 +1,333 @@
+"""
+CLI - Comandos de línea de órdenes del extractor
+Uso: python cli.py <comando> [opciones]   (python cli.py -h para ver la lista)
+"""
+
+import argparse
+import json
+import sys
+import time
+
+def comando_rastrear(args):
+    """Rastrea índices completos con el motor asyncio y guarda las semanas en JSON Lines."""
+    import asyncio
+    from utils.rastreo import MotorRastreo
+
+    ejecutor = None
+    if args.procesos:
+        from utils.extraccion_paralela import obtener_pool
+        ejecutor = obtener_pool(args.procesos)
+
+    with open(args.salida, 'w', encoding='utf-8') as salida:
+        def al_extraer(url, datos):
+            salida.write(json.dumps({'url': url, 'datos': datos}, ensure_ascii=False) + '\n')
+
+        motor = MotorRastreo(
+            concurrencia=args.concurrencia,
+            por_host=args.por_host,
+            cortesia=args.cortesia,
+            ejecutor=ejecutor,
+            al_extraer=al_extraer
+        )
+        motor.sembrar(args.urls)
+
+        inicio = time.monotonic()
+        asyncio.run(motor.ejecutar())
+
+    print("\n" + "="*60)
+    print(f"✅ Semanas extraídas: {len(motor.resultados)} en {time.monotonic() - inicio:.1f} s")
+    print(f"📁 Guardadas en: {args.salida}")
+    if motor.errores:
+        print(f"❌ Errores ({len(motor.errores)}):")
+        for url, error in motor.errores.items():
+            print(f"  • {url}: {error}")
+    print("="*60)
+    return 1 if motor.errores and not motor.resultados else 0
+
+def comando_descubrir(args):
+    """Recorre la biblioteca completa con puntos de control y escribe el manifiesto."""
+    import asyncio
+    from utils.descubrimiento import Descubrimiento, escribir_json_atomico, url_biblioteca
+
+    raices = args.raiz or [url_biblioteca(idioma) for idioma in args.idioma]
+    descubrimiento = Descubrimiento(
+        raices,
+        ruta_checkpoint=args.checkpoint,
+        extraer_semanas=args.extraer,
+        concurrencia=args.concurrencia,
+        cortesia=args.cortesia
+    )
+
+    try:
+        manifiesto = asyncio.run(descubrimiento.ejecutar(reanudar=not args.desde_cero))
+    except KeyboardInterrupt:
+        print(f"\n⏸️ Interrumpido. Punto de control guardado en {args.checkpoint}")
+        return 130
+
+    escribir_json_atomico(args.manifiesto, manifiesto)
+
+    print("\n" + "="*60)
+    print(f"✅ Cuadernos: {manifiesto['total_cuadernos']}, semanas: {manifiesto['total_semanas']}")
+    print(f"📁 Manifiesto: {args.manifiesto}")
+    errores = descubrimiento.motor.errores
+    if errores:
+        print(f"❌ Errores ({len(errores)}), se reintentarán en la próxima ejecución:")
+        for url, error in errores.items():
+            print(f"  • {url}: {error}")
+    print("="*60)
+    return 0
+
+def comando_comparar_manifiestos(args):
+    """Muestra qué cambió entre dos manifiestos."""
+    from utils.descubrimiento import comparar_manifiestos
+
+    with open(args.anterior, encoding='utf-8') as f:
+        anterior = json.load(f)
+    with open(args.actual, encoding='utf-8') as f:
+        actual = json.load(f)
+
+    diferencias = comparar_manifiestos(anterior, actual)
+    print(json.dumps(diferencias, ensure_ascii=False, indent=2))
+    return 1 if any(diferencias.values()) else 0
+
+def comando_instantanea(args):
+    """Rastrea los índices y guarda una instantánea para el arranque en caliente."""
+    import asyncio
+    from utils import jw_scraper
+    from utils.almacen import AlmacenSemanas, generar_id_semana
+    from utils.instantanea import exportar_instantanea
+    from utils.proteccion import RespaldoLRU
+    from utils.rastreo import MotorRastreo
+
+    almacen = AlmacenSemanas()
+    respaldo = RespaldoLRU(tamano=1_000_000)
+
+    def al_indice(url, enlaces):
+        respaldo.guardar(('indice', url), enlaces)
+
+    def al_extraer(url, datos):
+        respaldo.guardar(('semana', url), datos)
+        almacen.guardar(generar_id_semana(datos['fecha'], datos.get('fecha_inicio')), datos, url)
+
+    motor = MotorRastreo(
+        concurrencia=args.concurrencia,
+        cortesia=args.cortesia,
+        al_indice=al_indice,
+        al_extraer=al_extraer
+    )
+    motor.sembrar(args.urls)
+    asyncio.run(motor.ejecutar())
+
+    resumen = exportar_instantanea(args.salida, almacen, respaldo, jw_scraper.VERSION_EXTRACTOR)
+    print("\n" + "="*60)
+    print(f"✅ Instantánea: {resumen['semanas']} semanas, {resumen['respaldo']} resultados, "
+          f"{resumen['bytes'] / 1024:.1f} KB")
+    print(f"📁 Guardada en: {args.salida}")
+    for url, error in motor.errores.items():
+        print(f"  ❌ {url}: {error}")
+    print("="*60)
+    return 1 if motor.errores and not motor.resultados else 0
+
+def comando_preparar_recursos(args):
+    """Copia localmente los scripts de terceros que usan las plantillas."""
+    from utils.template_generator import preparar_recursos
+
+    ruta = preparar_recursos()
+    print(f"✅ Guardado: {ruta}")
+    return 0
+
+def comando_resistencia(args):
+    """Prueba de memoria: miles de ciclos sobre el archivo de respuestas; sale con 1 si crece demasiado."""
+    from utils.registro import log
+    from utils.resistencia import prueba_resistencia
+
+    log.setLevel('WARNING')  # Un registro por etapa y ciclo falsearía la medida
+
+    def al_muestrear(hechos, rss):
+        print(f"  {hechos:>7} ciclos  RSS {rss:.1f} MB")
+
+    print(f"🧪 {args.ciclos} ciclos sobre {args.archivo} (presupuesto {args.presupuesto_mb} MB)...")
+    resumen = prueba_resistencia(
+        args.archivo, ciclos=args.ciclos, calentamiento=args.calentamiento,
+        presupuesto_mb=args.presupuesto_mb, trazar=not args.sin_tracemalloc, top=args.top,
+        al_muestrear=al_muestrear
+    )
+    if args.json:
+        print(json.dumps(resumen, ensure_ascii=False, indent=2))
+        return 1 if resumen['superado'] else 0
+
+    print("\n" + "="*60)
+    print(f"✅ {resumen['ciclos']} ciclos sobre {resumen['semanas']} semanas en {resumen['segundos']} s "
+          f"({resumen['ciclos_por_segundo']} ciclos/s)")
+    print(f"📈 RSS: {resumen['rss_inicial_mb']} MB tras el calentamiento → {resumen['rss_estable_mb']} MB estable "
+          f"({resumen['crecimiento_rss_mb']:+} MB); tracemalloc {resumen['crecimiento_trazado_mb']:+} MB")
+    if resumen['sitios']:
+        print("🔎 Sitios que más memoria han sumado:")
+        for sitio in resumen['sitios']:
+            print(f"  {sitio['kb']:>9.1f} KB  {sitio['bloques']:>+7} bloques  {sitio['sitio']}")
+    if resumen['superado']:
+        print(f"❌ El crecimiento supera el presupuesto de {resumen['presupuesto_mb']} MB")
+    print("="*60)
+    return 1 if resumen['superado'] else 0
+
+def comando_exportar(args):
+    """Exporta semanas de un JSON Lines (p. ej. el de rastrear) a JSON Lines o CSV, en flujo."""
+    from datetime import date
+    from utils.exportacion import exportar, leer_jsonl
+
+    desde = date.fromisoformat(args.desde) if args.desde else None
+    hasta = date.fromisoformat(args.hasta) if args.hasta else None
+    registros = leer_jsonl(args.entrada, desde, hasta)
+    if args.salida == '-':
+        sys.stdout.writelines(exportar(registros, args.formato))
+        return 0
+
+    # CSV con newline='' (el módulo csv ya escribe los \r\n)
+    with open(args.salida, 'w', encoding='utf-8', newline='') as salida:
+        salida.writelines(exportar(registros, args.formato))
+    print(f"✅ Exportado: {args.salida}")
+    return 0
+
+def comando_servir(args):
+    """Servidor de producción: gunicorn con la aplicación precargada antes de bifurcar."""
+    from main import create_app
+    from routes import datos_extraidos
+    from utils.extraccion_paralela import cerrar_pool
+    from utils.servidor import servir
+    from utils.vigilante import vigilante
+
+    def al_salir():
+        vigilante.detener()
+        cerrar_pool()
+
+    app = create_app(vigilar=False)
+    try:
+        servir(
+            app, datos_extraidos, host=args.host, puerto=args.puerto,
+            trabajadores=args.trabajadores, hilos=args.hilos,
+            al_bifurcar=lambda: vigilante.iniciar(datos_extraidos), al_salir=al_salir
+        )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+def comando_carga(args):
+    """Prueba de carga contra un servidor ya en marcha."""
+    from utils.carga import RUTAS, prueba_carga
+
+    print(f"🏋️ {args.concurrencia} hilos durante {args.segundos} s contra {args.url}...")
+    resumen = prueba_carga(
+        args.url, rutas=args.ruta or RUTAS, segundos=args.segundos,
+        concurrencia=args.concurrencia, calentamiento=args.calentamiento
+    )
+    if args.json:
+        print(json.dumps(resumen, ensure_ascii=False, indent=2))
+        return 0
+
+    latencia = resumen['latencia_ms']
+    print("\n" + "="*60)
+    print(f"✅ {resumen['peticiones']} peticiones: {resumen['peticiones_por_segundo']} por segundo")
+    print(f"⏱️ Latencia: media {latencia['media']} ms, p50 {latencia['p50']} ms, "
+          f"p95 {latencia['p95']} ms, p99 {latencia['p99']} ms")
+    print(f"📊 Estados: {resumen['estados']}")
+    if resumen['errores']:
+        print(f"❌ Errores: {resumen['errores']}")
+    print("="*60)
+    return 0
+
+def crear_parser():
+    from utils.descubrimiento import RUTA_CHECKPOINT, RUTA_MANIFIESTO
+    from utils.instantanea import RUTA_INSTANTANEA
+    from utils.locales import IDIOMA_POR_DEFECTO, LOCALES
+    from utils.rastreo import CONCURRENCIA, CORTESIA, POR_HOST
+    from utils.archivo import RUTA_ARCHIVO
+    from utils.exportacion import FORMATOS as FORMATOS_EXPORTACION
+    from utils.resistencia import CALENTAMIENTO, CICLOS, PRESUPUESTO_MB
+    from utils import carga, servidor
+
+    parser = argparse.ArgumentParser(description='JW Meeting Extractor - comandos')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('rastrear', help='Rastrea índices de cuadernos y extrae todas sus semanas')
+    p.add_argument('urls', nargs='+', help='URLs de índices de cuadernos')
+    p.add_argument('--salida', default='rastreo_semanas.jsonl', help='Archivo JSON Lines de salida')
+    p.add_argument('--concurrencia', type=int, default=CONCURRENCIA, help='Descargas en curso como máximo')
+    p.add_argument('--por-host', type=int, default=POR_HOST, help='Conexiones simultáneas por host')
+    p.add_argument('--cortesia', type=float, default=CORTESIA, help='Segundos entre peticiones al mismo host')
+    p.add_argument('--procesos', type=int, default=0, help='Analizar en N procesos (0 = hilos)')
+    p.set_defaults(funcion=comando_rastrear)
+
+    p = sub.add_parser('descubrir', help='Descubre todos los cuadernos y semanas de la biblioteca (reanudable)')
+    p.add_argument('--idioma', nargs='+', choices=sorted(LOCALES), default=[IDIOMA_POR_DEFECTO],
+                   help='Idiomas cuya biblioteca se recorre')
+    p.add_argument('--raiz', nargs='+', help='URLs raíz alternativas (en lugar de --idioma)')
+    p.add_argument('--extraer', action='store_true', help='Descargar también cada semana y registrar su huella')
+    p.add_argument('--checkpoint', default=RUTA_CHECKPOINT, help='Archivo del punto de control')
+    p.add_argument('--manifiesto', default=RUTA_MANIFIESTO, help='Archivo del manifiesto de salida')
+    p.add_argument('--desde-cero', action='store_true', help='Ignorar el punto de control existente')
+    p.add_argument('--concurrencia', type=int, default=CONCURRENCIA, help='Descargas en curso como máximo')
+    p.add_argument('--cortesia', type=float, default=CORTESIA, help='Segundos entre peticiones al mismo host')
+    p.set_defaults(funcion=comando_descubrir)
+
+    p = sub.add_parser('comparar-manifiestos', help='Compara dos manifiestos (sale con 1 si hay cambios)')
+    p.add_argument('anterior', help='Manifiesto anterior')
+    p.add_argument('actual', help='Manifiesto actual')
+    p.set_defaults(funcion=comando_comparar_manifiestos)
+
+    p = sub.add_parser('instantanea', help='Construye la instantánea de arranque en caliente')
+    p.add_argument('urls', nargs='+', help='URLs de índices de cuadernos')
+    p.add_argument('--salida', default=RUTA_INSTANTANEA, help='Archivo de la instantánea')
+    p.add_argument('--concurrencia', type=int, default=CONCURRENCIA, help='Descargas en curso como máximo')
+    p.add_argument('--cortesia', type=float, default=CORTESIA, help='Segundos entre peticiones al mismo host')
+    p.set_defaults(funcion=comando_instantanea)
+
+    p = sub.add_parser('exportar', help='Exporta semanas a JSON Lines o CSV (una fila por parte)')
+    p.add_argument('entrada', help='Archivo JSON Lines de semanas (salida de rastrear)')
+    p.add_argument('--formato', choices=FORMATOS_EXPORTACION, default='csv', help='Formato de salida')
+    p.add_argument('--salida', default='-', help="Archivo de salida ('-' = stdout)")
+    p.add_argument('--desde', help='Solo semanas desde esta fecha (YYYY-MM-DD)')
+    p.add_argument('--hasta', help='Solo semanas hasta esta fecha (YYYY-MM-DD)')
+    p.set_defaults(funcion=comando_exportar)
+
+    p = sub.add_parser('resistencia', help='Prueba de memoria con ciclos de extracción y plantilla (sin red)')
+    p.add_argument('--archivo', default=RUTA_ARCHIVO, help='Archivo de respuestas grabado (JW_BACKEND=grabar)')
+    p.add_argument('--ciclos', type=int, default=CICLOS, help='Ciclos medidos tras el calentamiento')
+    p.add_argument('--calentamiento', type=int, default=CALENTAMIENTO, help='Ciclos antes de tomar la referencia')
+    p.add_argument('--presupuesto-mb', type=float, default=PRESUPUESTO_MB, help='Crecimiento máximo admitido')
+    p.add_argument('--top', type=int, default=10, help='Sitios de asignación a mostrar')
+    p.add_argument('--sin-tracemalloc', action='store_true', help='Solo RSS (más rápido, sin sitios)')
+    p.add_argument('--json', action='store_true', help='Resumen en JSON')
+    p.set_defaults(funcion=comando_resistencia)
+
+    p = sub.add_parser('servir', help='Servidor de producción (gunicorn, varios procesos e hilos)')
+    p.add_argument('--host', default=servidor.HOST, help='Dirección en la que escuchar')
+    p.add_argument('--puerto', type=int, default=servidor.PUERTO, help='Puerto (por defecto PORT o 5000)')
+    p.add_argument('--trabajadores', type=int, default=servidor.TRABAJADORES, help='Procesos trabajadores (cada uno con sus propias semanas extraídas)')
+    p.add_argument('--hilos', type=int, default=servidor.HILOS, help='Hilos por trabajador (1 = síncrono)')
+    p.set_defaults(funcion=comando_servir)
+
+    p = sub.add_parser('carga', help='Prueba de carga contra un servidor en marcha')
+    p.add_argument('url', nargs='?', default='http://localhost:5000', help='URL base del servidor')
+    p.add_argument('--ruta', action='append', help=f"Ruta a pedir (repetible; por defecto {', '.join(carga.RUTAS)})")
+    p.add_argument('--segundos', type=float, default=carga.SEGUNDOS, help='Duración de la medida')
+    p.add_argument('--concurrencia', type=int, default=carga.CONCURRENCIA, help='Hilos cliente')
+    p.add_argument('--calentamiento', type=float, default=carga.CALENTAMIENTO, help='Segundos iniciales sin medir')
+    p.add_argument('--json', action='store_true', help='Resumen en JSON')
+    p.set_defaults(funcion=comando_carga)
+
+    p = sub.add_parser('preparar-recursos', help='Descarga html2canvas para las plantillas sin conexión')
+    p.set_defaults(funcion=comando_preparar_recursos)
+
+    return parser
+
+def main(argv=None):
+    from utils.registro import configurar_registro
+
+    args = crear_parser().parse_args(argv)
+    if args.funcion is not comando_servir:  # El servidor registra en JW_LOG_FORMATO
+        configurar_registro(formato='texto')
+    return args.funcion(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,11 +8,21 @@ Puerto: 5000
 
 from flask import Flask
 from flask_cors import CORS
-from routes import init_routes
+from routes import init_routes, datos_extraidos
+from utils.instantanea import carga_inicial
+from utils import jw_scraper
+from utils.compresion import init_compresion
+from utils.registro import init_registro
+from utils.vigilante import vigilante
 import os
 
-def create_app():
-    """Factory function para crear la aplicación Flask"""
+def create_app(vigilar: bool = True):
+    """
+    Factory function para crear la aplicación Flask
+
+    Con ``vigilar=False`` no se arranca el vigilante (el servidor de
+    producción lo arranca en cada trabajador, tras bifurcarse).
+    """
     app = Flask(__name__)
     
     # Configuración
@@ -24,7 +34,7 @@ def create_app():
     CORS(app, resources={
         r"/api/*": {
             "origins": "*",
-            "methods": ["GET", "POST", "OPTIONS"],
+            "methods": ["GET", "POST", "DELETE", "OPTIONS"],
             "allow_headers": ["Content-Type"]
         }
     })
@@ -33,23 +43,38 @@ def create_app():
     os.makedirs('output', exist_ok=True)
     os.makedirs('templates', exist_ok=True)
     
+    # Logs JSON por petición (id de petición y duración de cada etapa)
+    init_registro(app)
+    
     # Inicializar rutas
     init_routes(app)
     
+    # Respuestas comprimidas (gzip/brotli según Accept-Encoding)
+    init_compresion(app)
+    
+    # Arranque en caliente: semanas ya extraídas por otra instancia
+    carga_inicial.iniciar(datos_extraidos, jw_scraper._respaldo, jw_scraper.VERSION_EXTRACTOR)
+    
+    # Cuadernos nuevos extraídos por adelantado (JW_VIGILAR)
+    if vigilar:
+        vigilante.iniciar(datos_extraidos)
+    
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    # Con el recargador (debug) este proceso solo vigila los archivos y el que sirve es
+    # el hijo (WERKZEUG_RUN_MAIN): solo el hijo arranca el vigilante
+    app = create_app(vigilar=os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
     
     print("\n" + "="*60)
     print("🎯 JW MEETING PROGRAM EXTRACTOR")
     print("="*60)
     print("✅ Servidor iniciado correctamente")
     print("📍 URL: http://localhost:5000")
-    print("🔧 Modo: Desarrollo")
+    print("🔧 Modo: Desarrollo (producción: python cli.py servir)")
     print("📁 Carpeta output: ./output/")
     print("="*60 + "\n")
     
-    # Para Replit y producción
+    # Servidor de desarrollo (recarga y depurador); en producción, python cli.py servir
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=True, host='0.0.0.0', port=port)
@@ -2,25 +2,64 @@
 Routes module - Endpoints de la API
 """
 
-from flask import render_template, request, jsonify, send_file
-from utils.jw_scraper import extraer_indice_semanas, extraer_datos_semana
-from utils.template_generator import generar_plantilla_editable
+from flask import Response, render_template, request, jsonify, send_file, stream_with_context
+from werkzeug.security import safe_join
+from utils.jw_scraper import extraer_indice_semanas, extraer_datos_semana, obtener_backend
+from utils.template_generator import (
+    DIRECTORIO_RECURSOS, MODO_POR_DEFECTO, MODOS, RecursoFaltanteError, generar_lote,
+    generar_plantilla_editable, generar_plantilla_por_partes, recursos_disponibles
+)
+from utils.congregaciones import (
+    HORA_INICIO_POR_DEFECTO, PerfilCongregacion, RegistroCongregaciones, validar_hora
+)
+from utils.almacen import AlmacenSemanas, generar_id_semana
+from utils.busqueda import analizar_consulta, coincidencias
+from utils.exportacion import FORMATOS as FORMATOS_EXPORTACION, TIPOS_MIME, exportar
+from utils.proteccion import ServicioNoDisponibleError, estado_protecciones
+from utils.extraccion_paralela import (
+    PLAZO_LOTE, PLAZO_LOTE_MAXIMO, PROCESOS, extraer_con_plazo, extraer_semana_en_pool
+)
+from utils.compresion import comprimir_flujo, elegir_codificacion, enviar_precomprimido
+from utils.artefactos import AlmacenArtefactos
+from utils.instantanea import carga_inicial
+from utils.registro import etapa, log
+from utils.vigilante import vigilante
+from utils.admision import (
+    PRIORIDAD_INTERACTIVA, PRIORIDAD_LOTE, PRIORIDAD_PLANTILLA, SaturadoError, admision
+)
 import os
+import io
 import json
-from datetime import datetime
+import base64
+import time
+import zipfile
+from dataclasses import asdict
+from datetime import date
 
-# Almacenamiento temporal de datos extraídos
-datos_extraidos = {}
+# Almacenamiento temporal de datos extraídos (indexado por fecha)
+datos_extraidos = AlmacenSemanas()
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+artefactos = AlmacenArtefactos()
+congregaciones = RegistroCongregaciones()
 
 def init_routes(app):
     """Inicializa todas las rutas de la aplicación"""
     
+    app.register_error_handler(SaturadoError, respuesta_saturado)
+    app.register_error_handler(RecursoFaltanteError, respuesta_recurso_faltante)
+    
+    if MODO_POR_DEFECTO != 'cdn' and not recursos_disponibles():
+        log.warning('⚠️ Falta html2canvas en static/vendor: las plantillas en modo %s fallarán '
+                    'hasta ejecutar python cli.py preparar-recursos', MODO_POR_DEFECTO)
+    
     @app.route('/')
     def index():
         """Página principal"""
         return render_template('index.html')
     
     @app.route('/api/semanas', methods=['POST'])
+    @admision.limitar(PRIORIDAD_INTERACTIVA)
     def buscar_semanas():
         """Busca todas las semanas disponibles en el índice de JW.org"""
         try:
@@ -33,7 +72,7 @@ def init_routes(app):
             if not url.startswith('https://www.jw.org'):
                 return jsonify({'success': False, 'error': 'URL debe ser de jw.org'}), 400
             
-            print(f"\n🔍 Buscando semanas en: {url}")
+            log.info('🔍 Buscando semanas', extra={'url': url})
             
             semanas = extraer_indice_semanas(url)
             
@@ -43,7 +82,7 @@ def init_routes(app):
                     'error': 'No se encontraron semanas en la URL proporcionada'
                 }), 404
             
-            print(f"✅ Se encontraron {len(semanas)} semanas")
+            log.info('✅ Se encontraron %d semanas', len(semanas), extra={'semanas': len(semanas)})
             
             return jsonify({
                 'success': True,
@@ -51,14 +90,17 @@ def init_routes(app):
                 'semanas': semanas
             })
             
+        except ServicioNoDisponibleError as e:
+            return respuesta_no_disponible(e)
         except Exception as e:
-            print(f"❌ Error al buscar semanas: {str(e)}")
+            log.exception('❌ Error al buscar semanas')
             return jsonify({
                 'success': False,
                 'error': f'Error al procesar la solicitud: {str(e)}'
             }), 500
     
     @app.route('/api/extraer', methods=['POST'])
+    @admision.limitar(PRIORIDAD_INTERACTIVA)
     def extraer_semana():
         """Extrae datos estructurados de una semana específica"""
         try:
@@ -68,7 +110,7 @@ def init_routes(app):
             if not url:
                 return jsonify({'success': False, 'error': 'URL no proporcionada'}), 400
             
-            print(f"\n📥 Extrayendo datos de: {url}")
+            log.info('📥 Extrayendo datos', extra={'url': url})
             
             datos = extraer_datos_semana(url)
             
@@ -79,15 +121,10 @@ def init_routes(app):
                     'error': error_msg
                 }), 400
             
-            semana_id = generar_id_semana(datos['fecha'])
+            semana_id = generar_id_semana(datos['fecha'], datos.get('fecha_inicio'))
+            datos_extraidos.guardar(semana_id, datos, url)
             
-            datos_extraidos[semana_id] = {
-                'datos': datos,
-                'fecha_extraccion': datetime.now().isoformat(),
-                'url': url
-            }
-            
-            print(f"✅ Datos extraídos correctamente: {datos['fecha']}")
+            log.info('✅ Datos extraídos correctamente', extra={'fecha': datos['fecha']})
             
             return jsonify({
                 'success': True,
@@ -95,119 +132,285 @@ def init_routes(app):
                 'datos': datos
             })
             
+        except ServicioNoDisponibleError as e:
+            return respuesta_no_disponible(e)
         except Exception as e:
-            print(f"❌ Error al extraer semana: {str(e)}")
+            log.exception('❌ Error al extraer semana')
             return jsonify({
                 'success': False,
                 'error': f'Error al extraer datos: {str(e)}'
             }), 500
     
     @app.route('/api/extraer-multiples', methods=['POST'])
+    @admision.limitar(PRIORIDAD_LOTE)
     def extraer_multiples():
-        """Extrae múltiples semanas de forma secuencial"""
+        """
+        Extrae múltiples semanas en paralelo dentro de un plazo
+
+        Body opcional: 'plazo' (segundos, por defecto JW_PLAZO_LOTE),
+        'continuar' (seguir con las pendientes en segundo plano) y
+        'modo': 'procesos'. Al vencer el plazo se responde con lo
+        terminado y las URLs pendientes.
+        """
         try:
             data = request.get_json()
-            urls = data.get('urls', [])
+            urls = list(dict.fromkeys(data.get('urls', [])))
             
             if not urls:
                 return jsonify({'success': False, 'error': 'No se proporcionaron URLs'}), 400
             
-            print(f"\n📦 Extrayendo {len(urls)} semanas...")
+            try:
+                plazo = float(data.get('plazo', PLAZO_LOTE))
+            except (TypeError, ValueError):
+                plazo = None
+            if plazo is None or not plazo > 0:
+                return jsonify({'success': False, 'error': 'plazo debe ser un número de segundos mayor que 0'}), 400
+            plazo = min(plazo, PLAZO_LOTE_MAXIMO)
+            continuar = bool(data.get('continuar', False))
+            
+            log.info('📦 Extrayendo semanas', extra={'urls': len(urls), 'plazo': plazo})
+            
+            # Modo por procesos: descargas en hilos y análisis en un pool de procesos
+            usar_procesos = PROCESOS > 0 or data.get('modo') == 'procesos'
+            if usar_procesos:
+                log.info('⚙️ Modo por procesos: descarga en hilos, análisis en procesos')
+            tarea = extraer_semana_en_pool if usar_procesos else extraer_datos_semana
+            
+            def al_terminar(resultado):
+                # También para las que terminan en segundo plano: quedan en /api/datos
+                datos = resultado['datos']
+                if datos and 'error' not in datos:
+                    semana_id = generar_id_semana(datos['fecha'], datos.get('fecha_inicio'))
+                    datos_extraidos.guardar(semana_id, datos, resultado['url'])
+                    resultado['semana_id'] = semana_id
+                    log.info('✅ Semana extraída', extra={'fecha': datos['fecha']})
+                else:
+                    log.warning('❌ Semana no extraída', extra={'url': resultado['url'], 'error': resultado['error'] or datos.get('error')})
+            
+            terminados, pendientes = extraer_con_plazo(
+                urls, tarea, segundos=plazo, continuar=continuar, al_terminar=al_terminar
+            )
             
             resultados = []
-            exitosos = 0
-            fallidos = 0
-            
-            for i, url in enumerate(urls, 1):
-                print(f"  [{i}/{len(urls)}] Procesando...")
-                
-                try:
-                    datos = extraer_datos_semana(url)
-                    
-                    if datos and 'error' not in datos:
-                        semana_id = generar_id_semana(datos['fecha'])
-                        datos_extraidos[semana_id] = {
-                            'datos': datos,
-                            'fecha_extraccion': datetime.now().isoformat(),
-                            'url': url
-                        }
-                        
-                        resultados.append({
-                            'success': True,
-                            'semana_id': semana_id,
-                            'titulo': datos['fecha'],
-                            'url': url
-                        })
-                        exitosos += 1
-                        print(f"  ✅ {datos['fecha']}")
-                    else:
-                        resultados.append({
-                            'success': False,
-                            'error': datos.get('error', 'Error desconocido'),
-                            'url': url
-                        })
-                        fallidos += 1
-                        print(f"  ❌ Error")
-                        
-                except Exception as e:
+            for resultado in terminados:
+                datos = resultado['datos']
+                if resultado.get('semana_id'):
+                    resultados.append({
+                        'success': True,
+                        'semana_id': resultado['semana_id'],
+                        'titulo': datos['fecha'],
+                        'url': resultado['url']
+                    })
+                else:
                     resultados.append({
                         'success': False,
-                        'error': str(e),
-                        'url': url
+                        'error': resultado['error'] or (datos or {}).get('error', 'Error desconocido'),
+                        'url': resultado['url']
                     })
-                    fallidos += 1
-                    print(f"  ❌ {str(e)}")
+            for url in pendientes:
+                resultados.append({'success': False, 'pendiente': True, 'url': url})
             
-            print(f"\n✅ Extracción masiva completada: {exitosos} exitosos, {fallidos} fallidos")
+            exitosos = sum(1 for r in resultados if r['success'])
+            fallidos = len(terminados) - exitosos
+            
+            log.info('✅ Extracción masiva terminada', extra={'exitosos': exitosos, 'fallidos': fallidos, 'pendientes': len(pendientes)})
             
             return jsonify({
                 'success': True,
                 'total': len(urls),
                 'exitosos': exitosos,
                 'fallidos': fallidos,
+                'completo': not pendientes,
+                'pendientes': pendientes,
+                'continuan_en_segundo_plano': continuar and bool(pendientes),
                 'resultados': resultados
             })
             
         except Exception as e:
-            print(f"❌ Error en extracción masiva: {str(e)}")
+            log.exception('❌ Error en extracción masiva')
             return jsonify({
                 'success': False,
                 'error': f'Error al extraer múltiples semanas: {str(e)}'
             }), 500
     
     @app.route('/api/descargar-plantilla/<semana_id>')
+    @admision.limitar(PRIORIDAD_PLANTILLA)
     def descargar_plantilla(semana_id):
-        """Descarga la plantilla HTML editable de una semana"""
+        """
+        Descarga la plantilla HTML editable de una semana
+        
+        Con ?perfil=<id> se usan el nombre y la hora de inicio guardados;
+        si no, ?congregacion= y ?hora= (HH:MM). Se envía en flujo (cabecera
+        y CSS primero, luego sección a sección); con ?guardar=1 se guarda
+        antes como artefacto precomprimido y se envía desde disco.
+        """
         try:
             if semana_id not in datos_extraidos:
                 return jsonify({'error': 'Semana no encontrada. Extrae los datos primero.'}), 404
             
             datos = datos_extraidos[semana_id]['datos']
-            nombre_congregacion = request.args.get('congregacion', 'CONGREGACIÓN')
-            
-            print(f"\n💾 Generando plantilla para: {datos['fecha']}")
-            
-            html_content = generar_plantilla_editable(datos, nombre_congregacion)
+            modo = request.args.get('modo', MODO_POR_DEFECTO)
+            if modo not in MODOS:
+                return jsonify({'error': f'Modo inválido. Opciones: {", ".join(MODOS)}'}), 400
+            
+            id_perfil = request.args.get('perfil')
+            if id_perfil:
+                perfil = congregaciones.obtener(id_perfil)
+                if perfil is None:
+                    return jsonify({'error': f'Perfil no encontrado: {id_perfil}'}), 404
+            else:
+                try:
+                    perfil = PerfilCongregacion(
+                        id=request.args.get('congregacion', 'CONGREGACIÓN'),
+                        nombre=request.args.get('congregacion', 'CONGREGACIÓN'),
+                        hora_inicio=validar_hora(request.args.get('hora', HORA_INICIO_POR_DEFECTO))
+                    )
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
             
             filename = f"programa-{semana_id}.html"
-            filepath = os.path.join('output', filename)
+            url_recursos = request.host_url.rstrip('/')
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            if request.args.get('guardar') != '1':
+                return _plantilla_en_flujo(datos, perfil, modo, url_recursos, filename)
             
-            print(f"✅ Plantilla guardada: {filepath}")
+            with etapa('plantilla', fecha=datos['fecha'], modo=modo):
+                html_content = generar_plantilla_editable(
+                    datos, perfil.nombre, modo=modo, url_recursos=url_recursos,
+                    hora_inicio=perfil.hora_inicio
+                )
             
-            return send_file(
-                filepath,
-                as_attachment=True,
-                download_name=filename,
-                mimetype='text/html'
+            artefacto = artefactos.guardar(
+                html_content.encode('utf-8'), semana_id, perfil.id, filename
             )
             
+            log.info('✅ Plantilla guardada', extra={'artefacto': artefacto.hash})
+            
+            try:
+                return enviar_precomprimido(artefacto.ruta, artefacto.nombre)
+            except FileNotFoundError:
+                # Una poda concurrente lo borró antes de abrirlo: se envía lo recién generado
+                log.warning('⚠️ Artefacto podado antes de enviarse', extra={'artefacto': artefacto.hash})
+                return send_file(
+                    io.BytesIO(html_content.encode('utf-8')), mimetype='text/html',
+                    as_attachment=True, download_name=filename
+                )
+            
+        except RecursoFaltanteError:
+            raise
         except Exception as e:
-            print(f"❌ Error al descargar plantilla: {str(e)}")
+            log.exception('❌ Error al descargar plantilla')
             return jsonify({'error': str(e)}), 500
     
+    def _plantilla_en_flujo(datos, perfil, modo, url_recursos, filename):
+        """Respuesta en flujo de la plantilla, comprimida trozo a trozo si el cliente lo acepta."""
+        # La compilación (lo caro) ocurre aquí, dentro del turno de admisión; en flujo solo se rellena
+        with etapa('plantilla', fecha=datos['fecha'], modo=modo, flujo=True):
+            partes = generar_plantilla_por_partes(
+                datos, perfil.nombre, modo=modo, url_recursos=url_recursos,
+                hora_inicio=perfil.hora_inicio
+            )
+        trozos = (parte.encode('utf-8') for parte in partes)
+        
+        codificacion = elegir_codificacion()
+        cuerpo = comprimir_flujo(trozos, codificacion) if codificacion else trozos
+        respuesta = Response(
+            stream_with_context(cuerpo), mimetype='text/html',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        return respuesta
+    
+    @app.route('/api/generar-lote', methods=['POST'])
+    @admision.limitar(PRIORIDAD_LOTE)
+    def generar_plantillas_lote():
+        """
+        Genera las plantillas de una o varias semanas para varias congregaciones
+        
+        Body: {"semanas": [ids], "congregaciones": [ids de perfil] (por defecto
+        todos), "modo": ...}. Devuelve un ZIP con un HTML por semana y congregación.
+        """
+        data = request.get_json() or {}
+        semanas = data.get('semanas') or [data.get('semana_id')]
+        semanas = [s for s in dict.fromkeys(semanas) if s]
+        if not semanas:
+            return jsonify({'success': False, 'error': 'No se indicaron semanas'}), 400
+        faltan = [s for s in semanas if s not in datos_extraidos]
+        if faltan:
+            return jsonify({'success': False, 'error': 'Semanas no encontradas', 'semanas': faltan}), 404
+        
+        modo = data.get('modo', MODO_POR_DEFECTO)
+        if modo not in MODOS:
+            return jsonify({'success': False, 'error': f'Modo inválido. Opciones: {", ".join(MODOS)}'}), 400
+        
+        ids = data.get('congregaciones')
+        if ids:
+            perfiles = [congregaciones.obtener(i) for i in ids]
+            desconocidos = [i for i, p in zip(ids, perfiles) if p is None]
+            if desconocidos:
+                return jsonify({'success': False, 'error': 'Perfiles no encontrados', 'congregaciones': desconocidos}), 404
+        else:
+            perfiles = congregaciones.listar()
+        if not perfiles:
+            return jsonify({'success': False, 'error': 'No hay perfiles de congregación guardados'}), 400
+        
+        log.info('💾 Generando plantillas por lote', extra={'semanas': len(semanas), 'congregaciones': len(perfiles)})
+        
+        buffer = io.BytesIO()
+        with etapa('plantilla_lote', semanas=len(semanas), congregaciones=len(perfiles), modo=modo), \
+                zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_salida:
+            for semana_id in semanas:
+                datos = datos_extraidos[semana_id]['datos']
+                for perfil, html_content in generar_lote(
+                    datos, perfiles, modo=modo, url_recursos=request.host_url.rstrip('/')
+                ):
+                    zip_salida.writestr(f"{perfil.id}/programa-{semana_id}.html", html_content)
+        buffer.seek(0)
+        
+        return send_file(
+            buffer, mimetype='application/zip', as_attachment=True,
+            download_name=f"programas-{semanas[0]}.zip" if len(semanas) == 1 else 'programas.zip'
+        )
+    
+    @app.route('/api/congregaciones', methods=['GET'])
+    def listar_congregaciones():
+        """Perfiles de congregación guardados"""
+        return jsonify({'success': True, 'congregaciones': [asdict(p) for p in congregaciones.listar()]})
+    
+    @app.route('/api/congregaciones', methods=['POST'])
+    def guardar_congregacion():
+        """Crea o actualiza un perfil: {"nombre": ..., "hora_inicio": "HH:MM", "id": opcional}"""
+        data = request.get_json() or {}
+        try:
+            perfil = congregaciones.guardar(
+                data.get('nombre', ''), data.get('hora_inicio', HORA_INICIO_POR_DEFECTO), data.get('id')
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify({'success': True, 'congregacion': asdict(perfil)}), 201
+    
+    @app.route('/api/congregaciones/<id_perfil>', methods=['DELETE'])
+    def borrar_congregacion(id_perfil):
+        """Borra un perfil de congregación"""
+        if not congregaciones.borrar(id_perfil):
+            return jsonify({'success': False, 'error': 'Perfil no encontrado'}), 404
+        return jsonify({'success': True})
+    
+    @app.route('/recursos/<path:nombre>')
+    def recursos(nombre):
+        """Scripts de terceros copiados localmente (nombre versionado, caché de un año)"""
+        ruta = safe_join(DIRECTORIO_RECURSOS, nombre)
+        if not ruta or not os.path.isfile(ruta):
+            return jsonify({'error': 'Recurso no encontrado'}), 404
+        
+        respuesta = enviar_precomprimido(
+            ruta, nombre, mimetype='text/javascript', como_adjunto=False, max_age=31536000
+        )
+        respuesta.cache_control.immutable = True
+        return respuesta
+    
     @app.route('/api/datos/<semana_id>')
     def obtener_datos(semana_id):
         """Obtiene los datos JSON de una semana extraída"""
@@ -219,16 +422,195 @@ def init_routes(app):
             'datos': datos_extraidos[semana_id]
         })
     
+    @app.route('/api/datos')
+    def listar_datos():
+        """
+        Lista las semanas guardadas, paginadas por cursor y en orden cronológico
+        
+        Parámetros: desde/hasta (YYYY-MM-DD), cuaderno (p. ej.
+        'noviembre-diciembre-2025-mwb'), campos ('resumen' o 'completo'),
+        limite (máx. LIMITE_MAXIMO) y cursor (el 'siguiente' de la página anterior).
+        """
+        try:
+            desde = parsear_fecha_parametro(request.args.get('desde'))
+            hasta = parsear_fecha_parametro(request.args.get('hasta'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Fecha inválida, usa el formato YYYY-MM-DD'}), 400
+        
+        campos = request.args.get('campos', 'resumen')
+        if campos not in ('resumen', 'completo'):
+            return jsonify({'success': False, 'error': "campos debe ser 'resumen' o 'completo'"}), 400
+        
+        try:
+            limite = min(max(int(request.args.get('limite', LIMITE_POR_DEFECTO)), 1), LIMITE_MAXIMO)
+            despues_de = decodificar_cursor(request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limite o cursor inválido'}), 400
+        
+        pagina, siguiente = datos_extraidos.pagina(
+            limite, despues_de, desde, hasta, request.args.get('cuaderno')
+        )
+        
+        semanas = []
+        for semana_id, registro in pagina:
+            semana = {
+                'semana_id': semana_id,
+                'fecha': registro['datos']['fecha'],
+                'fecha_inicio': registro['datos'].get('fecha_inicio'),
+                'fecha_fin': registro['datos'].get('fecha_fin'),
+                'cuaderno': datos_extraidos.cuaderno(semana_id),
+                'url': registro['url'],
+                'fecha_extraccion': registro['fecha_extraccion']
+            }
+            if campos == 'completo':
+                semana['datos'] = registro['datos']
+            semanas.append(semana)
+        
+        return jsonify({
+            'success': True,
+            'total': len(semanas),
+            'semanas': semanas,
+            'siguiente': codificar_cursor(siguiente)
+        })
+    
+    @app.route('/api/buscar')
+    def buscar():
+        """
+        Busca en los títulos, lecturas y canciones de las semanas guardadas
+        
+        ?q=isaías 40 | ?q=canción 45 | ?q=...&limite=20. Todas las palabras deben
+        aparecer (la última puede estar incompleta); más puntuación primero.
+        """
+        inicio = time.perf_counter()
+        consulta = analizar_consulta(request.args.get('q', ''))
+        if not consulta:
+            return jsonify({'success': False, 'error': 'Consulta vacía (parámetro q)'}), 400
+        try:
+            limite = min(max(int(request.args.get('limite', 20)), 1), LIMITE_MAXIMO)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limite inválido'}), 400
+        
+        encontradas, total = datos_extraidos.buscar(consulta, limite)
+        resultados = [{
+            'semana_id': semana_id,
+            'fecha': registro['datos']['fecha'],
+            'fecha_inicio': registro['datos'].get('fecha_inicio'),
+            'puntuacion': round(puntos, 3),
+            'coincidencias': coincidencias(registro['datos'], consulta)
+        } for semana_id, puntos, registro in encontradas]
+        
+        return jsonify({
+            'success': True,
+            'consulta': consulta,
+            'total': total,
+            'resultados': resultados,
+            'milisegundos': round((time.perf_counter() - inicio) * 1000, 2)
+        })
+    
+    @app.route('/api/exportar.<formato>')
+    def exportar_semanas(formato):
+        """
+        Exporta las semanas guardadas en flujo: /api/exportar.jsonl o /api/exportar.csv
+        
+        Admite desde/hasta (YYYY-MM-DD) y cuaderno, como /api/datos. El CSV
+        tiene una fila por parte.
+        """
+        if formato not in FORMATOS_EXPORTACION:
+            return jsonify({'success': False, 'error': f'Formato inválido. Opciones: {", ".join(FORMATOS_EXPORTACION)}'}), 404
+        try:
+            desde = parsear_fecha_parametro(request.args.get('desde'))
+            hasta = parsear_fecha_parametro(request.args.get('hasta'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Fecha inválida, usa el formato YYYY-MM-DD'}), 400
+        
+        registros = datos_extraidos.iterar(desde, hasta, request.args.get('cuaderno'))
+        return Response(
+            stream_with_context(exportar(registros, formato)),
+            mimetype=TIPOS_MIME[formato],
+            headers={'Content-Disposition': f'attachment; filename=programas.{formato}'}
+        )
+    
+    @app.route('/api/semana-actual')
+    def semana_actual():
+        """Obtiene la semana guardada que contiene la fecha de hoy (o 'fecha')"""
+        try:
+            hoy = parsear_fecha_parametro(request.args.get('fecha'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Fecha inválida, usa el formato YYYY-MM-DD'}), 400
+        
+        encontrada = datos_extraidos.actual(hoy)
+        if not encontrada:
+            return jsonify({'error': 'No hay una semana guardada para esa fecha'}), 404
+        
+        semana_id, registro = encontrada
+        return jsonify({
+            'success': True,
+            'semana_id': semana_id,
+            'datos': registro
+        })
+    
     @app.route('/api/salud')
     def salud():
-        """Endpoint de health check"""
+        """Endpoint de health check (503 mientras se carga la instantánea de arranque)"""
+        listo = carga_inicial.esta_listo()
         return jsonify({
-            'status': 'ok',
+            'status': 'ok' if listo else 'iniciando',
+            'instantanea': carga_inicial.resumen,
             'servicio': 'JW Meeting Extractor',
             'version': '1.0.0',
-            'semanas_en_memoria': len(datos_extraidos)
-        })
+            'semanas_en_memoria': len(datos_extraidos),
+            'origen': estado_protecciones(),
+            'descarga': obtener_backend().estado(),
+            'artefactos': artefactos.estadisticas(),
+            'admision': admision.estado(),
+            'vigilante': vigilante.resumen
+        }), 200 if listo else 503
+
+def respuesta_no_disponible(error):
+    """Respuesta 503 con Retry-After cuando jw.org no está disponible"""
+    log.warning('⚠️ Origen no disponible: %s', error, extra={'reintentar_en': error.reintentar_en})
+    respuesta = jsonify({
+        'success': False,
+        'error': f'JW.org no está disponible en este momento: {error}',
+        'reintentar_en': error.reintentar_en
+    })
+    return respuesta, 503, {'Retry-After': str(error.reintentar_en)}
+
+def respuesta_recurso_faltante(error):
+    """Respuesta 503 cuando el modo de plantilla necesita html2canvas local y no está"""
+    log.error('❌ %s', error)
+    return jsonify({'success': False, 'error': str(error), 'modo': error.modo}), 503
+
+def respuesta_saturado(error):
+    """Respuesta 429 con Retry-After cuando no se admiten más operaciones costosas"""
+    log.warning('🚦 %s', error, extra={'reintentar_en': error.reintentar_en})
+    respuesta = jsonify({
+        'success': False,
+        'error': str(error),
+        'reintentar_en': error.reintentar_en
+    })
+    return respuesta, 429, {'Retry-After': str(error.reintentar_en)}
+
+def codificar_cursor(clave):
+    """Cursor opaco (base64 URL) a partir de la clave del índice"""
+    if clave is None:
+        return None
+    texto = json.dumps(list(clave), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor):
+    """Clave del índice a partir del cursor (ValueError si no es válido)"""
+    if not cursor:
+        return None
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        ordinal, semana_id = json.loads(texto)
+    except Exception:
+        raise ValueError('Cursor inválido')
+    if not isinstance(ordinal, int) or not isinstance(semana_id, str):
+        raise ValueError('Cursor inválido')
+    return (ordinal, semana_id)
 
-def generar_id_semana(fecha):
-    """Genera un ID único basado en la fecha"""
-    return fecha.lower().replace(' de ', '-').replace(' ', '-')
+def parsear_fecha_parametro(valor):
+    """Convierte un parámetro YYYY-MM-DD en fecha (None si no viene)"""
+    return date.fromisoformat(valor) if valor else None
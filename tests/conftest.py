@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+# Sin instantanea ni memo en disco: las pruebas no leen ni escriben cache/
+os.environ.setdefault('JW_INSTANTANEA', '')
+os.environ.setdefault('JW_MEMO_RUTA', '')
+
+@pytest.fixture(scope='session')
+def app():
+    from main import create_app
+    app = create_app(vigilar=False)
+    app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from utils.admision import ControlAdmision, SaturadoError
+
+def _ocupar(control, liberar, prioridad=0):
+    """Hilo que ocupa un hueco hasta que se activa ``liberar``."""
+    dentro = threading.Event()
+
+    def ocupar():
+        with control.turno(prioridad):
+            dentro.set()
+            liberar.wait(5)
+
+    hilo = threading.Thread(target=ocupar)
+    hilo.start()
+    assert dentro.wait(5)
+    return hilo
+
+def _esperar_cola(control, n):
+    limite = time.monotonic() + 5
+    while control.estado()['en_cola'] < n:
+        assert time.monotonic() < limite
+        time.sleep(0.005)
+
+def test_entra_directamente_si_hay_hueco():
+    control = ControlAdmision(max_concurrentes=2, max_cola=1)
+    with control.turno():
+        with control.turno():
+            assert control.estado()['activas'] == 2
+    assert control.estado()['activas'] == 0
+
+def test_la_cola_respeta_la_prioridad():
+    control = ControlAdmision(max_concurrentes=1, max_cola=5, espera_maxima=5)
+    liberar = threading.Event()
+    ocupante = _ocupar(control, liberar)
+    orden = []
+
+    def pedir(nombre, prioridad):
+        with control.turno(prioridad):
+            orden.append(nombre)
+
+    hilos = []
+    for n, (nombre, prioridad) in enumerate([('lote', 2), ('plantilla', 1), ('interactiva', 0)], start=1):
+        hilos.append(threading.Thread(target=pedir, args=(nombre, prioridad)))
+        hilos[-1].start()
+        _esperar_cola(control, n)
+    liberar.set()
+    for hilo in [ocupante, *hilos]:
+        hilo.join(5)
+    assert orden == ['interactiva', 'plantilla', 'lote']
+
+def test_cola_llena_responde_saturado():
+    control = ControlAdmision(max_concurrentes=1, max_cola=0, espera_maxima=5)
+    liberar = threading.Event()
+    ocupante = _ocupar(control, liberar)
+    with pytest.raises(SaturadoError) as error:
+        with control.turno():
+            pass
+    assert error.value.reintentar_en >= 1
+    liberar.set()
+    ocupante.join(5)
+
+def test_tiempo_de_espera_agotado_sale_de_la_cola():
+    control = ControlAdmision(max_concurrentes=1, max_cola=1, espera_maxima=0.05)
+    liberar = threading.Event()
+    ocupante = _ocupar(control, liberar)
+    with pytest.raises(SaturadoError):
+        with control.turno():
+            pass
+    assert control.estado()['en_cola'] == 0
+    liberar.set()
+    ocupante.join(5)
+
+def test_desplazada_que_despierta_con_la_cola_vacia_recibe_saturado():
+    control = ControlAdmision(max_concurrentes=1, max_cola=1, espera_maxima=5)
+    control._activas = 1
+
+    def desplazar(_restante=None):
+        # Mientras dormía, otra más prioritaria la desplazó, entró y ya terminó
+        entrada = control._cola[0]
+        control._quitar_de_cola(entrada)
+        control._expulsadas.add(entrada)
+        control._activas = 0
+
+    control._cond.wait = desplazar
+    with pytest.raises(SaturadoError):
+        with control.turno(2):
+            pass
+    assert control.estado()['activas'] == 0
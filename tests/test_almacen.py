@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+from utils.almacen import AlmacenSemanas
+
+URL = 'https://www.jw.org/es/biblioteca/guia-actividades-reunion-testigos-jehova/{}/semana/'
+
+def _semana(inicio: date, cuaderno='enero-febrero-2026-mwb'):
+    fin = inicio + timedelta(days=6)
+    datos = {'fecha': f'{inicio.day}-{fin.day}', 'fecha_inicio': inicio.isoformat(), 'fecha_fin': fin.isoformat()}
+    return f'semana-{inicio.isoformat()}', datos, URL.format(cuaderno)
+
+def _almacen(semanas=10):
+    almacen = AlmacenSemanas()
+    lunes = date(2026, 1, 5)
+    # Se guardan desordenadas: el listado sale igualmente en orden cronológico
+    for i in reversed(range(semanas)):
+        almacen.guardar(*_semana(lunes + timedelta(weeks=i)))
+    return almacen
+
+def _recorrer(almacen, limite, **filtros):
+    ids, despues_de = [], None
+    while True:
+        pagina, despues_de = almacen.pagina(limite, despues_de, **filtros)
+        ids.extend(semana_id for semana_id, _ in pagina)
+        if despues_de is None:
+            return ids
+
+def _recorrer_desde(almacen, limite, despues_de):
+    ids = []
+    while despues_de is not None:
+        pagina, despues_de = almacen.pagina(limite, despues_de)
+        ids.extend(semana_id for semana_id, _ in pagina)
+    return ids
+
+def test_paginas_por_cursor_sin_huecos_ni_repetidos():
+    almacen = _almacen(10)
+    ids = _recorrer(almacen, 3)
+    assert ids == sorted(ids)
+    assert len(ids) == len(set(ids)) == 10
+
+def test_la_ultima_pagina_no_devuelve_cursor():
+    pagina, siguiente = _almacen(4).pagina(4)
+    assert len(pagina) == 4 and siguiente is None
+
+def test_lo_guardado_antes_del_cursor_no_se_repite():
+    almacen = _almacen(6)
+    primera, siguiente = almacen.pagina(3)
+    almacen.guardar(*_semana(date(2025, 12, 29)))  # Anterior a todo lo listado
+    resto = _recorrer_desde(almacen, 3, siguiente)
+    assert not {semana_id for semana_id, _ in primera} & set(resto)
+    assert len(resto) == 3
+
+def test_filtros_por_fecha_y_cuaderno():
+    almacen = _almacen(6)
+    almacen.guardar(*_semana(date(2026, 3, 2), cuaderno='marzo-abril-2026-mwb'))
+    ids = _recorrer(almacen, 2, desde=date(2026, 1, 14), hasta=date(2026, 1, 31))
+    # La semana del 12 al 18 contiene el 14: se incluye
+    assert ids == ['semana-2026-01-12', 'semana-2026-01-19', 'semana-2026-01-26']
+    assert _recorrer(almacen, 5, cuaderno='marzo-abril-2026-mwb') == ['semana-2026-03-02']
+    assert almacen.pagina(5, cuaderno='no-existe') == ([], None)
+
+def test_semana_actual():
+    almacen = _almacen(3)
+    assert almacen.actual(date(2026, 1, 14))[0] == 'semana-2026-01-12'
+    assert almacen.actual(date(2026, 6, 1)) is None
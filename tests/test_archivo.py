@@ -0,0 +1,34 @@
+import pytest
+
+from utils import archivo as modulo
+from utils.archivo import ArchivoRespuestas, EntradaNoArchivadaError
+
+def test_grabar_y_reproducir(tmp_path):
+    ruta = str(tmp_path / 'respuestas.jwa')
+    grabacion = ArchivoRespuestas(ruta, escritura=True)
+    grabacion.guardar('https://www.jw.org/es/a', b'<main>a</main>')
+    grabacion.guardar('https://www.jw.org/es/b', b'<main>b</main>')
+    grabacion.cerrar()
+
+    lectura = ArchivoRespuestas(ruta)
+    assert lectura.urls() == ['https://www.jw.org/es/a', 'https://www.jw.org/es/b']
+    assert lectura.obtener('https://www.jw.org/es/b') == b'<main>b</main>'
+    with pytest.raises(EntradaNoArchivadaError):
+        lectura.obtener('https://www.jw.org/es/c')
+    lectura.cerrar()
+
+def test_sin_indice_se_reconstruye_y_se_avisa_por_el_registro(tmp_path, monkeypatch, capsys):
+    ruta = str(tmp_path / 'respuestas.jwa')
+    grabacion = ArchivoRespuestas(ruta, escritura=True)
+    grabacion.guardar('https://www.jw.org/es/a', b'<main>a</main>')
+    grabacion._archivo.flush()  # El proceso muere antes de escribir el índice
+
+    avisos = []
+    monkeypatch.setattr(modulo.log, 'warning', lambda mensaje, *a, **k: avisos.append(mensaje))
+    lectura = ArchivoRespuestas(ruta)
+    assert lectura.obtener('https://www.jw.org/es/a') == b'<main>a</main>'
+    assert len(avisos) == 1
+    assert capsys.readouterr().out == ''
+    lectura.cerrar()
+    grabacion._archivo.close()
+    grabacion._archivo = None
@@ -0,0 +1,30 @@
+import os
+
+from utils.artefactos import AlmacenArtefactos
+
+def test_mismo_contenido_se_guarda_una_vez(tmp_path):
+    almacen = AlmacenArtefactos(str(tmp_path))
+    uno = almacen.guardar(b'<html>1</html>', 'semana-1', 'centro', 'a.html')
+    otro = almacen.guardar(b'<html>1</html>', 'semana-2', 'norte', 'b.html')
+    assert uno.ruta == otro.ruta
+    assert almacen.estadisticas()['objetos'] == 1
+    assert almacen.buscar('semana-2', 'norte').nombre == 'b.html'
+
+def test_enlazar_deja_el_nombre_legible_aunque_se_pode(tmp_path):
+    almacen = AlmacenArtefactos(str(tmp_path / 'almacen'))
+    artefacto = almacen.guardar(b'<html>semana</html>', 'semana-1', 'centro', 'reunion_1.html')
+    ruta = almacen.enlazar(artefacto, str(tmp_path))
+    assert os.path.basename(ruta) == 'reunion_1.html'
+
+    almacen.max_bytes = 0
+    assert almacen.podar() == 1
+    assert not os.path.exists(artefacto.ruta)
+    with open(ruta, 'rb') as f:
+        assert f.read() == b'<html>semana</html>'
+
+def test_enlazar_reemplaza_el_anterior(tmp_path):
+    almacen = AlmacenArtefactos(str(tmp_path / 'almacen'))
+    for contenido in (b'<html>v1</html>', b'<html>v2</html>'):
+        ruta = almacen.enlazar(almacen.guardar(contenido, 's', 'c', 'reunion.html'), str(tmp_path))
+    with open(ruta, 'rb') as f:
+        assert f.read() == b'<html>v2</html>'
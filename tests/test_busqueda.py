@@ -0,0 +1,47 @@
+from utils.busqueda import IndiceBusqueda, analizar_consulta, coincidencias
+
+def _semana(lectura='', titulos=(), canciones=()):
+    return {
+        'lectura_biblica': lectura,
+        'tesoros_biblia': [{'titulo': t} for t in titulos],
+        'canciones': {f'c{i}': n for i, n in enumerate(canciones)},
+    }
+
+def test_analizar_consulta():
+    assert analizar_consulta('Isaías 40') == ['isaias', '40']
+    assert analizar_consulta('canción 45') == ['cancion:45']
+    assert analizar_consulta('cancion:7 de la fe') == ['cancion:7', 'fe']
+
+def test_exige_todos_los_terminos():
+    indice = IndiceBusqueda()
+    indice.indexar('a', _semana('ISAÍAS 40-41'))
+    indice.indexar('b', _semana('ISAÍAS 42'))
+    assert [s for s, _ in indice.buscar(['isaias', '40'])] == ['a']
+    assert indice.buscar(['isaias', '99']) == []
+
+def test_la_lectura_pesa_mas_que_un_titulo():
+    indice = IndiceBusqueda()
+    indice.indexar('titulo', _semana('MATEO 1', titulos=['Lo que enseña Isaías']))
+    indice.indexar('lectura', _semana('ISAÍAS 1'))
+    assert [s for s, _ in indice.buscar(['isaias'])] == ['lectura', 'titulo']
+
+def test_exacto_antes_que_prefijo():
+    indice = IndiceBusqueda()
+    indice.indexar('prefijo', _semana(titulos=['Oraciones sinceras']))
+    indice.indexar('exacto', _semana(titulos=['La oracion']))
+    assert [s for s, _ in indice.buscar(['oracion'])] == ['exacto', 'prefijo']
+
+def test_cancion_solo_busca_en_canciones():
+    indice = IndiceBusqueda()
+    indice.indexar('cancion', _semana(canciones=[45]))
+    indice.indexar('titulo', _semana(titulos=['Los 45 años de Noé']))
+    assert [s for s, _ in indice.buscar(analizar_consulta('canción 45'))] == ['cancion']
+    assert coincidencias(_semana(canciones=[45]), ['cancion:45']) == [{'campo': 'cancion', 'texto': '45'}]
+
+def test_reindexar_y_quitar():
+    indice = IndiceBusqueda()
+    indice.indexar('a', _semana('ISAÍAS 40'))
+    indice.indexar('a', _semana('JEREMÍAS 1'))
+    assert indice.buscar(['isaias']) == []
+    indice.quitar('a')
+    assert indice.buscar(['jeremias']) == [] and len(indice) == 0
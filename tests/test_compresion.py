@@ -0,0 +1,54 @@
+import gzip
+import os
+import zlib
+
+from flask import Flask, jsonify
+
+from utils.compresion import (
+    codificaciones_disponibles, comprimir, comprimir_flujo, escribir_atomico, guardar_precomprimido,
+    init_compresion
+)
+
+def test_gzip_determinista():
+    assert comprimir(b'x' * 1000, 'gzip') == comprimir(b'x' * 1000, 'gzip')
+    assert gzip.decompress(comprimir(b'hola', 'gzip', artefacto=True)) == b'hola'
+
+def test_flujo_gzip_se_puede_leer_trozo_a_trozo():
+    trozos = [b'<html>', b'<main>' * 100, b'</html>']
+    comprimidos = list(comprimir_flujo(trozos, 'gzip'))
+    descompresor = zlib.decompressobj(31)
+    # Cada trozo vaciado ya se puede descomprimir sin esperar al final
+    assert descompresor.decompress(comprimidos[0]) == b'<html>'
+    resto = b''.join(descompresor.decompress(c) for c in comprimidos[1:])
+    assert resto == b''.join(trozos[1:])
+
+def test_escribir_atomico_no_deja_temporales(tmp_path):
+    ruta = tmp_path / 'a.html'
+    escribir_atomico(str(ruta), b'uno')
+    escribir_atomico(str(ruta), b'dos')
+    assert ruta.read_bytes() == b'dos'
+    assert os.listdir(tmp_path) == ['a.html']
+
+def test_precomprimido_no_se_reescribe_si_no_cambia(tmp_path):
+    ruta = str(tmp_path / 'plantilla.html')
+    assert guardar_precomprimido(ruta, b'<html>1</html>')
+    assert gzip.decompress(open(ruta + '.gz', 'rb').read()) == b'<html>1</html>'
+    assert len(os.listdir(tmp_path)) == 1 + len(codificaciones_disponibles())
+    assert not guardar_precomprimido(ruta, b'<html>1</html>')
+    assert guardar_precomprimido(ruta, b'<html>2</html>')
+
+def test_respuestas_json_comprimidas_segun_accept_encoding():
+    app = Flask(__name__)
+    init_compresion(app)
+    app.add_url_rule('/grande', 'grande', lambda: jsonify(datos='x' * 2000))
+    app.add_url_rule('/chica', 'chica', lambda: jsonify(datos='x'))
+    cliente = app.test_client()
+
+    comprimida = cliente.get('/grande', headers={'Accept-Encoding': 'gzip'})
+    assert comprimida.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in comprimida.headers['Vary']
+    plana = cliente.get('/grande', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plana.headers
+    assert gzip.decompress(comprimida.data) == plana.data
+    # Por debajo de TAMANO_MINIMO no compensa
+    assert 'Content-Encoding' not in cliente.get('/chica', headers={'Accept-Encoding': 'gzip'}).headers
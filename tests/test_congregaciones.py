@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from utils.congregaciones import RegistroCongregaciones, identificador, validar_hora
+
+def test_validar_hora():
+    assert validar_hora('7:05') == '07:05'
+    with pytest.raises(ValueError):
+        validar_hora('25:00')
+
+def test_identificador_sin_acentos():
+    assert identificador('Congregación Centro') == 'congregacion-centro'
+
+def test_dos_procesos_no_pierden_los_cambios_del_otro(tmp_path):
+    ruta = str(tmp_path / 'congregaciones.json')
+    uno, otro = RegistroCongregaciones(ruta), RegistroCongregaciones(ruta)
+    assert uno.listar() == []
+
+    otro.guardar('Norte', '19:30')
+    uno.guardar('Centro', '19:00')
+    assert {p.id for p in otro.listar()} == {'norte', 'centro'}
+
+    otro.borrar('centro')
+    assert uno.obtener('centro') is None
+    # Un cambio posterior de ``uno`` no resucita el perfil borrado
+    uno.guardar('Sur', '18:00')
+    assert {p.id for p in RegistroCongregaciones(ruta).listar()} == {'norte', 'sur'}
+
+def test_guardados_simultaneos_de_varios_registros(tmp_path):
+    ruta = str(tmp_path / 'congregaciones.json')
+    registros = [RegistroCongregaciones(ruta) for _ in range(4)]
+
+    def guardar(n, registro):
+        for i in range(10):
+            registro.guardar(f'Congregación {n}-{i}')
+
+    hilos = [threading.Thread(target=guardar, args=(n, r)) for n, r in enumerate(registros)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert len(RegistroCongregaciones(ruta).listar()) == 40
+
+def test_sin_ruta_solo_en_memoria():
+    registro = RegistroCongregaciones('')
+    registro.guardar('Centro')
+    assert [p.id for p in registro.listar()] == ['centro']
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from utils import jw_scraper
+from utils.archivo import ArchivoRespuestas, BackendReproduccion
+from utils.descubrimiento import Descubrimiento, comparar_manifiestos, url_biblioteca
+
+RAIZ = url_biblioteca('es')
+CUADERNO = RAIZ + 'enero-febrero-2026-mwb/'
+SEMANAS = [
+    CUADERNO + 'Vida-y-Ministerio-Cristianos-Enero-5-11-2026/',
+    CUADERNO + 'Vida-y-Ministerio-Cristianos-Enero-12-18-2026/',
+]
+
+def _ejecutar(recorrido):
+    return asyncio.run(recorrido.ejecutar())
+
+@pytest.fixture
+def biblioteca(tmp_path, monkeypatch):
+    """Biblioteca grabada: la raíz enlaza un cuaderno con dos semanas."""
+    archivo = ArchivoRespuestas(str(tmp_path / 'respuestas.jwa'), escritura=True)
+    archivo.guardar(RAIZ, f'<a href="{CUADERNO}">Enero-febrero</a>'.encode())
+    archivo.guardar(CUADERNO, (
+        f'<div class="docPart"><a href="{SEMANAS[1]}">12-18 DE ENERO</a>'
+        f'<a href="{SEMANAS[0]}">5-11 DE ENERO</a></div>'
+    ).encode())
+    archivo.cerrar()
+    monkeypatch.setattr(jw_scraper, '_backend', BackendReproduccion(ArchivoRespuestas(archivo.ruta)))
+    return tmp_path
+
+def test_recorre_la_biblioteca_y_produce_el_manifiesto(biblioteca):
+    recorrido = Descubrimiento([RAIZ], ruta_checkpoint=str(biblioteca / 'checkpoint.json'))
+    manifiesto = _ejecutar(recorrido)
+    assert manifiesto['total_cuadernos'] == 1
+    semanas = manifiesto['cuadernos'][CUADERNO]
+    assert [s['url'] for s in semanas] == SEMANAS  # En orden cronológico
+    assert semanas[0]['fecha_inicio'] == '2026-01-05'
+
+def test_reanuda_sin_volver_a_pedir_lo_completado(biblioteca, monkeypatch):
+    ruta = str(biblioteca / 'checkpoint.json')
+    _ejecutar(Descubrimiento([RAIZ], ruta_checkpoint=ruta))
+
+    pedidas = []
+    backend = jw_scraper._backend
+    monkeypatch.setattr(backend, 'descargar', lambda url: pedidas.append(url) or backend.archivo.obtener(url))
+    manifiesto = _ejecutar(Descubrimiento([RAIZ], ruta_checkpoint=ruta))
+    assert pedidas == []
+    assert manifiesto['total_semanas'] == 2
+
+def test_un_checkpoint_de_otras_raices_se_ignora(biblioteca):
+    ruta = str(biblioteca / 'checkpoint.json')
+    _ejecutar(Descubrimiento([RAIZ], ruta_checkpoint=ruta))
+    assert not Descubrimiento([url_biblioteca('en')], ruta_checkpoint=ruta).cargar_checkpoint()
+
+def test_comparar_manifiestos():
+    def manifiesto(*semanas):
+        return {'cuadernos': {'c': [{'url': url, 'huella': huella} for url, huella in semanas]}}
+
+    diferencias = comparar_manifiestos(manifiesto(('a', '1'), ('b', '1')), manifiesto(('b', '2'), ('c', '1')))
+    assert diferencias['semanas_nuevas'] == ['c']
+    assert diferencias['semanas_eliminadas'] == ['a']
+    assert diferencias['semanas_cambiadas'] == ['b']
+    assert diferencias['cuadernos_nuevos'] == diferencias['cuadernos_eliminados'] == []
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from utils.exportacion import COLUMNAS_CSV, exportar, leer_jsonl
+from test_template_generator import DATOS
+
+REGISTROS = [('2026-5-11-de-enero', {'url': 'https://www.jw.org/es/x', 'fecha_extraccion': 'ayer', 'datos': DATOS})]
+
+def test_jsonl_una_linea_por_semana_y_se_relee(tmp_path):
+    ruta = tmp_path / 'semanas.jsonl'
+    ruta.write_text(''.join(exportar(REGISTROS, 'jsonl')), encoding='utf-8')
+    lineas = ruta.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(linea)['semana_id'] for linea in lineas] == [REGISTROS[0][0]]
+    semana_id, registro = REGISTROS[0]
+    assert list(leer_jsonl(str(ruta))) == [(semana_id, {'semana_id': semana_id, **registro})]
+
+def test_jsonl_filtrado_por_fechas(tmp_path):
+    ruta = tmp_path / 'semanas.jsonl'
+    ruta.write_text(''.join(exportar(REGISTROS, 'jsonl')), encoding='utf-8')
+    assert len(list(leer_jsonl(str(ruta), desde=date(2026, 1, 11)))) == 1
+    assert list(leer_jsonl(str(ruta), desde=date(2026, 1, 12))) == []
+    assert list(leer_jsonl(str(ruta), hasta=date(2026, 1, 4))) == []
+
+def test_csv_una_fila_por_parte_y_un_bloque_por_semana():
+    bloques = list(exportar(REGISTROS * 2, 'csv'))
+    assert len(bloques) == 3  # Cabecera + un bloque por semana
+    filas = list(csv.reader(io.StringIO(''.join(bloques))))
+    assert tuple(filas[0]) == COLUMNAS_CSV
+    partes = sum(len(DATOS[s]) for s in ('tesoros_biblia', 'seamos_maestros', 'vida_cristiana'))
+    assert len(filas) == 1 + 2 * partes
+    assert filas[1][COLUMNAS_CSV.index('cancion_inicial')] == '1'
+
+def test_formato_desconocido():
+    with pytest.raises(ValueError):
+        exportar(REGISTROS, 'xml')
@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import extraccion_paralela, jw_scraper
+from utils.extraccion_paralela import extraer_con_plazo, extraer_semana_en_pool
+from utils.plazo import acotar
+from utils.proteccion import RespaldoLRU, ServicioNoDisponibleError
+
+def _tarea(lentas=(), fallidas=()):
+    def tarea(url):
+        if url in fallidas:
+            raise ValueError('sin datos')
+        if url in lentas:
+            # Como una descarga: espera acotada al plazo y falla si ya venció
+            time.sleep(acotar(0.5))
+            acotar(1)
+        return {'fecha': url}
+    return tarea
+
+def test_devuelve_lo_terminado_en_orden_y_los_errores():
+    resultados, pendientes = extraer_con_plazo(['a', 'b', 'c'], _tarea(fallidas={'b'}), segundos=2)
+    assert [r['url'] for r in resultados] == ['a', 'b', 'c']
+    assert resultados[1]['error'] == 'sin datos' and resultados[2]['datos'] == {'fecha': 'c'}
+    assert pendientes == []
+
+def test_al_vencer_el_plazo_lo_lento_queda_pendiente():
+    inicio = time.monotonic()
+    resultados, pendientes = extraer_con_plazo(['rapida', 'lenta'], _tarea(lentas={'lenta'}), segundos=0.1)
+    assert time.monotonic() - inicio < 0.4
+    assert [r['url'] for r in resultados] == ['rapida']
+    assert pendientes == ['lenta']
+
+def test_con_continuar_lo_pendiente_termina_en_segundo_plano(monkeypatch):
+    monkeypatch.setattr(extraccion_paralela, 'PLAZO_SEGUNDO_PLANO', 2)
+    terminadas = []
+    listo = threading.Event()
+
+    def al_terminar(resultado):
+        terminadas.append(resultado['url'])
+        if resultado['url'] == 'lenta':
+            listo.set()
+
+    _, pendientes = extraer_con_plazo(['rapida', 'lenta'], _tarea(lentas={'lenta'}), segundos=0.1,
+                                      continuar=True, al_terminar=al_terminar)
+    assert pendientes == ['lenta']
+    assert listo.wait(2)
+    assert sorted(terminadas) == ['lenta', 'rapida']
+
+@pytest.fixture
+def pool_en_hilos(monkeypatch):
+    """El pool de procesos sustituido por hilos; el respaldo, vacío."""
+    hilos = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(extraccion_paralela, 'obtener_pool', lambda procesos=None: hilos)
+    monkeypatch.setattr(extraccion_paralela, '_analizar', lambda html, url: {'fecha': html.decode()})
+    monkeypatch.setattr(jw_scraper, '_respaldo', RespaldoLRU())
+    yield
+    hilos.shutdown()
+
+def test_en_el_pool_las_descargas_repetidas_se_coalescen(monkeypatch, pool_en_hilos):
+    descargas = []
+
+    def descargar(url):
+        descargas.append(url)
+        time.sleep(0.2)
+        return b'5-11 ENERO'
+
+    monkeypatch.setattr(jw_scraper, '_descargar_html', descargar)
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(extraer_semana_en_pool('u'))) for _ in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert descargas == ['u']
+    assert resultados == [{'fecha': '5-11 ENERO'}] * 3
+
+def test_en_el_pool_el_origen_caido_sirve_la_copia_anterior(monkeypatch, pool_en_hilos):
+    jw_scraper._respaldo.guardar(('semana', 'u'), {'fecha': 'anterior'})
+
+    def descargar(url):
+        raise ServicioNoDisponibleError('caído')
+
+    monkeypatch.setattr(jw_scraper, '_descargar_html', descargar)
+    assert extraer_semana_en_pool('u') == {'fecha': 'anterior'}
@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from utils.fechas import IndiceFechas, cuaderno_desde_url, fechas_semana, parsear_rango_semana
+
+ES = 'https://www.jw.org/es/biblioteca/guia-actividades-reunion-testigos-jehova/{}/'
+
+@pytest.mark.parametrize('titulo, url, esperado', [
+    ('3-9 DE NOVIEMBRE', ES.format('noviembre-diciembre-2025-mwb'), (date(2025, 11, 3), date(2025, 11, 9))),
+    # Semana de diciembre al principio del cuaderno enero-febrero: año anterior
+    ('29 DE DICIEMBRE–4 DE ENERO', ES.format('enero-febrero-2026-mwb'), (date(2025, 12, 29), date(2026, 1, 4))),
+    ('29 de diciembre de 2025–4 de enero de 2026', None, (date(2025, 12, 29), date(2026, 1, 4))),
+    ('November 3-9', 'https://www.jw.org/en/library/jw-meeting-workbook/november-december-2025-mwb/',
+     (date(2025, 11, 3), date(2025, 11, 9))),
+    ('3-9 DE NOVEMBRO', 'https://www.jw.org/pt/biblioteca/apostila-reuniao-vida-ministerio/novembro-dezembro-2025-mwb/',
+     (date(2025, 11, 3), date(2025, 11, 9))),
+])
+def test_fechas_semana(titulo, url, esperado):
+    assert fechas_semana(titulo, url) == esperado
+
+def test_titulo_sin_fecha():
+    assert parsear_rango_semana('Programa de la reunión') is None
+    assert parsear_rango_semana('31-37 DE NOVIEMBRE', anio_base=2025) is None
+
+def test_cuaderno_desde_url():
+    assert cuaderno_desde_url(ES.format('Enero-Febrero-2026-mwb') + 'semana') == 'enero-febrero-2026-mwb'
+    assert cuaderno_desde_url('https://www.jw.org/es/') is None
+
+def test_indice_rango_y_quitar():
+    indice = IndiceFechas()
+    indice.agregar('b', date(2026, 1, 12), date(2026, 1, 18))
+    indice.agregar('a', date(2026, 1, 5), date(2026, 1, 11))
+    indice.agregar('sin-fecha')
+    assert indice.rango(desde=date(2026, 1, 10)) == ['a', 'b']
+    assert indice.rango(hasta=date(2026, 1, 11)) == ['a']
+    indice.quitar('a')
+    assert 'a' not in indice and indice.actual(date(2026, 1, 14)) == 'b'
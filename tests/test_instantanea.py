@@ -0,0 +1,55 @@
+from utils.almacen import AlmacenSemanas
+from utils.instantanea import CargaInicial, exportar_instantanea, importar_instantanea
+from utils.proteccion import RespaldoLRU
+
+def _origen():
+    almacen = AlmacenSemanas()
+    almacen.guardar('semana-1', {'fecha': '5-11 DE ENERO', 'fecha_inicio': '2026-01-05',
+                                 'fecha_fin': '2026-01-11'}, 'https://www.jw.org/es/x')
+    respaldo = RespaldoLRU()
+    respaldo.guardar(('semana', 'https://www.jw.org/es/x'), {'fecha': '5-11 DE ENERO'})
+    return almacen, respaldo
+
+def test_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / 'instantanea.json.gz')
+    almacen, respaldo = _origen()
+    assert exportar_instantanea(ruta, almacen, respaldo, 'v1')['semanas'] == 1
+
+    destino, respaldo_destino = AlmacenSemanas(), RespaldoLRU()
+    resumen = importar_instantanea(ruta, destino, respaldo_destino, 'v1')
+    assert resumen['semanas'] == 1 and resumen['respaldo'] == 1 and resumen['completa']
+    assert destino['semana-1'] == almacen['semana-1']
+    assert respaldo_destino.obtener(('semana', 'https://www.jw.org/es/x')) == {'fecha': '5-11 DE ENERO'}
+
+def test_otra_version_del_extractor_solo_aporta_semanas(tmp_path):
+    ruta = str(tmp_path / 'instantanea.json.gz')
+    exportar_instantanea(ruta, *_origen(), 'v1')
+    resumen = importar_instantanea(ruta, AlmacenSemanas(), RespaldoLRU(), 'v2')
+    assert resumen['semanas'] == 1 and resumen['respaldo'] == 0
+
+def test_presupuesto_agotado_deja_la_carga_incompleta(tmp_path):
+    ruta = str(tmp_path / 'instantanea.json.gz')
+    exportar_instantanea(ruta, *_origen(), 'v1')
+    resumen = importar_instantanea(ruta, AlmacenSemanas(), RespaldoLRU(), 'v1', presupuesto=-1)
+    assert not resumen['completa'] and resumen['semanas'] == 0
+
+def test_carga_inicial_en_segundo_plano(tmp_path):
+    ruta = str(tmp_path / 'instantanea.json.gz')
+    exportar_instantanea(ruta, *_origen(), 'v1')
+    carga, destino = CargaInicial(), AlmacenSemanas()
+    carga.iniciar(destino, RespaldoLRU(), 'v1', ruta=ruta)
+    assert carga.listo.wait(5)
+    assert carga.resumen['estado'] == 'cargada' and 'semana-1' in destino
+
+def test_sin_archivo_esta_lista_al_momento(tmp_path):
+    carga = CargaInicial()
+    carga.iniciar(AlmacenSemanas(), RespaldoLRU(), 'v1', ruta=str(tmp_path / 'no-existe'))
+    assert carga.esta_listo() and carga.resumen['estado'] == 'sin_instantanea'
+
+def test_archivo_corrupto_queda_como_error(tmp_path):
+    ruta = tmp_path / 'instantanea.json.gz'
+    ruta.write_bytes(b'no es gzip')
+    carga = CargaInicial()
+    carga.iniciar(AlmacenSemanas(), RespaldoLRU(), 'v1', ruta=str(ruta))
+    assert carga.listo.wait(5)
+    assert carga.resumen['estado'] == 'error'
@@ -0,0 +1,114 @@
+import pytest
+
+from utils import jw_scraper
+from utils.proteccion import RespaldoLRU, ServicioNoDisponibleError
+
+def _contador(valor):
+    llamadas = []
+
+    def funcion(_url):
+        llamadas.append(1)
+        if isinstance(valor, Exception):
+            raise valor
+        return valor
+    return funcion, llamadas
+
+def test_por_defecto_siempre_se_descarga(monkeypatch):
+    monkeypatch.setattr(jw_scraper, '_respaldo', RespaldoLRU())
+    monkeypatch.setattr(jw_scraper, 'FRESCURA', 0)
+    jw_scraper._respaldo.guardar(('semana', 'u'), {'fecha': 'antigua'})
+    funcion, llamadas = _contador({'fecha': 'corregida'})
+    assert jw_scraper._con_respaldo(('semana', 'u'), funcion, 'u') == {'fecha': 'corregida'}
+    assert llamadas == [1]
+
+def test_con_frescura_se_sirve_el_resultado_reciente(monkeypatch):
+    monkeypatch.setattr(jw_scraper, '_respaldo', RespaldoLRU())
+    monkeypatch.setattr(jw_scraper, 'FRESCURA', 3600)
+    jw_scraper._respaldo.guardar(('semana', 'u'), {'fecha': 'guardada'})
+    funcion, llamadas = _contador({'fecha': 'nueva'})
+    assert jw_scraper._con_respaldo(('semana', 'u'), funcion, 'u') == {'fecha': 'guardada'}
+    assert llamadas == []
+
+def test_origen_caido_sirve_la_copia_anterior(monkeypatch):
+    monkeypatch.setattr(jw_scraper, '_respaldo', RespaldoLRU())
+    monkeypatch.setattr(jw_scraper, 'FRESCURA', 0)
+    jw_scraper._respaldo.guardar(('semana', 'u'), {'fecha': 'anterior'})
+    funcion, _ = _contador(ServicioNoDisponibleError('caído'))
+    assert jw_scraper._con_respaldo(('semana', 'u'), funcion, 'u') == {'fecha': 'anterior'}
+
+class _RespuestaEnTrozos:
+    """Respuesta en flujo falsa: cuenta los trozos leídos y si se cerró."""
+
+    def __init__(self, trozos):
+        self.trozos = trozos
+        self.encoding = 'utf-8'
+        self.leidos = 0
+        self.cerrada = False
+
+    def iter_content(self, _tamano):
+        for trozo in self.trozos:
+            self.leidos += 1
+            yield trozo
+
+    def close(self):
+        self.cerrada = True
+
+def _principal(monkeypatch, trozos, **opciones):
+    respuesta = _RespuestaEnTrozos(trozos)
+    monkeypatch.setattr(jw_scraper, '_descargar', lambda url, flujo=False: respuesta)
+    return jw_scraper._descargar_principal('u', **opciones), respuesta
+
+def test_se_deja_de_leer_al_cerrarse_main(monkeypatch):
+    # 'í' partida entre dos trozos: el decodificador incremental la recompone
+    trozos = [b'<html><main><p>Is\xc3', b'\xadas 40</p>', b'</main>', b'<footer>', b'</html>']
+    contenido, respuesta = _principal(monkeypatch, trozos)
+    assert contenido == b''.join(trozos[:3])
+    assert respuesta.leidos == 3 and respuesta.cerrada
+
+def test_un_main_anidado_no_corta_antes_de_tiempo(monkeypatch):
+    trozos = [b'<main><main>a</main>', b'b</main>', b'<footer>']
+    contenido, respuesta = _principal(monkeypatch, trozos)
+    assert contenido.endswith(b'b</main>') and respuesta.leidos == 2
+
+def test_sin_main_se_corta_en_el_presupuesto(monkeypatch):
+    trozos = [b'x' * 10] * 5
+    contenido, respuesta = _principal(monkeypatch, trozos, presupuesto=25)
+    assert contenido == b'x' * 25
+    assert respuesta.leidos == 3 and respuesta.cerrada
+
+@pytest.fixture
+def circuito_semiabierto(monkeypatch):
+    """Host con el circuito ya abierto y listo para su petición de prueba."""
+    from utils.proteccion import Cortacircuitos, ProteccionHost
+
+    proteccion = ProteccionHost()
+    proteccion.circuito = Cortacircuitos(umbral=1, tiempo_abierto=0)
+    proteccion.circuito.registrar_fallo()
+    monkeypatch.setattr(jw_scraper, 'obtener_proteccion', lambda host: proteccion)
+    return proteccion
+
+def test_plazo_agotado_en_la_prueba_no_bloquea_el_circuito(monkeypatch, circuito_semiabierto):
+    import time
+
+    import requests
+    from utils.plazo import Plazo, PlazoVencidoError, con_plazo
+
+    def host_lento(*args, **kwargs):
+        time.sleep(0.15)
+        raise requests.ReadTimeout('lento')
+
+    monkeypatch.setattr(jw_scraper.requests, 'get', host_lento)
+    with pytest.raises(PlazoVencidoError), con_plazo(Plazo(0.1)):
+        jw_scraper._descargar('https://www.jw.org/es/x')
+    # Ni éxito ni fallo: sigue semiabierto y la siguiente petición puede probar
+    assert circuito_semiabierto.circuito.estado == 'semiabierto'
+    assert circuito_semiabierto.antes_de_pedir()
+
+def test_error_inesperado_en_la_prueba_la_libera(monkeypatch, circuito_semiabierto):
+    def roto(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(jw_scraper.requests, 'get', roto)
+    with pytest.raises(KeyboardInterrupt):
+        jw_scraper._descargar('https://www.jw.org/es/x')
+    assert circuito_semiabierto.antes_de_pedir()
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.jw_scraper import extraer_lectura_biblica
+from utils.locales import IDIOMA_POR_DEFECTO, idioma_desde_url, obtener_paquete, paquete_desde_url
+
+@pytest.mark.parametrize('url, idioma', [
+    ('https://www.jw.org/en/library/jw-meeting-workbook/', 'en'),
+    ('https://www.jw.org/PT/biblioteca/', 'pt'),
+    ('https://www.jw.org/xx/algo/', IDIOMA_POR_DEFECTO),
+    ('', IDIOMA_POR_DEFECTO),
+])
+def test_idioma_desde_url(url, idioma):
+    assert idioma_desde_url(url) == idioma
+
+def test_el_paquete_se_compila_una_vez():
+    assert obtener_paquete('en') is paquete_desde_url('https://www.jw.org/en/x')
+    assert obtener_paquete('xx') is obtener_paquete(IDIOMA_POR_DEFECTO)
+
+@pytest.mark.parametrize('idioma, texto, cancion', [
+    ('es', 'Canción 12 y oración', '12'),
+    ('en', 'Song 45 and Prayer', '45'),
+])
+def test_patron_de_cancion(idioma, texto, cancion):
+    assert obtener_paquete(idioma).cancion.search(texto).group(1) == cancion
+
+def test_roles_por_palabras_clave():
+    roles = dict(obtener_paquete('es').roles)
+    assert roles['Estudiante:'].search('Lectura de la Biblia')
+    assert not roles['Estudiante:'].search('Lectura de la revista')
+
+def test_lectura_con_varios_libros_gana_el_orden_de_la_lista():
+    # Como antes de los paquetes: se prueba libro a libro, no el primero del texto
+    contenido = 'Lectura: MATEO 5:1-12\nRepaso: ECLESIASTÉS 3:1–8'
+    assert extraer_lectura_biblica(contenido) == 'ECLESIASTÉS 3:1–8'
+    assert extraer_lectura_biblica('ISAÍAS 40 y LUCAS 2') == 'ISAÍAS 40'
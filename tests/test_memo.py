@@ -0,0 +1,34 @@
+from utils.memo import MemoContenido
+
+def test_acierto_devuelve_una_copia(tmp_path):
+    memo = MemoContenido('v1', ruta=str(tmp_path / 'memo.sqlite3'))
+    clave = memo.clave(b'<main>a</main>', 'u')
+    assert memo.obtener(clave) is None
+    memo.guardar(clave, {'partes': [1]})
+    copia = memo.obtener(clave)
+    copia['partes'].append(2)
+    assert memo.obtener(clave) == {'partes': [1]}
+
+def test_la_clave_depende_del_cuerpo_la_url_y_la_version():
+    memo = MemoContenido('v1', ruta=None)
+    clave = memo.clave(b'cuerpo', 'u')
+    assert clave != memo.clave(b'otro', 'u')
+    assert clave != memo.clave(b'cuerpo', 'v')
+    assert clave != MemoContenido('v2', ruta=None).clave(b'cuerpo', 'u')
+
+def test_el_disco_sobrevive_al_proceso_pero_no_a_otra_version(tmp_path):
+    ruta = str(tmp_path / 'memo.sqlite3')
+    memo = MemoContenido('v1', ruta=ruta)
+    clave = memo.clave(b'cuerpo', 'u')
+    memo.guardar(clave, {'fecha': 'x'})
+
+    assert MemoContenido('v1', ruta=ruta).obtener(clave) == {'fecha': 'x'}
+    assert MemoContenido('v2', ruta=ruta).obtener(clave) is None
+    assert MemoContenido('v1', ruta=ruta).obtener(clave) is None  # v2 borró lo de v1
+
+def test_lru_en_memoria_acotada():
+    memo = MemoContenido('v1', ruta=None, max_memoria=2)
+    for i in range(3):
+        memo.guardar(str(i), {'i': i})
+    assert memo.obtener('0') is None
+    assert memo.obtener('2') == {'i': 2}
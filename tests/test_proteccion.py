@@ -0,0 +1,52 @@
+import pytest
+
+from utils.proteccion import Cortacircuitos, LimitadorTasa, ProteccionHost, RespaldoLRU, ServicioNoDisponibleError
+
+def test_circuito_se_abre_tras_el_umbral():
+    circuito = Cortacircuitos(umbral=2, tiempo_abierto=60)
+    circuito.registrar_fallo()
+    circuito.permitir()
+    circuito.registrar_fallo()
+    assert circuito.estado == Cortacircuitos.ABIERTO
+    with pytest.raises(ServicioNoDisponibleError):
+        circuito.permitir()
+
+def test_semiabierto_deja_pasar_una_sola_prueba():
+    circuito = Cortacircuitos(umbral=1, tiempo_abierto=0)
+    circuito.registrar_fallo()
+    circuito.permitir()
+    assert circuito.estado == Cortacircuitos.SEMIABIERTO
+    with pytest.raises(ServicioNoDisponibleError):
+        circuito.permitir()
+    circuito.registrar_exito()
+    assert circuito.estado == Cortacircuitos.CERRADO
+
+def test_sin_ficha_no_queda_una_prueba_en_curso():
+    proteccion = ProteccionHost()
+    proteccion.circuito = Cortacircuitos(umbral=1, tiempo_abierto=0)
+    proteccion.circuito.registrar_fallo()
+    # Retry-After más largo que la espera máxima: no hay turno
+    proteccion.limitador.frenar(reintentar_en=60)
+    with pytest.raises(ServicioNoDisponibleError):
+        proteccion.antes_de_pedir()
+
+    # Pasada la pausa, la petición de prueba sigue disponible
+    proteccion.limitador = LimitadorTasa()
+    proteccion.antes_de_pedir()
+    assert proteccion.circuito.estado == Cortacircuitos.SEMIABIERTO
+
+def test_limitador_rechaza_si_la_espera_supera_el_maximo():
+    limitador = LimitadorTasa(tasa=1, capacidad=1)
+    limitador.adquirir()
+    with pytest.raises(ServicioNoDisponibleError):
+        limitador.adquirir(espera_maxima=0.1)
+
+def test_respaldo_desaloja_el_mas_antiguo_y_respeta_la_edad():
+    respaldo = RespaldoLRU(tamano=2)
+    respaldo.guardar('a', 1)
+    respaldo.guardar('b', 2, instante=1.0)
+    respaldo.guardar('c', 3)
+    assert respaldo.obtener('a') is None
+    assert respaldo.obtener('b') == 2
+    assert respaldo.obtener('b', max_edad=60) is None
+    assert respaldo.obtener('c', max_edad=60) == 3
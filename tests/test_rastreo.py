@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from utils import rastreo
+from utils.proteccion import LimitadorTasa, ProteccionHost
+
+def _descargar(motor, respuestas, urls_relativas):
+    """Descarga con el motor contra un servidor local que responde ``respuestas`` en orden."""
+    async def manejador(request):
+        estado = respuestas.pop(0) if respuestas else 200
+        return web.Response(status=estado, text='<main>ok</main>', headers={'Retry-After': '0'})
+
+    async def ejecutar():
+        app = web.Application()
+        app.router.add_get('/{ruta:.*}', manejador)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        sitio = web.TCPSite(runner, '127.0.0.1', 0)
+        await sitio.start()
+        puerto = runner.addresses[0][1]
+        try:
+            async with aiohttp.ClientSession() as sesion:
+                return await asyncio.gather(*(
+                    motor._descargar_red(sesion, f'http://127.0.0.1:{puerto}/{ruta}')
+                    for ruta in urls_relativas
+                ))
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(ejecutar())
+
+def test_cada_peticion_toma_una_ficha_del_limitador(monkeypatch):
+    proteccion = ProteccionHost()
+    proteccion.limitador = LimitadorTasa(tasa=20, capacidad=1)
+    monkeypatch.setattr(rastreo, 'obtener_proteccion', lambda host: proteccion)
+    motor = rastreo.MotorRastreo(por_host=8, cortesia=0)
+
+    inicio = time.monotonic()
+    contenidos = _descargar(motor, [], [f's{i}' for i in range(5)])
+    assert contenidos == [b'<main>ok</main>'] * 5
+    # Una ficha inicial y luego 20 por segundo: las otras cuatro esperan ~0.2 s
+    assert time.monotonic() - inicio >= 0.18
+
+def test_un_429_frena_el_limitador_compartido(monkeypatch):
+    proteccion = ProteccionHost()
+    monkeypatch.setattr(rastreo, 'obtener_proteccion', lambda host: proteccion)
+    motor = rastreo.MotorRastreo(cortesia=0)
+
+    assert _descargar(motor, [429], ['semana']) == [b'<main>ok</main>']
+    assert proteccion.limitador.tasa < proteccion.limitador.tasa_base
+
+def test_valores_por_defecto_no_superan_la_tasa_del_limitador():
+    from utils.proteccion import TASA_PETICIONES
+    assert 1 / rastreo.CORTESIA <= TASA_PETICIONES
+    assert rastreo.POR_HOST <= 8
+
+def _semiabierto(monkeypatch):
+    from utils.proteccion import Cortacircuitos
+
+    proteccion = ProteccionHost()
+    proteccion.circuito = Cortacircuitos(umbral=1, tiempo_abierto=0)
+    proteccion.circuito.registrar_fallo()
+    monkeypatch.setattr(rastreo, 'obtener_proteccion', lambda host: proteccion)
+    return proteccion
+
+class _SesionFalsa:
+    """Sesión cuyo get falla con ``error`` o se queda colgado si es None."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def get(self, url, **kwargs):
+        sesion = self
+
+        class _Peticion:
+            async def __aenter__(self):
+                if sesion.error:
+                    raise sesion.error
+                await asyncio.sleep(10)
+
+            async def __aexit__(self, *exc):
+                return False
+        return _Peticion()
+
+def test_error_inesperado_libera_la_prueba(monkeypatch):
+    proteccion = _semiabierto(monkeypatch)
+    motor = rastreo.MotorRastreo(cortesia=0)
+    with pytest.raises(aiohttp.InvalidURL):
+        asyncio.run(motor._descargar_red(_SesionFalsa(aiohttp.InvalidURL('x')), 'http://h/x'))
+    assert proteccion.circuito.estado == 'semiabierto'
+    assert proteccion.circuito.permitir()
+
+def test_cancelar_el_rastreo_libera_la_prueba(monkeypatch):
+    proteccion = _semiabierto(monkeypatch)
+    motor = rastreo.MotorRastreo(cortesia=0)
+
+    async def cancelar():
+        tarea = asyncio.create_task(motor._descargar_red(_SesionFalsa(), 'http://h/x'))
+        await asyncio.sleep(0.05)
+        tarea.cancel()
+        try:
+            await tarea
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancelar())
+    assert proteccion.circuito.permitir()
+
+def test_cuerpo_cortado_cuenta_como_fallo(monkeypatch):
+    proteccion = _semiabierto(monkeypatch)
+    monkeypatch.setattr(rastreo.jw_scraper, 'MAX_REINTENTOS', 1)
+    motor = rastreo.MotorRastreo(cortesia=0)
+    with pytest.raises(aiohttp.ClientPayloadError):
+        asyncio.run(motor._descargar_red(_SesionFalsa(aiohttp.ClientPayloadError('cortado')), 'http://h/x'))
+    assert proteccion.circuito.estado == 'abierto'
@@ -0,0 +1,55 @@
+import json
+import logging
+
+import pytest
+
+from utils.registro import FormatoJSON, FormatoTexto, etapa, log
+
+class _Captura(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append(record)
+
+@pytest.fixture
+def captura():
+    manejador = _Captura()
+    nivel = log.level
+    log.addHandler(manejador)
+    log.setLevel(logging.INFO)
+    yield manejador.registros
+    log.removeHandler(manejador)
+    log.setLevel(nivel)
+
+def _registro(**extra):
+    record = logging.LogRecord('jw', logging.INFO, __file__, 1, 'hola %s', ('mundo',), None)
+    record.__dict__.update(extra)
+    return record
+
+def test_formato_json_con_campos_extra():
+    datos = json.loads(FormatoJSON().format(_registro(id_peticion='abc', semanas=3)))
+    assert datos['mensaje'] == 'hola mundo' and datos['nivel'] == 'INFO'
+    assert datos['id_peticion'] == 'abc' and datos['semanas'] == 3
+
+def test_formato_texto():
+    assert FormatoTexto().format(_registro(id_peticion='abc', duracion_ms=1.5)) == '[abc] hola mundo (1.5 ms)'
+
+def test_etapa_registra_duracion_y_campos(captura):
+    with etapa('plantilla', modo='cdn') as campos:
+        campos['bytes'] = 10
+    registro, = captura
+    assert registro.etapa == 'plantilla' and registro.ok and registro.bytes == 10
+    assert registro.duracion_ms >= 0
+
+def test_etapa_con_error_se_registra_y_propaga(captura):
+    with pytest.raises(KeyError):
+        with etapa('extraer'):
+            raise KeyError('x')
+    assert captura[0].ok is False
+
+def test_id_de_peticion_se_devuelve(cliente, captura):
+    respuesta = cliente.get('/api/semana-actual', headers={'X-Request-ID': 'prueba-123'})
+    assert respuesta.headers['X-Request-ID'] == 'prueba-123'
+    assert any(getattr(r, 'ruta', None) == '/api/semana-actual' and r.estado == respuesta.status_code for r in captura)
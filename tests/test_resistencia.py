@@ -0,0 +1,30 @@
+import pytest
+
+from utils.archivo import ArchivoRespuestas
+from utils.resistencia import prueba_resistencia, rss_mb
+
+def _archivo(tmp_path, paginas):
+    ruta = str(tmp_path / 'respuestas.jwa')
+    archivo = ArchivoRespuestas(ruta, escritura=True)
+    for url, html in paginas.items():
+        archivo.guardar(url, html)
+    archivo.cerrar()
+    return ruta
+
+def test_rss_disponible():
+    assert rss_mb() > 0
+
+def test_archivo_vacio(tmp_path):
+    with pytest.raises(ValueError, match='no tiene respuestas'):
+        prueba_resistencia(_archivo(tmp_path, {}), ciclos=1, calentamiento=1, trazar=False)
+
+def test_resumen_de_una_prueba_corta(tmp_path):
+    html = '<html><main><h1>5-11 DE ENERO</h1><p>ISAÍAS 40</p></main></html>'.encode('utf-8')
+    ruta = _archivo(tmp_path, {'https://www.jw.org/es/semana/': html})
+    muestras = []
+    resumen = prueba_resistencia(ruta, ciclos=4, calentamiento=1, presupuesto_mb=1024, top=3,
+                                 al_muestrear=lambda hechos, rss: muestras.append(hechos))
+    assert resumen['ciclos'] == 4 and resumen['semanas'] == 1
+    assert not resumen['superado']
+    assert len(resumen['sitios']) <= 3
+    assert muestras == [1, 2, 3, 4]
@@ -0,0 +1,139 @@
+import pytest
+
+@pytest.mark.parametrize('plazo', ['mucho', None, [], 0, -5])
+def test_extraer_multiples_rechaza_un_plazo_invalido(cliente, plazo):
+    respuesta = cliente.post('/api/extraer-multiples', json={'urls': ['https://www.jw.org/es/x'], 'plazo': plazo})
+    assert respuesta.status_code == 400
+
+def test_plantilla_sin_html2canvas_responde_503(cliente, monkeypatch, tmp_path):
+    import routes
+    from utils import template_generator as tg
+    from test_template_generator import DATOS
+
+    monkeypatch.setattr(tg, 'RUTA_HTML2CANVAS', str(tmp_path / tg.NOMBRE_HTML2CANVAS))
+    monkeypatch.setattr(tg, '_html2canvas', None)
+    routes.datos_extraidos.guardar('semana-503', DATOS, 'https://www.jw.org/es/x')
+    respuesta = cliente.get('/api/descargar-plantilla/semana-503?modo=autonomo')
+    assert respuesta.status_code == 503
+    assert 'preparar-recursos' in respuesta.get_json()['error']
+    assert cliente.get('/api/descargar-plantilla/semana-503?modo=cdn').status_code == 200
+
+def test_plantilla_guardada_y_podada_antes_de_enviarse(cliente, monkeypatch, tmp_path):
+    import routes
+    from utils.artefactos import AlmacenArtefactos
+    from test_template_generator import DATOS
+
+    almacen = AlmacenArtefactos(str(tmp_path))
+    guardar = almacen.guardar
+
+    def guardar_y_podar(*args, **kwargs):
+        artefacto = guardar(*args, **kwargs)
+        almacen.max_bytes = 0
+        almacen.podar()  # Otra petición poda entre el guardado y el envío
+        return artefacto
+
+    monkeypatch.setattr(almacen, 'guardar', guardar_y_podar)
+    monkeypatch.setattr(routes, 'artefactos', almacen)
+    routes.datos_extraidos.guardar('semana-podada', DATOS, 'https://www.jw.org/es/x')
+    respuesta = cliente.get('/api/descargar-plantilla/semana-podada?modo=cdn&guardar=1')
+    assert respuesta.status_code == 200
+    assert b'<html' in respuesta.data.lower()
+    assert 'attachment' in respuesta.headers['Content-Disposition']
+
+def test_listado_por_cursor(cliente):
+    from datetime import date, timedelta
+
+    import routes
+    from test_almacen import _semana
+
+    for i in range(5):
+        lunes = date(2027, 1, 4) + timedelta(weeks=i)
+        routes.datos_extraidos.guardar(*_semana(lunes, cuaderno='enero-febrero-2027-mwb'))
+    ids, cursor = [], None
+    while True:
+        consulta = '/api/datos?cuaderno=enero-febrero-2027-mwb&limite=2' + (f'&cursor={cursor}' if cursor else '')
+        cuerpo = cliente.get(consulta).get_json()
+        ids.extend(s['semana_id'] for s in cuerpo['semanas'])
+        cursor = cuerpo['siguiente']
+        if not cursor:
+            break
+    assert ids == [f'semana-{date(2027, 1, 4) + timedelta(weeks=i)}' for i in range(5)]
+
+def test_listado_con_cursor_invalido_responde_400(cliente):
+    assert cliente.get('/api/datos?cursor=no-es-un-cursor').status_code == 400
+
+@pytest.fixture
+def perfiles(monkeypatch, tmp_path):
+    import routes
+    from utils.congregaciones import RegistroCongregaciones
+
+    registro = RegistroCongregaciones(str(tmp_path / 'congregaciones.json'))
+    monkeypatch.setattr(routes, 'congregaciones', registro)
+    return registro
+
+def test_perfiles_por_la_api(cliente, perfiles):
+    creado = cliente.post('/api/congregaciones', json={'nombre': 'Centro', 'hora_inicio': '7:30'})
+    assert creado.status_code == 201 and creado.get_json()['congregacion']['hora_inicio'] == '07:30'
+    assert cliente.post('/api/congregaciones', json={'nombre': 'Norte', 'hora_inicio': '25:00'}).status_code == 400
+    assert [p['id'] for p in cliente.get('/api/congregaciones').get_json()['congregaciones']] == ['centro']
+    assert cliente.delete('/api/congregaciones/centro').status_code == 200
+    assert cliente.delete('/api/congregaciones/centro').status_code == 404
+
+def test_lote_un_html_por_semana_y_congregacion(cliente, perfiles):
+    import io
+    import zipfile
+
+    import routes
+    from test_template_generator import DATOS
+
+    perfiles.guardar('Centro', '19:00')
+    perfiles.guardar('Norte', '18:30')
+    routes.datos_extraidos.guardar('semana-lote', DATOS, 'https://www.jw.org/es/x')
+    respuesta = cliente.post('/api/generar-lote', json={'semanas': ['semana-lote'], 'modo': 'cdn'})
+    assert respuesta.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(respuesta.data)) as zip_entrada:
+        assert sorted(zip_entrada.namelist()) == [
+            'centro/programa-semana-lote.html', 'norte/programa-semana-lote.html'
+        ]
+        norte = zip_entrada.read('norte/programa-semana-lote.html').decode('utf-8')
+    assert 'NORTE' in norte and '18:30' in norte
+
+def test_lote_sin_perfiles_ni_semanas(cliente, perfiles):
+    assert cliente.post('/api/generar-lote', json={}).status_code == 400
+    assert cliente.post('/api/generar-lote', json={'semanas': ['no-existe']}).status_code == 404
+
+@pytest.mark.parametrize('codificacion', ['identity', 'gzip'])
+def test_plantilla_en_flujo_igual_que_entera(cliente, codificacion):
+    import gzip
+
+    import routes
+    from utils.template_generator import generar_plantilla_editable
+    from test_template_generator import DATOS
+
+    routes.datos_extraidos.guardar('semana-flujo', DATOS, 'https://www.jw.org/es/x')
+    respuesta = cliente.get(
+        '/api/descargar-plantilla/semana-flujo?modo=cdn&congregacion=Centro&hora=18:00',
+        headers={'Accept-Encoding': codificacion}
+    )
+    assert respuesta.status_code == 200 and respuesta.is_streamed
+    assert 'programa-semana-flujo.html' in respuesta.headers['Content-Disposition']
+    cuerpo = gzip.decompress(respuesta.data) if codificacion == 'gzip' else respuesta.data
+    assert respuesta.headers.get('Content-Encoding') == (None if codificacion == 'identity' else 'gzip')
+    esperado = generar_plantilla_editable(
+        DATOS, 'Centro', modo='cdn', url_recursos='http://localhost', hora_inicio='18:00'
+    )
+    assert cuerpo.decode('utf-8') == esperado
+
+def test_plantilla_sin_modo_funciona_sin_copia_local(cliente, monkeypatch, tmp_path):
+    import routes
+    from utils import template_generator as tg
+    from test_template_generator import DATOS
+
+    monkeypatch.setattr(tg, 'RUTA_HTML2CANVAS', str(tmp_path / tg.NOMBRE_HTML2CANVAS))
+    monkeypatch.setattr(tg, '_html2canvas', None)
+    monkeypatch.setattr(routes, 'artefactos', routes.AlmacenArtefactos(str(tmp_path)))
+    routes.datos_extraidos.guardar('semana-por-defecto', DATOS, 'https://www.jw.org/es/x')
+    for consulta in ('', '?guardar=1'):
+        respuesta = cliente.get('/api/descargar-plantilla/semana-por-defecto' + consulta)
+        assert respuesta.status_code == 200
+        assert tg.URL_HTML2CANVAS_CDN.encode() in respuesta.data
@@ -0,0 +1,10 @@
+import pytest
+
+from utils import servidor
+from utils.almacen import AlmacenSemanas
+
+def test_grabar_con_varios_trabajadores_no_arranca(monkeypatch):
+    monkeypatch.setattr(servidor, 'BACKEND', 'grabar')
+    monkeypatch.setattr(servidor, 'precargar', lambda *a: pytest.fail('no debe precargar'))
+    with pytest.raises(RuntimeError, match='un solo trabajador'):
+        servidor.servir(None, AlmacenSemanas(), trabajadores=2)
@@ -0,0 +1,54 @@
+import pytest
+
+from utils import template_generator as tg
+
+def _parte(numero, duracion):
+    return {'numero': numero, 'titulo': f'Parte {numero}', 'duracion': duracion, 'rol': ''}
+
+DATOS = {
+    'fecha': '5-11 DE ENERO', 'fecha_inicio': '2026-01-05', 'fecha_fin': '2026-01-11',
+    'lectura_biblica': 'ISAÍAS 40', 'canciones': {'inicial': 1, 'intermedia': 2, 'final': 3},
+    'tesoros_biblia': [_parte(1, 10), _parte(2, 10), _parte(3, 4)],
+    'seamos_maestros': [_parte(4, 3), _parte(5, 4), _parte(6, 5)],
+    'vida_cristiana': [_parte(7, 15), _parte(8, 30)],
+}
+
+@pytest.fixture
+def sin_html2canvas(monkeypatch, tmp_path):
+    monkeypatch.setattr(tg, 'RUTA_HTML2CANVAS', str(tmp_path / tg.NOMBRE_HTML2CANVAS))
+    monkeypatch.setattr(tg, '_html2canvas', None)
+    monkeypatch.setattr(tg, '_cache_semanas', tg.RespaldoLRU(tg.TAMANO_CACHE_SEMANAS))
+    return tmp_path / tg.NOMBRE_HTML2CANVAS
+
+@pytest.mark.parametrize('modo', ['autonomo', 'servido'])
+def test_sin_copia_local_falla_en_lugar_de_usar_el_cdn(sin_html2canvas, modo):
+    with pytest.raises(tg.RecursoFaltanteError):
+        tg.generar_plantilla_editable(DATOS, 'Centro', modo=modo, url_recursos='http://h')
+
+def test_la_copia_local_se_usa_en_cuanto_aparece(sin_html2canvas):
+    with pytest.raises(tg.RecursoFaltanteError):
+        tg.generar_plantilla_editable(DATOS, 'Centro', modo='autonomo')
+    sin_html2canvas.write_text('/* html2canvas */ var x = "</script>";', encoding='utf-8')
+    html = tg.generar_plantilla_editable(DATOS, 'Centro', modo='autonomo')
+    assert '/* html2canvas */' in html
+    assert '<\\/script>' in html
+    assert tg.URL_HTML2CANVAS_CDN not in html
+
+def test_el_modo_cdn_no_necesita_copia_local(sin_html2canvas):
+    assert tg.URL_HTML2CANVAS_CDN in tg.generar_plantilla_editable(DATOS, 'Centro', modo='cdn')
+
+def test_por_partes_es_igual_que_entero():
+    completo = tg.generar_plantilla_editable(DATOS, 'Centro <x>', modo='cdn', hora_inicio='18:30')
+    partes = list(tg.generar_plantilla_por_partes(DATOS, 'Centro <x>', modo='cdn', hora_inicio='18:30'))
+    assert ''.join(partes) == completo
+    assert len(partes) == 5  # Cabecera, tres secciones y cierre
+    assert 'section-header' not in partes[0].split('</style>')[-1]
+    assert 'CENTRO &lt;X&gt;' in completo
+
+def test_horario_y_perfiles_comparten_la_compilacion():
+    plantilla = tg.compilar_semana(DATOS, 'cdn')
+    assert tg.compilar_semana(DATOS, 'cdn') is plantilla
+    siete = plantilla.renderizar('Centro', '19:00')
+    assert '19:00' in siete
+    assert '19:30' in plantilla.renderizar('Norte', '19:30')
+    assert tg.calcular_horario(DATOS['tesoros_biblia'], DATOS['seamos_maestros'], DATOS['vida_cristiana'])[0] == 0
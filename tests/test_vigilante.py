@@ -0,0 +1,89 @@
+import pytest
+
+from utils import vigilante as modulo
+from utils.almacen import AlmacenSemanas
+from utils.vigilante import Vigilante
+
+INDICE = 'https://www.jw.org/es/biblioteca/guia/enero-febrero-2026-mwb/'
+SEMANA = 'https://www.jw.org/es/biblioteca/guia/enero-febrero-2026-mwb/Vida-y-Ministerio-5-11-enero-2026/'
+
+@pytest.fixture
+def origen(monkeypatch):
+    """Índice y semanas falsos: ``respuestas`` decide qué devuelve cada llamada."""
+    respuestas = {'indice': [], 'semana': []}
+
+    def refrescar(url_indice, validadores):
+        return respuestas['indice'].pop(0)
+
+    def extraer(url):
+        resultado = respuestas['semana'].pop(0)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    monkeypatch.setattr(modulo.jw_scraper, 'refrescar_enlaces_semanas', refrescar)
+    monkeypatch.setattr(modulo.jw_scraper, 'extraer_datos_semana', extraer)
+    monkeypatch.setattr(modulo, 'compilar_semana', lambda datos, modo: None)
+    return respuestas
+
+def _datos():
+    return {'fecha': '5-11 DE ENERO', 'fecha_inicio': '2026-01-05', 'fecha_fin': '2026-01-11'}
+
+def test_una_semana_que_fallo_se_reintenta_con_un_304(origen, tmp_path):
+    vigilante = Vigilante([INDICE], ruta_estado=str(tmp_path / 'vigilante.json'))
+    almacen = AlmacenSemanas()
+    origen['indice'] = [([{'url': SEMANA}], {'ETag': '"1"'}), (None, {'ETag': '"1"'})]
+    origen['semana'] = [RuntimeError('circuito abierto'), _datos()]
+
+    assert vigilante.revisar(almacen) == []
+    assert len(vigilante.revisar(almacen)) == 1
+    assert len(almacen) == 1
+
+def test_el_estado_sobrevive_a_un_reinicio(origen, tmp_path):
+    ruta = str(tmp_path / 'vigilante.json')
+    origen['indice'] = [([{'url': SEMANA}], {'ETag': '"1"'})]
+    origen['semana'] = [_datos()]
+    Vigilante([INDICE], ruta_estado=ruta).revisar(AlmacenSemanas())
+
+    otro = Vigilante([INDICE], ruta_estado=ruta)
+    otro._cargar_estado()
+    assert otro._validadores[INDICE] == {'ETag': '"1"'}
+    assert otro._enlaces[INDICE] == [SEMANA]
+
+def test_tras_reiniciar_con_el_almacen_vacio_se_vuelve_a_extraer(origen, tmp_path):
+    ruta = str(tmp_path / 'vigilante.json')
+    origen['indice'] = [([{'url': SEMANA}], {'ETag': '"1"'}), (None, {'ETag': '"1"'})]
+    origen['semana'] = [_datos(), _datos()]
+    Vigilante([INDICE], ruta_estado=ruta).revisar(AlmacenSemanas())
+
+    otro, almacen = Vigilante([INDICE], ruta_estado=ruta), AlmacenSemanas()
+    otro._cargar_estado()
+    assert len(otro.revisar(almacen)) == 1
+    assert len(almacen) == 1
+
+def test_una_semana_que_ya_esta_en_el_almacen_no_se_extrae(origen, tmp_path):
+    almacen = AlmacenSemanas()
+    almacen.guardar('2026-01-05', _datos(), SEMANA)
+    origen['indice'] = [([{'url': SEMANA}], {'ETag': '"1"'})]
+
+    assert Vigilante([INDICE], ruta_estado=str(tmp_path / 'v.json')).revisar(almacen) == []
+
+@pytest.mark.parametrize('modo, compila', [('cdn', True), ('servido', False)])
+def test_solo_se_precompilan_modos_sin_url_de_la_peticion(origen, tmp_path, monkeypatch, modo, compila):
+    compiladas = []
+    monkeypatch.setattr(modulo, 'MODO_POR_DEFECTO', modo)
+    monkeypatch.setattr(modulo, 'compilar_semana', lambda datos, modo: compiladas.append(modo))
+    origen['indice'] = [([{'url': SEMANA}], {'ETag': '"1"'})]
+    origen['semana'] = [_datos()]
+
+    Vigilante([INDICE], ruta_estado=str(tmp_path / 'v.json')).revisar(AlmacenSemanas())
+    assert bool(compiladas) is compila
+
+@pytest.mark.skipif(modulo.fcntl is None, reason='sin fcntl no hay bloqueo entre procesos')
+def test_solo_un_vigilante_obtiene_el_bloqueo(tmp_path):
+    ruta = str(tmp_path / 'vigilante.json')
+    primero, segundo = Vigilante([INDICE], ruta_estado=ruta), Vigilante([INDICE], ruta_estado=ruta)
+    assert primero._tomar_bloqueo()
+    assert not segundo._tomar_bloqueo()
+    primero._bloqueo.close()
+    assert segundo._tomar_bloqueo()
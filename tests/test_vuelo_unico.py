@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from utils.jw_scraper import _plazo_ajeno
+from utils.plazo import Plazo, PlazoVencidoError, con_plazo
+from utils.vuelo_unico import VueloUnico
+
+def _seguidor(vuelos, clave, funcion, resultados, **kwargs):
+    def seguir():
+        try:
+            resultados.append(vuelos.ejecutar(clave, funcion, **kwargs))
+        except BaseException as e:
+            resultados.append(e)
+    hilo = threading.Thread(target=seguir)
+    hilo.start()
+    return hilo
+
+def test_llamadas_simultaneas_comparten_una_ejecucion():
+    vuelos = VueloUnico()
+    dentro, soltar = threading.Event(), threading.Event()
+    llamadas = []
+
+    def funcion():
+        llamadas.append(1)
+        dentro.set()
+        soltar.wait(5)
+        return {'valor': 1}
+
+    resultados = []
+    lider = _seguidor(vuelos, 'k', funcion, resultados)
+    assert dentro.wait(5)
+    seguidor = _seguidor(vuelos, 'k', funcion, resultados)
+    while not vuelos.en_curso():
+        pass
+    soltar.set()
+    lider.join(5)
+    seguidor.join(5)
+    assert len(llamadas) == 1
+    assert resultados == [{'valor': 1}, {'valor': 1}]
+    assert resultados[0] is not resultados[1]
+
+def test_el_plazo_del_lider_no_alcanza_a_un_seguidor_sin_plazo():
+    vuelos = VueloUnico()
+    dentro, soltar = threading.Event(), threading.Event()
+    llamadas = []
+
+    def funcion():
+        llamadas.append(1)
+        if len(llamadas) == 1:
+            dentro.set()
+            soltar.wait(5)
+            raise PlazoVencidoError('plazo del lote agotado')
+        return 'datos'
+
+    resultados_lider, resultados_seguidor = [], []
+    lider = _seguidor(vuelos, 'k', funcion, resultados_lider, reintentar_si=_plazo_ajeno)
+    assert dentro.wait(5)
+    seguidor = _seguidor(vuelos, 'k', funcion, resultados_seguidor, reintentar_si=_plazo_ajeno)
+    time.sleep(0.05)  # Que el seguidor llegue a esperar al líder
+    soltar.set()
+    lider.join(5)
+    seguidor.join(5)
+    assert isinstance(resultados_lider[0], PlazoVencidoError)
+    assert resultados_seguidor == ['datos']
+
+def test_un_seguidor_con_el_plazo_vencido_recibe_el_error():
+    vuelos = VueloUnico()
+    with con_plazo(Plazo(0)):
+        assert _plazo_ajeno(PlazoVencidoError()) is False
+    with pytest.raises(ValueError):
+        vuelos.ejecutar('k', lambda: (_ for _ in ()).throw(ValueError('fallo')), reintentar_si=_plazo_ajeno)
@@ -0,0 +1,152 @@
+"""
+Control de admisión - Límite de operaciones costosas simultáneas
+Las rutas que descargan de jw.org o generan plantillas piden turno; si
+no hay hueco esperan en una cola acotada ordenada por prioridad, y si la
+cola está llena se responde 429 con Retry-After en lugar de acumular hilos.
+Las rutas baratas (/api/datos, /api/salud, ...) no pasan por aquí.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, List, Set, Tuple
+
+# ==================== CONFIGURACIÓN ====================
+MAX_CONCURRENTES = int(os.environ.get('JW_MAX_CONCURRENTES', '6'))
+MAX_COLA = int(os.environ.get('JW_MAX_COLA', '20'))
+ESPERA_MAXIMA = float(os.environ.get('JW_ESPERA_COLA', '15'))  # Segundos en cola antes de rendirse
+
+# Menor número = antes en la cola
+PRIORIDAD_INTERACTIVA = 0   # Una semana o un índice: alguien espera delante de la pantalla
+PRIORIDAD_PLANTILLA = 1
+PRIORIDAD_LOTE = 2          # Extracción masiva y generación por lotes
+
+class SaturadoError(Exception):
+    """No hay hueco ni sitio en la cola: el cliente debe reintentar más tarde."""
+
+    def __init__(self, mensaje: str, reintentar_en: float):
+        super().__init__(mensaje)
+        self.reintentar_en = max(1, int(math.ceil(reintentar_en)))
+
+class ControlAdmision:
+    """
+    Semáforo con cola de espera acotada y prioridades
+
+    Una petición entra directamente si hay hueco y nadie espera; si no,
+    espera su turno en la cola (por prioridad y luego por llegada). Con la
+    cola llena, una petición más prioritaria desplaza a la última de la cola.
+    """
+
+    def __init__(self, max_concurrentes: int = MAX_CONCURRENTES, max_cola: int = MAX_COLA,
+                 espera_maxima: float = ESPERA_MAXIMA):
+        self.max_concurrentes = max_concurrentes
+        self.max_cola = max_cola
+        self.espera_maxima = espera_maxima
+        self._cond = threading.Condition()
+        self._activas = 0
+        self._cola: List[Tuple[int, int]] = []
+        self._expulsadas: Set[Tuple[int, int]] = set()
+        self._orden = itertools.count()
+        self._duracion_media = 1.0
+        self.admitidas = 0
+        self.rechazadas = 0
+
+    def _reintentar_en(self) -> float:
+        """Tiempo estimado hasta que se vacíe la cola actual."""
+        return self._duracion_media * (len(self._cola) + 1) / self.max_concurrentes
+
+    def _rechazar(self, mensaje: str) -> SaturadoError:
+        self.rechazadas += 1
+        return SaturadoError(mensaje, self._reintentar_en())
+
+    def _quitar_de_cola(self, entrada: Tuple[int, int]) -> None:
+        self._cola.remove(entrada)
+        heapq.heapify(self._cola)
+
+    def _entrar(self, prioridad: int) -> None:
+        with self._cond:
+            if self._activas < self.max_concurrentes and not self._cola:
+                self._activas += 1
+                self.admitidas += 1
+                return
+
+            if len(self._cola) >= self.max_cola:
+                ultima = max(self._cola) if self._cola else None
+                if ultima is None or ultima[0] <= prioridad:
+                    raise self._rechazar('Servidor ocupado, cola de espera llena')
+                self._quitar_de_cola(ultima)
+                self._expulsadas.add(ultima)
+                self._cond.notify_all()
+
+            entrada = (prioridad, next(self._orden))
+            heapq.heappush(self._cola, entrada)
+            limite = time.monotonic() + self.espera_maxima
+            while True:
+                # Antes que nada: una desplazada ya no está en la cola (que puede estar vacía)
+                if entrada in self._expulsadas:
+                    self._expulsadas.discard(entrada)
+                    raise self._rechazar('Servidor ocupado, desplazada por una petición prioritaria')
+                if self._activas < self.max_concurrentes and self._cola[0] == entrada:
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._quitar_de_cola(entrada)
+                    self._cond.notify_all()
+                    raise self._rechazar('Servidor ocupado, tiempo de espera en cola agotado')
+                self._cond.wait(restante)
+
+            heapq.heappop(self._cola)
+            self._activas += 1
+            self.admitidas += 1
+            # Si quedan huecos, la siguiente de la cola también puede pasar
+            self._cond.notify_all()
+
+    def _salir(self, duracion: float) -> None:
+        with self._cond:
+            self._activas -= 1
+            self._duracion_media = 0.8 * self._duracion_media + 0.2 * duracion
+            self._cond.notify_all()
+
+    @contextmanager
+    def turno(self, prioridad: int = PRIORIDAD_INTERACTIVA) -> Iterator[None]:
+        """
+        Ejecuta el bloque ocupando un hueco
+
+        Raises:
+            SaturadoError: cola llena, tiempo de espera agotado o desplazada
+        """
+        self._entrar(prioridad)
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            self._salir(time.monotonic() - inicio)
+
+    def limitar(self, prioridad: int = PRIORIDAD_INTERACTIVA):
+        """Decorador para rutas Flask: la vista entera se ejecuta dentro de un turno."""
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                with self.turno(prioridad):
+                    return vista(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def estado(self) -> Dict:
+        with self._cond:
+            return {
+                'activas': self._activas,
+                'max_concurrentes': self.max_concurrentes,
+                'en_cola': len(self._cola),
+                'max_cola': self.max_cola,
+                'admitidas': self.admitidas,
+                'rechazadas': self.rechazadas,
+                'duracion_media': round(self._duracion_media, 3),
+            }
+
+admision = ControlAdmision()
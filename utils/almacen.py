@@ -0,0 +1,142 @@
+"""
+Almacén - Semanas extraídas en memoria
+Guarda los datos de cada semana junto con un índice ordenado por fecha.
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .busqueda import IndiceBusqueda
+from .fechas import IndiceFechas, cuaderno_desde_url
+
+def generar_id_semana(fecha: str, fecha_inicio: Optional[str] = None) -> str:
+    """Genera un ID único basado en la fecha (con el año si se conoce)"""
+    semana_id = fecha.lower().replace(' de ', '-').replace(' ', '-')
+    if fecha_inicio:
+        semana_id = f"{fecha_inicio[:4]}-{semana_id}"
+    return semana_id
+
+class AlmacenSemanas:
+    """
+    Almacén de semanas extraídas
+
+    Se comporta como el diccionario que se usaba antes (``in``, ``[]``,
+    ``len``) y además mantiene un índice por fechas para consultar rangos
+    y la semana actual sin recorrer todo el contenido.
+    """
+
+    def __init__(self):
+        self._semanas: Dict[str, Dict] = {}
+        self._indice = IndiceFechas()
+        self._por_cuaderno: Dict[str, IndiceFechas] = {}
+        self._cuaderno_de: Dict[str, str] = {}
+        self._busqueda = IndiceBusqueda()
+        self._lock = threading.RLock()
+
+    def __contains__(self, semana_id: str) -> bool:
+        return semana_id in self._semanas
+
+    def __getitem__(self, semana_id: str) -> Dict:
+        return self._semanas[semana_id]
+
+    def __len__(self) -> int:
+        return len(self._semanas)
+
+    def get(self, semana_id: str, defecto: Optional[Dict] = None) -> Optional[Dict]:
+        return self._semanas.get(semana_id, defecto)
+
+    def guardar(self, semana_id: str, datos: Dict, url: str) -> Dict:
+        """Guarda (o reemplaza) una semana y la indexa por sus fechas."""
+        return self.cargar(semana_id, {
+            'datos': datos,
+            'fecha_extraccion': datetime.now().isoformat(),
+            'url': url
+        })
+
+    def cargar(self, semana_id: str, registro: Dict) -> Dict:
+        """Guarda un registro completo tal cual (p. ej. desde una instantánea)."""
+        datos = registro['datos']
+        fechas = ()
+        if datos.get('fecha_inicio') and datos.get('fecha_fin'):
+            fechas = (date.fromisoformat(datos['fecha_inicio']), date.fromisoformat(datos['fecha_fin']))
+        cuaderno = cuaderno_desde_url(registro.get('url'))
+
+        with self._lock:
+            self._semanas[semana_id] = registro
+            self._indice.agregar(semana_id, *fechas)
+
+            anterior = self._cuaderno_de.pop(semana_id, None)
+            if anterior and anterior != cuaderno:
+                self._por_cuaderno[anterior].quitar(semana_id)
+                if not self._por_cuaderno[anterior]:
+                    del self._por_cuaderno[anterior]
+            if cuaderno:
+                self._cuaderno_de[semana_id] = cuaderno
+                self._por_cuaderno.setdefault(cuaderno, IndiceFechas()).agregar(semana_id, *fechas)
+            self._busqueda.indexar(semana_id, datos)
+        return registro
+
+    def rango(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[Tuple[str, Dict]]:
+        """Semanas con fechas que se solapan con [desde, hasta], en orden cronológico."""
+        with self._lock:
+            return [(semana_id, self._semanas[semana_id]) for semana_id in self._indice.rango(desde, hasta)]
+
+    def pagina(self, limite: int, despues_de: Optional[Tuple[int, str]] = None,
+               desde: Optional[date] = None, hasta: Optional[date] = None,
+               cuaderno: Optional[str] = None) -> Tuple[List[Tuple[str, Dict]], Optional[Tuple[int, str]]]:
+        """
+        Página del listado (orden cronológico) usando el índice, sin recorrer el almacén
+
+        Returns:
+            (pares (semana_id, registro), clave para pedir la página siguiente o None)
+        """
+        with self._lock:
+            indice = self._indice if cuaderno is None else self._por_cuaderno.get(cuaderno.lower())
+            if indice is None:
+                return [], None
+            ids, siguiente = indice.pagina(limite, despues_de, desde, hasta)
+            return [(semana_id, self._semanas[semana_id]) for semana_id in ids], siguiente
+
+    def iterar(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+               cuaderno: Optional[str] = None, lote: int = 200) -> Iterator[Tuple[str, Dict]]:
+        """Recorre el listado página a página (sin copiar el almacén ni retener el bloqueo)."""
+        despues_de = None
+        while True:
+            pagina, despues_de = self.pagina(lote, despues_de, desde, hasta, cuaderno)
+            yield from pagina
+            if despues_de is None:
+                return
+
+    def buscar(self, consulta: List[str], limite: int = 20) -> Tuple[List[Tuple[str, float, Dict]], int]:
+        """
+        Semanas que contienen todos los términos (ver busqueda.analizar_consulta)
+
+        Returns:
+            ((semana_id, puntuación, registro) de las ``limite`` mejores, total de coincidencias);
+            a igual puntuación, la semana más reciente primero
+        """
+        encontradas = self._busqueda.buscar(consulta)
+        with self._lock:
+            ordenadas = sorted(
+                ((semana_id, puntos, self._semanas[semana_id]) for semana_id, puntos in encontradas
+                 if semana_id in self._semanas),
+                key=lambda hit: (round(hit[1], 6), hit[2]['datos'].get('fecha_inicio') or ''),
+                reverse=True
+            )
+        return ordenadas[:limite], len(ordenadas)
+
+    def cuaderno(self, semana_id: str) -> Optional[str]:
+        """Número del cuaderno de una semana guardada."""
+        return self._cuaderno_de.get(semana_id)
+
+    def actual(self, hoy: Optional[date] = None) -> Optional[Tuple[str, Dict]]:
+        """Semana que contiene la fecha indicada (hoy por defecto)."""
+        with self._lock:
+            semana_id = self._indice.actual(hoy)
+            return (semana_id, self._semanas[semana_id]) if semana_id else None
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Copia de todos los pares (semana_id, registro)."""
+        with self._lock:
+            return iter(list(self._semanas.items()))
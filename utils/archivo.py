@@ -0,0 +1,240 @@
+"""
+Archivo de respuestas - Backends de descarga intercambiables
+http descarga de jw.org; grabar descarga y además guarda cada respuesta en
+un archivo indexado; reproducir sirve solo desde ese archivo (mmap), sin
+red, para trabajar sin conexión o repetir extracciones a velocidad de disco.
+"""
+
+import atexit
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .registro import log
+
+# ==================== CONFIGURACIÓN ====================
+BACKEND = os.environ.get('JW_BACKEND', 'http')
+RUTA_ARCHIVO = os.environ.get('JW_ARCHIVO', os.path.join('cache', 'respuestas.jwa'))
+BACKENDS = ('http', 'grabar', 'reproducir')
+
+# Formato: CABECERA, registros y al final el índice JSON + cola
+#   registro: REGISTRO (4) | largo_url (I) | largo_contenido (Q) | url | contenido
+#   cola: inicio_indice (Q) | COLA (8)
+CABECERA = b'JWARCH01'
+REGISTRO = b'REG1'
+COLA = b'JWIDX001'
+_FORMATO_REGISTRO = struct.Struct('>4sIQ')
+_FORMATO_COLA = struct.Struct('>Q8s')
+
+class EntradaNoArchivadaError(LookupError):
+    """La URL no está en el archivo de respuestas (modo reproducir)."""
+
+class ArchivoRespuestas:
+    """
+    Un único archivo con todas las respuestas y un índice url → posición
+
+    Al grabar, los registros se añaden al final y el índice se escribe al
+    cerrar; si el proceso muere antes, el índice se reconstruye recorriendo
+    los registros. Al reproducir, el archivo se proyecta en memoria (mmap)
+    y cada lectura es un corte del mapa, sin llamadas de E/S.
+    """
+
+    def __init__(self, ruta: str, escritura: bool = False):
+        self.ruta = ruta
+        self.escritura = escritura
+        self._indice: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._archivo = None
+        self._mapa: Optional[mmap.mmap] = None
+        self._abrir()
+
+    def _abrir(self) -> None:
+        if self.escritura:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            nuevo = not os.path.exists(self.ruta) or os.path.getsize(self.ruta) == 0
+            self._archivo = open(self.ruta, 'w+b' if nuevo else 'r+b')
+            if nuevo:
+                self._archivo.write(CABECERA)
+            else:
+                # Se sigue grabando justo donde empezaba el índice anterior
+                fin = self._cargar_indice(self._archivo)
+                self._archivo.truncate(fin)
+            self._archivo.seek(0, os.SEEK_END)
+            atexit.register(self.cerrar)
+            return
+
+        if not os.path.exists(self.ruta):
+            raise FileNotFoundError(f"No existe el archivo de respuestas {self.ruta} (grábalo con JW_BACKEND=grabar)")
+        self._archivo = open(self.ruta, 'rb')
+        self._cargar_indice(self._archivo)
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _cargar_indice(self, archivo) -> int:
+        """Lee el índice de la cola (o lo reconstruye); devuelve dónde acaban los registros."""
+        archivo.seek(0)
+        if archivo.read(len(CABECERA)) != CABECERA:
+            raise ValueError(f"{self.ruta} no es un archivo de respuestas")
+
+        tamano = os.fstat(archivo.fileno()).st_size
+        if tamano >= len(CABECERA) + _FORMATO_COLA.size:
+            archivo.seek(tamano - _FORMATO_COLA.size)
+            inicio_indice, marca = _FORMATO_COLA.unpack(archivo.read(_FORMATO_COLA.size))
+            if marca == COLA and inicio_indice < tamano:
+                archivo.seek(inicio_indice)
+                texto = archivo.read(tamano - _FORMATO_COLA.size - inicio_indice)
+                self._indice = {url: tuple(pos) for url, pos in json.loads(texto).items()}
+                return inicio_indice
+        return self._reconstruir_indice(archivo, tamano)
+
+    def _reconstruir_indice(self, archivo, tamano: int) -> int:
+        """Recorre los registros completos; lo que quede a medias se descarta."""
+        log.warning('⚠️ Archivo de respuestas sin índice (¿interrumpido?), reconstruyendo',
+                    extra={'ruta': self.ruta})
+        posicion = len(CABECERA)
+        archivo.seek(posicion)
+        while posicion + _FORMATO_REGISTRO.size <= tamano:
+            marca, largo_url, largo = _FORMATO_REGISTRO.unpack(archivo.read(_FORMATO_REGISTRO.size))
+            inicio = posicion + _FORMATO_REGISTRO.size + largo_url
+            if marca != REGISTRO or inicio + largo > tamano:
+                break
+            url = archivo.read(largo_url).decode('utf-8')
+            self._indice[url] = (inicio, largo)
+            posicion = inicio + largo
+            archivo.seek(posicion)
+        return posicion
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._indice
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+    def urls(self) -> List[str]:
+        """URLs archivadas, en orden de grabación."""
+        return sorted(self._indice, key=lambda url: self._indice[url][0])
+
+    def obtener(self, url: str) -> bytes:
+        posicion = self._indice.get(url)
+        if posicion is None:
+            raise EntradaNoArchivadaError(url)
+        inicio, largo = posicion
+        if self._mapa is not None:
+            return self._mapa[inicio:inicio + largo]
+        with self._lock:
+            self._archivo.seek(inicio)
+            contenido = self._archivo.read(largo)
+            self._archivo.seek(0, os.SEEK_END)
+        return contenido
+
+    def guardar(self, url: str, contenido: bytes) -> None:
+        if not self.escritura:
+            raise RuntimeError('El archivo de respuestas está abierto solo para lectura')
+        url_bytes = url.encode('utf-8')
+        with self._lock:
+            posicion = self._archivo.tell()
+            self._archivo.write(_FORMATO_REGISTRO.pack(REGISTRO, len(url_bytes), len(contenido)))
+            self._archivo.write(url_bytes)
+            self._archivo.write(contenido)
+            self._indice[url] = (posicion + _FORMATO_REGISTRO.size + len(url_bytes), len(contenido))
+
+    def cerrar(self) -> None:
+        """Escribe el índice (al grabar) y libera el archivo."""
+        with self._lock:
+            if self._archivo is None:
+                return
+            if self.escritura:
+                inicio_indice = self._archivo.tell()
+                self._archivo.write(json.dumps(self._indice, separators=(',', ':')).encode('utf-8'))
+                self._archivo.write(_FORMATO_COLA.pack(inicio_indice, COLA))
+                self._archivo.flush()
+                os.fsync(self._archivo.fileno())
+            if self._mapa is not None:
+                self._mapa.close()
+                self._mapa = None
+            self._archivo.close()
+            self._archivo = None
+
+# ==================== BACKENDS ====================
+
+class BackendDescarga:
+    """Interfaz: ``descargar(url)`` devuelve el cuerpo de la respuesta en bytes."""
+
+    nombre = ''
+
+    def descargar(self, url: str) -> bytes:
+        raise NotImplementedError
+
+    def descargar_principal(self, url: str) -> bytes:
+        """Página de una semana: basta con llegar al final de <main> (por defecto, completa)."""
+        return self.descargar(url)
+
+    def estado(self) -> Dict:
+        return {'backend': self.nombre}
+
+class BackendHTTP(BackendDescarga):
+    """Descarga en vivo con la función de descarga del scraper."""
+
+    nombre = 'http'
+
+    def __init__(self, funcion_descarga: Callable[[str], bytes],
+                 funcion_principal: Optional[Callable[[str], bytes]] = None):
+        self._descargar = funcion_descarga
+        self._descargar_principal = funcion_principal or funcion_descarga
+
+    def descargar(self, url: str) -> bytes:
+        return self._descargar(url)
+
+    def descargar_principal(self, url: str) -> bytes:
+        return self._descargar_principal(url)
+
+class BackendGrabacion(BackendDescarga):
+    """Descarga con otro backend y guarda cada respuesta correcta en el archivo."""
+
+    nombre = 'grabar'
+
+    def __init__(self, origen: BackendDescarga, archivo: ArchivoRespuestas):
+        self.origen = origen
+        self.archivo = archivo
+
+    def descargar(self, url: str) -> bytes:
+        contenido = self.origen.descargar(url)
+        self.archivo.guardar(url, contenido)
+        return contenido
+
+    def estado(self) -> Dict:
+        return {'backend': self.nombre, 'archivo': self.archivo.ruta, 'entradas': len(self.archivo)}
+
+class BackendReproduccion(BackendDescarga):
+    """Sirve solo desde el archivo; una URL no grabada es EntradaNoArchivadaError."""
+
+    nombre = 'reproducir'
+
+    def __init__(self, archivo: ArchivoRespuestas):
+        self.archivo = archivo
+
+    def descargar(self, url: str) -> bytes:
+        return self.archivo.obtener(url)
+
+    def estado(self) -> Dict:
+        return {'backend': self.nombre, 'archivo': self.archivo.ruta, 'entradas': len(self.archivo)}
+
+def crear_backend(nombre: str, funcion_descarga: Callable[[str], bytes],
+                  ruta: str = RUTA_ARCHIVO,
+                  funcion_principal: Optional[Callable[[str], bytes]] = None) -> BackendDescarga:
+    """
+    Construye el backend indicado ('http', 'grabar' o 'reproducir')
+
+    Al grabar se guardan siempre las páginas completas, no solo hasta </main>.
+    """
+    if nombre == 'http':
+        return BackendHTTP(funcion_descarga, funcion_principal)
+    if nombre == 'grabar':
+        return BackendGrabacion(BackendHTTP(funcion_descarga), ArchivoRespuestas(ruta, escritura=True))
+    if nombre == 'reproducir':
+        return BackendReproduccion(ArchivoRespuestas(ruta))
+    raise ValueError(f"Backend desconocido: {nombre}. Opciones: {', '.join(BACKENDS)}")
@@ -0,0 +1,200 @@
+"""
+Artefactos - Almacén direccionado por contenido de los archivos generados
+Cada plantilla se guarda una sola vez con el hash de su contenido como
+nombre; un índice relaciona (semana, congregación) con su artefacto y
+una poda por tamaño y antigüedad desaloja los menos usados.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .compresion import EXTENSIONES, guardar_precomprimido
+
+# ==================== CONFIGURACIÓN ====================
+RUTA_ARTEFACTOS = os.environ.get('JW_ARTEFACTOS_RUTA', 'output')
+MAX_MB = float(os.environ.get('JW_ARTEFACTOS_MAX_MB', '200'))
+MAX_DIAS = float(os.environ.get('JW_ARTEFACTOS_MAX_DIAS', '30'))
+
+@dataclass(frozen=True)
+class Artefacto:
+    """Archivo generado: su hash, dónde está y con qué nombre se descarga."""
+    hash: str
+    ruta: str
+    nombre: str
+
+class AlmacenArtefactos:
+    """
+    Almacén de archivos generados con deduplicación y límite de tamaño
+
+    Los objetos viven en ``<raiz>/objetos/ab/<hash><ext>`` junto a sus
+    variantes comprimidas; el índice y los tiempos de uso se guardan en
+    ``<raiz>/artefactos.sqlite3``. Un contenido ya guardado no se reescribe.
+    """
+
+    def __init__(self, raiz: str = RUTA_ARTEFACTOS, max_mb: float = MAX_MB,
+                 max_dias: float = MAX_DIAS):
+        self.raiz = raiz
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_edad = max_dias * 86400
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+
+    def _conexion(self) -> sqlite3.Connection:
+        """Abre el índice la primera vez que se usa (y de nuevo en cada proceso hijo)."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            os.makedirs(os.path.join(self.raiz, 'objetos'), exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(self.raiz, 'artefactos.sqlite3'),
+                check_same_thread=False, isolation_level=None
+            )
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS objetos ('
+                'hash TEXT PRIMARY KEY, extension TEXT, tamano INTEGER, creado REAL, usado REAL)'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS indice ('
+                'semana TEXT, congregacion TEXT, hash TEXT, nombre TEXT, '
+                'PRIMARY KEY (semana, congregacion))'
+            )
+        return self._db
+
+    def _ruta_objeto(self, hash_: str, extension: str) -> str:
+        return os.path.join(self.raiz, 'objetos', hash_[:2], hash_ + extension)
+
+    def guardar(self, contenido: bytes, semana: str, congregacion: str,
+                nombre: str, extension: str = '.html') -> Artefacto:
+        """Guarda (o reutiliza) el artefacto y lo asocia a la semana y congregación."""
+        hash_ = hashlib.sha256(contenido).hexdigest()
+        ruta = self._ruta_objeto(hash_, extension)
+        ahora = time.time()
+
+        with self._lock:
+            db = self._conexion()
+            registrado = db.execute('SELECT 1 FROM objetos WHERE hash = ?', (hash_,)).fetchone()
+            nuevo = not registrado or not os.path.exists(ruta)
+            if nuevo:
+                os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                guardar_precomprimido(ruta, contenido)
+                tamano = sum(
+                    os.path.getsize(r) for r in self._variantes(ruta) if os.path.exists(r)
+                )
+                db.execute(
+                    'INSERT OR REPLACE INTO objetos VALUES (?, ?, ?, ?, ?)',
+                    (hash_, extension, tamano, ahora, ahora)
+                )
+            else:
+                db.execute('UPDATE objetos SET usado = ? WHERE hash = ?', (ahora, hash_))
+            db.execute(
+                'INSERT OR REPLACE INTO indice VALUES (?, ?, ?, ?)',
+                (semana, congregacion, hash_, nombre)
+            )
+            if nuevo:
+                self._podar(db, excepto=hash_)
+
+        return Artefacto(hash_, ruta, nombre)
+
+    def buscar(self, semana: str, congregacion: str) -> Optional[Artefacto]:
+        """Artefacto vigente de (semana, congregación), si sigue en disco."""
+        with self._lock:
+            db = self._conexion()
+            fila = db.execute(
+                'SELECT i.hash, i.nombre, o.extension FROM indice i '
+                'JOIN objetos o ON o.hash = i.hash WHERE i.semana = ? AND i.congregacion = ?',
+                (semana, congregacion)
+            ).fetchone()
+            if not fila:
+                return None
+            hash_, nombre, extension = fila
+            ruta = self._ruta_objeto(hash_, extension)
+            if not os.path.exists(ruta):
+                self._borrar(db, hash_, extension)
+                return None
+            db.execute('UPDATE objetos SET usado = ? WHERE hash = ?', (time.time(), hash_))
+        return Artefacto(hash_, ruta, nombre)
+
+    def enlazar(self, artefacto: Artefacto, directorio: str) -> str:
+        """
+        Deja el artefacto en ``directorio`` con su nombre de descarga
+
+        Es un enlace duro (o una copia si el sistema no los admite), así que
+        sobrevive aunque la poda borre después el objeto.
+
+        Returns:
+            Ruta del archivo con el nombre legible
+        """
+        destino = os.path.join(directorio, artefacto.nombre)
+        temporal = destino + '.tmp'
+        with self._lock:
+            try:
+                os.remove(temporal)
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(artefacto.ruta, temporal)
+            except OSError:
+                shutil.copyfile(artefacto.ruta, temporal)
+            os.replace(temporal, destino)
+        return destino
+
+    def podar(self) -> int:
+        """Aplica los límites de antigüedad y tamaño; devuelve los objetos borrados."""
+        with self._lock:
+            return self._podar(self._conexion())
+
+    def _podar(self, db: sqlite3.Connection, excepto: Optional[str] = None) -> int:
+        borrados = 0
+        limite = time.time() - self.max_edad
+        for hash_, extension in db.execute(
+            'SELECT hash, extension FROM objetos WHERE usado < ? AND hash != ?',
+            (limite, excepto or '')
+        ).fetchall():
+            self._borrar(db, hash_, extension)
+            borrados += 1
+
+        total = db.execute('SELECT COALESCE(SUM(tamano), 0) FROM objetos').fetchone()[0]
+        if total > self.max_bytes:
+            # Menos usados primero, hasta quedar por debajo del límite
+            for hash_, extension, tamano in db.execute(
+                'SELECT hash, extension, tamano FROM objetos WHERE hash != ? ORDER BY usado',
+                (excepto or '',)
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._borrar(db, hash_, extension)
+                total -= tamano
+                borrados += 1
+        return borrados
+
+    def _borrar(self, db: sqlite3.Connection, hash_: str, extension: str) -> None:
+        ruta_objeto = self._ruta_objeto(hash_, extension)
+        for ruta in self._variantes(ruta_objeto):
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(os.path.dirname(ruta_objeto))  # Solo si quedó vacío
+        except OSError:
+            pass
+        db.execute('DELETE FROM objetos WHERE hash = ?', (hash_,))
+        db.execute('DELETE FROM indice WHERE hash = ?', (hash_,))
+
+    @staticmethod
+    def _variantes(ruta: str):
+        return [ruta] + [ruta + ext for ext in EXTENSIONES.values()]
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            db = self._conexion()
+            objetos, total = db.execute('SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM objetos').fetchone()
+            entradas = db.execute('SELECT COUNT(*) FROM indice').fetchone()[0]
+        return {'objetos': objetos, 'bytes': total, 'entradas': entradas, 'max_bytes': self.max_bytes}
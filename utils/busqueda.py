@@ -0,0 +1,184 @@
+"""
+Búsqueda - Índice invertido sobre los programas guardados
+Indexa los títulos de las partes, la lectura bíblica y los números de
+canción de cada semana; se actualiza al guardar cada semana y responde
+consultas como "isaías 40" o "canción 45" sin recorrer el almacén.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# ==================== CONFIGURACIÓN ====================
+# Peso de un término según dónde aparece
+PESOS = {'titulo': 1.0, 'lectura': 2.0, 'cancion': 3.0}
+SECCIONES = ('tesoros_biblia', 'seamos_maestros', 'vida_cristiana')
+PREFIJO_MINIMO = 3   # Letras para completar el último término ("isa" → "isaias")
+
+# Palabras que anuncian un número de canción en la consulta
+_PALABRAS_CANCION = {'cancion', 'canciones', 'cantico', 'song', 'songs', 'cancao', 'canticos'}
+_VACIAS = {
+    'de', 'del', 'la', 'las', 'el', 'los', 'lo', 'y', 'o', 'a', 'en', 'que', 'un', 'una', 'por',
+    'con', 'para', 'se', 'su', 'sus', 'al', 'es', 'the', 'of', 'and', 'to', 'in', 'do', 'da',
+    'e', 'os', 'as', 'um', 'uma', 'no', 'na',
+}
+_PALABRA = re.compile(r'\w+')
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin acentos: 'Isaías' → 'isaias'."""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def terminos(texto: str) -> List[str]:
+    return [t for t in _PALABRA.findall(normalizar(texto)) if t not in _VACIAS]
+
+def _textos(datos: Dict) -> List[Tuple[str, str]]:
+    """Pares (campo, texto) indexables de una semana."""
+    textos = [('lectura', datos['lectura_biblica'])] if datos.get('lectura_biblica') else []
+    for seccion in SECCIONES:
+        textos.extend(('titulo', parte.get('titulo', '')) for parte in datos.get(seccion, []))
+    canciones = datos.get('canciones') or {}
+    textos.extend(('cancion', str(numero)) for numero in canciones.values() if numero)
+    return textos
+
+def analizar_consulta(consulta: str) -> List[str]:
+    """
+    Términos de la consulta; 'canción 45' (o 'cancion:45') se limita a canciones
+
+    Returns:
+        Términos normalizados; los de canción van como 'cancion:45'
+    """
+    resultado = []
+    palabras = _PALABRA.findall(normalizar(consulta.replace(':', ' ')))
+    i = 0
+    while i < len(palabras):
+        palabra = palabras[i]
+        if palabra in _PALABRAS_CANCION and i + 1 < len(palabras) and palabras[i + 1].isdigit():
+            resultado.append(f'cancion:{int(palabras[i + 1])}')
+            i += 2
+            continue
+        if palabra not in _VACIAS and palabra not in _PALABRAS_CANCION:
+            resultado.append(palabra)
+        i += 1
+    return resultado
+
+def coincidencias(datos: Dict, consulta: List[str]) -> List[Dict[str, str]]:
+    """Textos de la semana que contienen algún término de la consulta."""
+    encontrados = []
+    for campo, texto in _textos(datos):
+        palabras = set(terminos(texto))
+        for termino in consulta:
+            restringido, _, buscado = termino.rpartition(':')
+            if restringido and restringido != campo:
+                continue
+            if buscado in palabras or (
+                len(buscado) >= PREFIJO_MINIMO and any(p.startswith(buscado) for p in palabras)
+            ):
+                encontrados.append({'campo': campo, 'texto': texto})
+                break
+    return encontrados
+
+class IndiceBusqueda:
+    """
+    Índice invertido término → {semana_id: peso}
+
+    El peso suma las apariciones de cada término ponderadas por campo;
+    una consulta exige todos sus términos (el último puede ser un
+    prefijo) y ordena por la suma de peso × idf.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._de_semana: Dict[str, Dict[str, float]] = {}
+        self._vocabulario: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._de_semana)
+
+    def indexar(self, semana_id: str, datos: Dict) -> None:
+        """Indexa (o reindexa) una semana."""
+        pesos: Dict[str, float] = defaultdict(float)
+        for campo, texto in _textos(datos):
+            for termino in terminos(texto):
+                pesos[termino] += PESOS[campo]
+                if campo == 'cancion' and termino.isdigit():
+                    pesos[f'cancion:{int(termino)}'] += PESOS[campo]
+
+        with self._lock:
+            self._quitar(semana_id)
+            nuevos = False
+            for termino, peso in pesos.items():
+                nuevos = nuevos or termino not in self._postings
+                self._postings[termino][semana_id] = peso
+            self._de_semana[semana_id] = dict(pesos)
+            if nuevos:
+                self._vocabulario = None
+
+    def quitar(self, semana_id: str) -> None:
+        with self._lock:
+            self._quitar(semana_id)
+
+    def _quitar(self, semana_id: str) -> None:
+        for termino in self._de_semana.pop(semana_id, {}):
+            postings = self._postings[termino]
+            postings.pop(semana_id, None)
+            if not postings:
+                del self._postings[termino]
+                self._vocabulario = None
+
+    def _expandir(self, prefijo: str) -> List[str]:
+        """Términos del vocabulario que empiezan por ``prefijo`` (vocabulario ordenado + bisect)."""
+        if self._vocabulario is None:
+            self._vocabulario = sorted(self._postings)
+        inicio = bisect_left(self._vocabulario, prefijo)
+        encontrados = []
+        for termino in self._vocabulario[inicio:]:
+            if not termino.startswith(prefijo):
+                break
+            encontrados.append(termino)
+        return encontrados
+
+    def buscar(self, consulta: List[str]) -> List[Tuple[str, float]]:
+        """
+        Semanas que contienen todos los términos, de mayor a menor puntuación
+
+        Args:
+            consulta: términos de ``analizar_consulta``
+        """
+        if not consulta:
+            return []
+        with self._lock:
+            total = len(self._de_semana)
+            puntuaciones: List[Dict[str, float]] = []
+            for i, termino in enumerate(consulta):
+                variantes = [termino]
+                ultimo = i == len(consulta) - 1
+                if ultimo and len(termino) >= PREFIJO_MINIMO and not termino.isdigit() and ':' not in termino:
+                    variantes = self._expandir(termino)
+                por_semana: Dict[str, float] = {}
+                for variante in variantes:
+                    postings = self._postings.get(variante)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + total / len(postings))
+                    # Una coincidencia exacta vale más que una por prefijo
+                    factor = 1.0 if variante == termino else 0.5
+                    for semana_id, peso in postings.items():
+                        por_semana[semana_id] = max(por_semana.get(semana_id, 0.0), peso * idf * factor)
+                if not por_semana:
+                    return []
+                puntuaciones.append(por_semana)
+
+        # Intersección empezando por la lista más corta
+        puntuaciones.sort(key=len)
+        resultado = dict(puntuaciones[0])
+        for por_semana in puntuaciones[1:]:
+            resultado = {s: p + por_semana[s] for s, p in resultado.items() if s in por_semana}
+            if not resultado:
+                return []
+        return sorted(resultado.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,98 @@
+"""
+Carga - Prueba de carga local contra un servidor en marcha
+Varios hilos piden las rutas indicadas en rueda durante un tiempo fijo,
+cada uno con su conexión keep-alive, y se mide el rendimiento
+(peticiones por segundo) y las latencias. Sirve para comparar el servidor
+de desarrollo (python main.py) con el de producción (cli.py servir).
+"""
+
+import statistics
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+import requests
+
+# ==================== CONFIGURACIÓN ====================
+SEGUNDOS = 10.0
+CONCURRENCIA = 16
+CALENTAMIENTO = 2.0     # Segundos iniciales que no cuentan (conexiones, cachés)
+RUTAS = ('/api/datos?limite=50', '/api/semana-actual', '/api/salud')
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    indice = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return valores[indice]
+
+def prueba_carga(url_base: str, rutas=RUTAS, segundos: float = SEGUNDOS,
+                 concurrencia: int = CONCURRENCIA, calentamiento: float = CALENTAMIENTO) -> Dict:
+    """
+    Lanza ``concurrencia`` hilos contra ``url_base`` durante ``calentamiento + segundos``
+
+    Returns:
+        Resumen con peticiones por segundo, latencias (ms), estados y errores
+    """
+    url_base = url_base.rstrip('/')
+    inicio_medida = time.monotonic() + calentamiento
+    fin = inicio_medida + segundos
+    latencias: List[float] = []
+    estados: Counter = Counter()
+    errores: Counter = Counter()
+    bytes_recibidos = [0]
+    lock = threading.Lock()
+
+    def trabajador(n: int) -> None:
+        sesion = requests.Session()
+        propias, sus_estados, sus_errores, sus_bytes = [], Counter(), Counter(), 0
+        i = n
+        while True:
+            ahora = time.monotonic()
+            if ahora >= fin:
+                break
+            ruta = rutas[i % len(rutas)]
+            i += 1
+            try:
+                respuesta = sesion.get(url_base + ruta, timeout=30)
+                tamano = len(respuesta.content)
+            except requests.RequestException as e:
+                if ahora >= inicio_medida:
+                    sus_errores[type(e).__name__] += 1
+                continue
+            if ahora >= inicio_medida:
+                propias.append((time.monotonic() - ahora) * 1000)
+                sus_estados[respuesta.status_code] += 1
+                sus_bytes += tamano
+        sesion.close()
+        with lock:
+            latencias.extend(propias)
+            estados.update(sus_estados)
+            errores.update(sus_errores)
+            bytes_recibidos[0] += sus_bytes
+
+    hilos = [threading.Thread(target=trabajador, args=(n,), daemon=True) for n in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    latencias.sort()
+    return {
+        'url': url_base,
+        'rutas': list(rutas),
+        'concurrencia': concurrencia,
+        'segundos': segundos,
+        'peticiones': len(latencias),
+        'peticiones_por_segundo': round(len(latencias) / segundos, 1),
+        'latencia_ms': {
+            'media': round(statistics.fmean(latencias), 2) if latencias else None,
+            'p50': round(_percentil(latencias, 50), 2),
+            'p95': round(_percentil(latencias, 95), 2),
+            'p99': round(_percentil(latencias, 99), 2),
+            'max': round(latencias[-1], 2) if latencias else None,
+        },
+        'estados': {str(k): v for k, v in sorted(estados.items())},
+        'errores': dict(errores),
+        'mb_recibidos': round(bytes_recibidos[0] / (1024 * 1024), 2),
+    }
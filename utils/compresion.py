@@ -0,0 +1,151 @@
+"""
+Compresión - Negociación gzip/brotli de las respuestas
+Las respuestas dinámicas (JSON, página principal) se comprimen al vuelo;
+las plantillas generadas se guardan ya comprimidas y se envían tal cual.
+"""
+
+import gzip
+import os
+import tempfile
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+from flask import Flask, Response, request, send_file
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin el paquete solo se ofrece gzip
+    brotli = None
+
+# ==================== CONFIGURACIÓN ====================
+TAMANO_MINIMO = 500          # Bytes; por debajo no compensa comprimir
+NIVEL_GZIP = 6               # Al vuelo: equilibrio entre CPU y tamaño
+NIVEL_BROTLI = 5
+NIVEL_GZIP_ARTEFACTO = 9     # Artefactos: se comprimen una vez, nivel máximo
+NIVEL_BROTLI_ARTEFACTO = 11
+TIPOS_COMPRIMIBLES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson',
+    'image/svg+xml',
+}
+
+EXTENSIONES = {'br': '.br', 'gzip': '.gz'}
+
+def codificaciones_disponibles() -> List[str]:
+    """Codificaciones que el servidor sabe producir, en orden de preferencia."""
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+def elegir_codificacion(disponibles: Optional[List[str]] = None) -> Optional[str]:
+    """Mejor codificación aceptada por el cliente (según Accept-Encoding y sus q)."""
+    return request.accept_encodings.best_match(disponibles or codificaciones_disponibles())
+
+def comprimir(datos: bytes, codificacion: str, artefacto: bool = False) -> bytes:
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=NIVEL_BROTLI_ARTEFACTO if artefacto else NIVEL_BROTLI)
+    # mtime=0: la misma entrada produce siempre los mismos bytes
+    return gzip.compress(datos, compresslevel=NIVEL_GZIP_ARTEFACTO if artefacto else NIVEL_GZIP, mtime=0)
+
+def comprimir_flujo(trozos: Iterable[bytes], codificacion: str) -> Iterator[bytes]:
+    """
+    Comprime un flujo trozo a trozo; cada trozo se vacía (sync flush) para
+    que el cliente pueda ir mostrando lo recibido sin esperar al final
+    """
+    if codificacion == 'br':
+        compresor = brotli.Compressor(quality=NIVEL_BROTLI)
+        for trozo in trozos:
+            yield compresor.process(trozo) + compresor.flush()
+        yield compresor.finish()
+        return
+
+    compresor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 31)  # 31: formato gzip
+    for trozo in trozos:
+        yield compresor.compress(trozo) + compresor.flush(zlib.Z_SYNC_FLUSH)
+    yield compresor.flush()
+
+# ==================== ARTEFACTOS PRECOMPRIMIDOS ====================
+
+def escribir_atomico(ruta: str, datos: bytes) -> None:
+    """Escribe en un temporal único del mismo directorio y lo renombra."""
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+def guardar_precomprimido(ruta: str, contenido: bytes) -> bool:
+    """
+    Guarda un artefacto junto con sus variantes .gz (y .br si hay brotli)
+
+    Si el archivo ya existe con el mismo contenido y sus variantes están
+    al día, no se reescribe ni se vuelve a comprimir.
+
+    Returns:
+        True si se escribió, False si ya estaba al día
+    """
+    variantes = {c: ruta + EXTENSIONES[c] for c in codificaciones_disponibles()}
+    if os.path.exists(ruta) and all(os.path.exists(v) for v in variantes.values()):
+        with open(ruta, 'rb') as f:
+            if f.read() == contenido:
+                return False
+
+    for codificacion, ruta_variante in variantes.items():
+        escribir_atomico(ruta_variante, comprimir(contenido, codificacion, artefacto=True))
+    # El original al final: si existe, sus variantes ya están completas
+    escribir_atomico(ruta, contenido)
+    return True
+
+def enviar_precomprimido(ruta: str, nombre: str, mimetype: str = 'text/html',
+                         como_adjunto: bool = True, max_age: Optional[int] = None) -> Response:
+    """Envía la variante comprimida que acepte el cliente, sin comprimir nada."""
+    ruta = os.path.abspath(ruta)  # send_file resuelve las relativas desde la app, no desde el cwd
+    disponibles = [c for c in codificaciones_disponibles() if os.path.exists(ruta + EXTENSIONES[c])]
+    codificacion = elegir_codificacion(disponibles) if disponibles else None
+
+    respuesta = send_file(
+        ruta + EXTENSIONES[codificacion] if codificacion else ruta,
+        as_attachment=como_adjunto,
+        download_name=nombre,
+        mimetype=mimetype,
+        conditional=True,
+        max_age=max_age
+    )
+    if codificacion:
+        respuesta.headers['Content-Encoding'] = codificacion
+    respuesta.vary.add('Accept-Encoding')
+    return respuesta
+
+# ==================== COMPRESIÓN AL VUELO ====================
+
+def _comprimible(respuesta: Response) -> bool:
+    if respuesta.direct_passthrough or respuesta.is_streamed:
+        return False  # Archivos y flujos se envían tal cual
+    if 'Content-Encoding' in respuesta.headers or respuesta.status_code < 200:
+        return False
+    if respuesta.status_code in (204, 206, 304) or request.method == 'HEAD':
+        return False
+    return respuesta.mimetype in TIPOS_COMPRIMIBLES
+
+def _comprimir_respuesta(respuesta: Response) -> Response:
+    if not _comprimible(respuesta):
+        return respuesta
+
+    respuesta.vary.add('Accept-Encoding')
+    datos = respuesta.get_data()
+    codificacion = elegir_codificacion()
+    if not codificacion or len(datos) < TAMANO_MINIMO:
+        return respuesta
+
+    respuesta.set_data(comprimir(datos, codificacion))
+    respuesta.headers['Content-Encoding'] = codificacion
+    if respuesta.headers.get('ETag'):
+        # Otra representación, otra etiqueta
+        etiqueta, debil = respuesta.get_etag()
+        respuesta.set_etag(f"{etiqueta}-{codificacion}", weak=debil)
+    return respuesta
+
+def init_compresion(app: Flask) -> None:
+    """Comprime al vuelo las respuestas de la aplicación que lo admitan."""
+    app.after_request(_comprimir_respuesta)
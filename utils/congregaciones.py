@@ -0,0 +1,146 @@
+"""
+Congregaciones - Perfiles guardados en el servidor
+Cada perfil tiene el nombre que aparece en la plantilla y la hora a la
+que empieza su reunión, para generar la misma semana para todas las
+congregaciones de un circuito de una sola vez.
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+from .compresion import escribir_atomico
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# ==================== CONFIGURACIÓN ====================
+RUTA_CONGREGACIONES = os.environ.get('JW_CONGREGACIONES', os.path.join('cache', 'congregaciones.json'))
+HORA_INICIO_POR_DEFECTO = '19:00'
+
+_PATRON_HORA = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+def validar_hora(hora: str) -> str:
+    """Hora 'HH:MM' normalizada (ValueError si no es válida)."""
+    match = _PATRON_HORA.match((hora or '').strip())
+    if not match:
+        raise ValueError(f"Hora inválida: {hora!r} (usa HH:MM)")
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
+def identificador(nombre: str) -> str:
+    """'Congregación Centro' → 'congregacion-centro'"""
+    sin_acentos = unicodedata.normalize('NFKD', nombre).encode('ascii', 'ignore').decode('ascii')
+    return _NO_ALFANUMERICO.sub('-', sin_acentos.lower()).strip('-')
+
+@dataclass(frozen=True)
+class PerfilCongregacion:
+    """Nombre de la congregación y hora de inicio de su reunión."""
+    id: str
+    nombre: str
+    hora_inicio: str = HORA_INICIO_POR_DEFECTO
+
+class RegistroCongregaciones:
+    """
+    Perfiles en un archivo JSON compartido por todos los procesos
+
+    Se relee cuando cambia en disco; cada cambio se aplica sobre la versión
+    en disco con el archivo bloqueado (``<ruta>.lock``), así que dos
+    procesos que guardan o borran a la vez no se pisan.
+    """
+
+    def __init__(self, ruta: str = RUTA_CONGREGACIONES):
+        self.ruta = ruta
+        self._perfiles: Dict[str, PerfilCongregacion] = {}
+        self._firma: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def _firma_archivo(self) -> Optional[tuple]:
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+        # La escritura atómica crea un inodo nuevo: cambia aunque coincidan hora y tamaño
+        return estado.st_ino, estado.st_mtime_ns, estado.st_size
+
+    def _cargar(self) -> Dict[str, PerfilCongregacion]:
+        if not self.ruta:
+            return self._perfiles
+        firma = self._firma_archivo()
+        if firma != self._firma:
+            perfiles = {}
+            if firma is not None:
+                with open(self.ruta, encoding='utf-8') as f:
+                    for datos in json.load(f):
+                        perfil = PerfilCongregacion(**datos)
+                        perfiles[perfil.id] = perfil
+            self._perfiles, self._firma = perfiles, firma
+        return self._perfiles
+
+    def _escribir(self) -> None:
+        if not self.ruta:
+            return
+        contenido = json.dumps([asdict(p) for p in self._perfiles.values()], ensure_ascii=False, indent=2)
+        escribir_atomico(self.ruta, contenido.encode('utf-8'))
+        self._firma = self._firma_archivo()
+
+    @contextmanager
+    def _exclusivo(self) -> Iterator[Dict[str, PerfilCongregacion]]:
+        """Perfiles recién leídos de disco, con el archivo bloqueado frente a otros procesos."""
+        with self._lock:
+            bloqueo = None
+            if self.ruta:
+                directorio = os.path.dirname(self.ruta)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                if fcntl is not None:
+                    bloqueo = open(self.ruta + '.lock', 'a')
+                    fcntl.flock(bloqueo.fileno(), fcntl.LOCK_EX)
+            try:
+                yield self._cargar()
+            finally:
+                if bloqueo is not None:
+                    bloqueo.close()  # Cerrar libera el bloqueo
+
+    def listar(self) -> List[PerfilCongregacion]:
+        with self._lock:
+            return sorted(self._cargar().values(), key=lambda p: p.nombre)
+
+    def obtener(self, id_perfil: str) -> Optional[PerfilCongregacion]:
+        with self._lock:
+            return self._cargar().get(id_perfil)
+
+    def guardar(self, nombre: str, hora_inicio: str = HORA_INICIO_POR_DEFECTO,
+                id_perfil: Optional[str] = None) -> PerfilCongregacion:
+        """
+        Crea o reemplaza un perfil (el id se deriva del nombre si no se indica)
+
+        Raises:
+            ValueError: nombre vacío u hora inválida
+        """
+        nombre = (nombre or '').strip()
+        if not nombre:
+            raise ValueError('Nombre de congregación vacío')
+        perfil = PerfilCongregacion(
+            id=identificador(id_perfil or nombre) or 'congregacion',
+            nombre=nombre,
+            hora_inicio=validar_hora(hora_inicio),
+        )
+        with self._exclusivo() as perfiles:
+            perfiles[perfil.id] = perfil
+            self._escribir()
+        return perfil
+
+    def borrar(self, id_perfil: str) -> bool:
+        with self._exclusivo() as perfiles:
+            if perfiles.pop(id_perfil, None) is None:
+                return False
+            self._escribir()
+            return True
@@ -0,0 +1,176 @@
+"""
+Descubrimiento - Recorrido de toda la biblioteca de cuadernos
+Parte de la raíz de la biblioteca, encuentra cada número del cuaderno y
+sus semanas, guarda puntos de control para poder reanudar y produce un
+manifiesto que las ejecuciones siguientes pueden comparar.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .locales import obtener_paquete
+from .rastreo import BIBLIOTECA, INDICE, SEMANA, MotorRastreo
+from .registro import log
+
+# ==================== CONFIGURACIÓN ====================
+RUTA_CHECKPOINT = os.path.join('cache', 'descubrimiento.checkpoint.json')
+RUTA_MANIFIESTO = 'manifiesto_cuadernos.json'
+INTERVALO_CHECKPOINT = 10  # Segundos entre puntos de control
+
+def url_biblioteca(idioma: str) -> str:
+    """URL raíz de la biblioteca de cuadernos de un idioma."""
+    return f"https://www.jw.org{obtener_paquete(idioma).ruta_cuaderno}"
+
+def escribir_json_atomico(ruta: str, datos: Dict) -> None:
+    """Escribe JSON en un temporal y lo renombra: nunca queda un archivo a medias."""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+def huella_datos(datos: Dict) -> str:
+    """Hash estable de los datos de una semana, para detectar cambios."""
+    texto = json.dumps(datos, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+class Descubrimiento:
+    """
+    Rastreo de la biblioteca con puntos de control en disco
+
+    El estado (URLs vistas, completadas, cuadernos y semanas encontrados)
+    se guarda cada ``INTERVALO_CHECKPOINT`` segundos y al terminar o
+    interrumpirse. Al reanudar, solo se vuelve a pedir lo no completado.
+    """
+
+    def __init__(self, raices: Iterable[str], ruta_checkpoint: str = RUTA_CHECKPOINT,
+                 extraer_semanas: bool = False, **opciones_motor):
+        self.raices = list(raices)
+        self.ruta_checkpoint = ruta_checkpoint
+        self.extraer_semanas = extraer_semanas
+        self.opciones_motor = opciones_motor
+        self.estado = {
+            'inicio': datetime.now().isoformat(),
+            'raices': self.raices,
+            'vistos': {},
+            'completados': [],
+            'cuadernos': {},
+            'semanas': {},
+        }
+        self._completados = set()
+        self._ultimo_checkpoint = 0.0
+        self.motor: Optional[MotorRastreo] = None
+
+    def cargar_checkpoint(self) -> bool:
+        """Carga el punto de control si existe y corresponde a las mismas raíces."""
+        if not os.path.exists(self.ruta_checkpoint):
+            return False
+        with open(self.ruta_checkpoint, encoding='utf-8') as f:
+            estado = json.load(f)
+        if sorted(estado.get('raices', [])) != sorted(self.raices):
+            log.warning('⚠️ El punto de control es de otras raíces; se empieza de cero',
+                        extra={'ruta': self.ruta_checkpoint})
+            return False
+        self.estado = estado
+        self._completados = set(estado['completados'])
+        return True
+
+    def guardar_checkpoint(self, motor: MotorRastreo) -> None:
+        self.estado['vistos'] = dict(motor.frontera.vistos)
+        self.estado['completados'] = sorted(self._completados)
+        self.estado['errores'] = dict(motor.errores)
+        escribir_json_atomico(self.ruta_checkpoint, self.estado)
+        self._ultimo_checkpoint = time.monotonic()
+
+    def _al_completar(self, motor: MotorRastreo, tipo: str, url: str, resultado) -> None:
+        if tipo == INDICE:
+            self.estado['cuadernos'][url] = [e['url'] for e in resultado]
+            for enlace in resultado:
+                semana = self.estado['semanas'].setdefault(enlace['url'], {})
+                semana.update(enlace)
+                semana['cuaderno'] = url
+        elif tipo == SEMANA:
+            semana = self.estado['semanas'].setdefault(url, {'url': url})
+            semana['huella'] = huella_datos(resultado)
+
+        self._completados.add(url)
+        if time.monotonic() - self._ultimo_checkpoint >= INTERVALO_CHECKPOINT:
+            self.guardar_checkpoint(motor)
+
+    async def ejecutar(self, reanudar: bool = True) -> Dict:
+        """Recorre la biblioteca (reanudando si hay punto de control) y devuelve el manifiesto."""
+        motor = MotorRastreo(
+            extraer_semanas=self.extraer_semanas,
+            **self.opciones_motor
+        )
+        motor.al_completar = lambda tipo, url, resultado: self._al_completar(motor, tipo, url, resultado)
+
+        if reanudar and self.cargar_checkpoint():
+            pendientes = len(self.estado['vistos']) - len(self._completados)
+            log.info('♻️ Reanudando: %d completadas, %d pendientes', len(self._completados), pendientes)
+            motor.frontera.restaurar(self.estado['vistos'], self._completados)
+        else:
+            motor.sembrar(self.raices, BIBLIOTECA)
+
+        try:
+            await motor.ejecutar()
+        finally:
+            # También al interrumpir (Ctrl+C): lo hecho no se pierde
+            self.guardar_checkpoint(motor)
+
+        self.motor = motor
+        return self.manifiesto()
+
+    def manifiesto(self) -> Dict:
+        """Cuadernos y semanas encontrados, ordenados para poder compararlos."""
+        cuadernos = {}
+        for url_cuaderno, semanas in sorted(self.estado['cuadernos'].items()):
+            cuadernos[url_cuaderno] = [
+                {k: v for k, v in self.estado['semanas'][url].items() if k != 'cuaderno'}
+                for url in semanas
+            ]
+        return {
+            'generado': datetime.now().isoformat(),
+            'raices': self.raices,
+            'total_cuadernos': len(cuadernos),
+            'total_semanas': sum(len(s) for s in cuadernos.values()),
+            'cuadernos': cuadernos,
+        }
+
+# ==================== COMPARACIÓN DE MANIFIESTOS ====================
+
+def _semanas_por_url(manifiesto: Dict) -> Dict[str, Dict]:
+    return {s['url']: s for semanas in manifiesto.get('cuadernos', {}).values() for s in semanas}
+
+def comparar_manifiestos(anterior: Dict, actual: Dict) -> Dict[str, List[str]]:
+    """Diferencias entre dos manifiestos: cuadernos y semanas nuevas, eliminadas o cambiadas."""
+    cuadernos_antes = set(anterior.get('cuadernos', {}))
+    cuadernos_ahora = set(actual.get('cuadernos', {}))
+    semanas_antes = _semanas_por_url(anterior)
+    semanas_ahora = _semanas_por_url(actual)
+
+    cambiadas = [
+        url for url in semanas_ahora.keys() & semanas_antes.keys()
+        if semanas_ahora[url].get('huella') and semanas_antes[url].get('huella')
+        and semanas_ahora[url]['huella'] != semanas_antes[url]['huella']
+    ]
+    return {
+        'cuadernos_nuevos': sorted(cuadernos_ahora - cuadernos_antes),
+        'cuadernos_eliminados': sorted(cuadernos_antes - cuadernos_ahora),
+        'semanas_nuevas': sorted(semanas_ahora.keys() - semanas_antes.keys()),
+        'semanas_eliminadas': sorted(semanas_antes.keys() - semanas_ahora.keys()),
+        'semanas_cambiadas': sorted(cambiadas),
+    }
+
+def descubrir(raices: Iterable[str], reanudar: bool = True, **opciones) -> Dict:
+    """Atajo síncrono: recorre la biblioteca y devuelve el manifiesto."""
+    return asyncio.run(Descubrimiento(raices, **opciones).ejecutar(reanudar))
@@ -0,0 +1,93 @@
+"""
+Exportación - Semanas guardadas a JSON Lines o CSV, en flujo
+Los generadores producen el texto semana a semana, así que exportar años
+de programas usa memoria constante y los primeros bytes salen enseguida.
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from .almacen import generar_id_semana
+
+FORMATOS = ('jsonl', 'csv')
+TIPOS_MIME = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+SECCIONES = ('tesoros_biblia', 'seamos_maestros', 'vida_cristiana')
+
+# Una fila por parte, con los datos de su semana repetidos
+COLUMNAS_CSV = (
+    'semana_id', 'fecha', 'fecha_inicio', 'fecha_fin', 'lectura_biblica',
+    'cancion_inicial', 'cancion_intermedia', 'cancion_final',
+    'seccion', 'numero', 'titulo', 'duracion', 'rol',
+)
+
+Registros = Iterable[Tuple[str, Dict]]
+
+def exportar_jsonl(registros: Registros) -> Iterator[str]:
+    """Una línea JSON por semana: semana_id, url, fecha_extraccion y datos."""
+    for semana_id, registro in registros:
+        yield json.dumps({
+            'semana_id': semana_id,
+            'url': registro.get('url'),
+            'fecha_extraccion': registro.get('fecha_extraccion'),
+            'datos': registro['datos'],
+        }, ensure_ascii=False) + '\n'
+
+def exportar_csv(registros: Registros) -> Iterator[str]:
+    """Cabecera y luego las filas de cada semana (un bloque de texto por semana)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def vaciar() -> str:
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+
+    escritor.writerow(COLUMNAS_CSV)
+    yield vaciar()
+    for semana_id, registro in registros:
+        datos = registro['datos']
+        canciones = datos.get('canciones') or {}
+        semana = (
+            semana_id, datos.get('fecha'), datos.get('fecha_inicio'), datos.get('fecha_fin'),
+            datos.get('lectura_biblica'),
+            canciones.get('inicial'), canciones.get('intermedia'), canciones.get('final'),
+        )
+        for seccion in SECCIONES:
+            for parte in datos.get(seccion, []):
+                escritor.writerow(semana + (
+                    seccion, parte.get('numero'), parte.get('titulo'), parte.get('duracion'), parte.get('rol'),
+                ))
+        yield vaciar()
+
+def exportar(registros: Registros, formato: str) -> Iterator[str]:
+    if formato == 'jsonl':
+        return exportar_jsonl(registros)
+    if formato == 'csv':
+        return exportar_csv(registros)
+    raise ValueError(f"Formato desconocido: {formato}. Opciones: {', '.join(FORMATOS)}")
+
+def leer_jsonl(ruta: str, desde: Optional[date] = None,
+               hasta: Optional[date] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    Semanas de un archivo JSON Lines (el de ``cli.py rastrear`` o el de una exportación),
+    línea a línea y filtradas por fechas
+    """
+    with open(ruta, encoding='utf-8') as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            registro = json.loads(linea)
+            datos = registro['datos']
+            if desde or hasta:
+                if not (datos.get('fecha_inicio') and datos.get('fecha_fin')):
+                    continue
+                if desde and date.fromisoformat(datos['fecha_fin']) < desde:
+                    continue
+                if hasta and date.fromisoformat(datos['fecha_inicio']) > hasta:
+                    continue
+            semana_id = registro.get('semana_id') or generar_id_semana(datos['fecha'], datos.get('fecha_inicio'))
+            yield semana_id, registro
@@ -0,0 +1,141 @@
+"""
+Extracción paralela - Descarga con hilos y análisis en procesos
+El análisis con BeautifulSoup y las expresiones regulares usa CPU y está
+limitado por el GIL; en extracciones masivas los hilos solo descargan y
+un pool de procesos (reutilizado entre lotes) hace el análisis.
+"""
+
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import jw_scraper
+from .locales import LOCALES, obtener_paquete
+from .plazo import Plazo, PlazoVencidoError, con_plazo
+
+# ==================== CONFIGURACIÓN ====================
+# 0 desactiva el modo por procesos en la aplicación web
+PROCESOS = int(os.environ.get('JW_PROCESOS', '0'))
+HILOS_DESCARGA = int(os.environ.get('JW_HILOS_DESCARGA', '8'))
+# Segundos que espera /api/extraer-multiples y los que siguen en segundo plano las pendientes
+PLAZO_LOTE = float(os.environ.get('JW_PLAZO_LOTE', '25'))
+PLAZO_LOTE_MAXIMO = float(os.environ.get('JW_PLAZO_LOTE_MAXIMO', '55'))
+PLAZO_SEGUNDO_PLANO = float(os.environ.get('JW_PLAZO_SEGUNDO_PLANO', '300'))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_procesos = 0
+_pool_lock = threading.Lock()
+_hilos: Optional[ThreadPoolExecutor] = None
+
+def _inicializar_trabajador() -> None:
+    """Calienta cada proceso una sola vez: compila todos los paquetes de idioma."""
+    for idioma in LOCALES:
+        obtener_paquete(idioma)
+
+def _analizar(html: bytes, url: str) -> Optional[Dict]:
+    """Se ejecuta en el proceso hijo: bytes de entrada, semana estructurada de salida."""
+    return jw_scraper.extraer_datos_de_html(html, url)
+
+def obtener_pool(procesos: Optional[int] = None) -> ProcessPoolExecutor:
+    """Pool de procesos compartido; se crea una vez y sus trabajadores se reutilizan."""
+    global _pool, _pool_procesos
+    procesos = procesos or PROCESOS or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_procesos != procesos:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=procesos,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_inicializar_trabajador
+            )
+            _pool_procesos = procesos
+        return _pool
+
+def cerrar_pool() -> None:
+    """Detiene el pool de procesos (al apagar la aplicación)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+def extraer_semana_en_pool(url: str, procesos: Optional[int] = None) -> Optional[Dict]:
+    """
+    Descarga en el hilo actual y analiza en el pool de procesos
+
+    Pasa por extraer_datos_semana como la extracción normal: comparte la
+    coalescencia y el respaldo; solo el análisis se hace en el pool.
+    Lanza ServicioNoDisponibleError si jw.org no está disponible y no hay
+    copia anterior.
+    """
+    pool = obtener_pool(procesos)
+    return jw_scraper.extraer_datos_semana(url, lambda html, url: pool.submit(_analizar, html, url).result())
+
+# ==================== EXTRACCIÓN CON PLAZO ====================
+
+def _hilos_lote() -> ThreadPoolExecutor:
+    """Hilos compartidos por los lotes; sobreviven a la petición para seguir en segundo plano."""
+    global _hilos
+    with _pool_lock:
+        if _hilos is None:
+            _hilos = ThreadPoolExecutor(max_workers=max(1, HILOS_DESCARGA), thread_name_prefix='lote')
+        return _hilos
+
+def extraer_con_plazo(urls: List[str], tarea: Callable[[str], Optional[Dict]],
+                      segundos: float = PLAZO_LOTE, continuar: bool = False,
+                      al_terminar: Optional[Callable[[Dict], None]] = None) -> Tuple[List[Dict], List[str]]:
+    """
+    Extrae varias semanas en paralelo sin pasar de ``segundos``
+
+    Todas las descargas comparten un plazo (variable de contexto) que
+    recorta sus timeouts y reintentos. Al vencer se devuelve lo terminado;
+    lo demás queda pendiente y, con ``continuar``, sigue en segundo plano
+    hasta ``PLAZO_SEGUNDO_PLANO`` segundos más.
+
+    Args:
+        urls: URLs de las semanas (sin repetir)
+        tarea: Función que extrae una URL (p. ej. extraer_datos_semana)
+        segundos: Tiempo máximo de espera del llamador
+        continuar: Si las pendientes siguen ejecutándose tras el plazo
+        al_terminar: Llamada con cada resultado {'url', 'datos', 'error'}
+            al terminar, también para los que terminan en segundo plano
+
+    Returns:
+        (resultados terminados en el orden de ``urls``, URLs pendientes)
+    """
+    respuesta = Plazo(segundos)
+    trabajo = Plazo(segundos + PLAZO_SEGUNDO_PLANO) if continuar else respuesta
+
+    def ejecutar(url: str) -> Dict:
+        with con_plazo(trabajo):
+            try:
+                datos = tarea(url)
+                error = None if datos else 'No se pudieron extraer datos'
+            except PlazoVencidoError:
+                return {'url': url, 'datos': None, 'error': None, 'pendiente': True}
+            except Exception as e:
+                datos, error = None, str(e)
+        if not datos and trabajo.vencido():
+            return {'url': url, 'datos': None, 'error': None, 'pendiente': True}
+        resultado = {'url': url, 'datos': datos, 'error': error}
+        if al_terminar:
+            al_terminar(resultado)
+        return resultado
+
+    hilos = _hilos_lote()
+    futuros = [(url, hilos.submit(contextvars.copy_context().run, ejecutar, url)) for url in urls]
+    wait([f for _, f in futuros], timeout=respuesta.restante())
+
+    resultados, pendientes = [], []
+    for url, futuro in futuros:
+        if futuro.done() and not futuro.result().get('pendiente'):
+            resultados.append(futuro.result())
+        else:
+            pendientes.append(url)
+            if not continuar:
+                futuro.cancel()  # Solo cancela las que aún no empezaron
+    return resultados, pendientes
@@ -0,0 +1,223 @@
+"""
+Fechas - Fechas reales de las semanas del cuaderno
+Convierte títulos como "29 de diciembre a 4 de enero" en fechas con año
+y mantiene un índice ordenado para consultas por rango.
+"""
+
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .locales import PaqueteIdioma, obtener_paquete, paquete_desde_url
+
+# Entre el inicio y el fin de una semana nunca hay más de 6 días
+DURACION_MAXIMA = timedelta(days=6)
+
+_PATRON_CUADERNO = re.compile(r'/([^/]*?)-?(\d{4})-mwb/?', re.IGNORECASE)
+_PATRON_NUMERO = re.compile(r'/([^/]+-mwb)(?:/|$)', re.IGNORECASE)
+_PATRON_ANIO = re.compile(r'(?<!\d)(20\d{2})(?!\d)')
+
+# Cota superior para los IDs en las búsquedas con bisect
+_ULTIMO = '\uffff'
+
+# ==================== AÑO DESDE LA URL ====================
+
+def anio_desde_url(url: Optional[str]) -> Optional[int]:
+    """Obtiene el año del número del cuaderno (p. ej. 'noviembre-diciembre-2025-mwb')."""
+    ruta = urlparse(url or '').path
+    match = _PATRON_CUADERNO.search(ruta) or _PATRON_ANIO.search(ruta)
+    return int(match.group(match.lastindex)) if match else None
+
+def mes_cuaderno_desde_url(url: Optional[str], paquete: PaqueteIdioma) -> Optional[int]:
+    """Primer mes del número del cuaderno, si la URL lo indica."""
+    match = _PATRON_CUADERNO.search(urlparse(url or '').path)
+    if not match:
+        return None
+    mes = paquete.mes.search(match.group(1).replace('-', ' '))
+    return paquete.meses.get(mes.group(1).lower()) if mes else None
+
+def cuaderno_desde_url(url: Optional[str]) -> Optional[str]:
+    """Número del cuaderno al que pertenece una URL (p. ej. 'noviembre-diciembre-2025-mwb')."""
+    match = _PATRON_NUMERO.search(urlparse(url or '').path)
+    return match.group(1).lower() if match else None
+
+# ==================== INTERPRETACIÓN DE TÍTULOS ====================
+
+def parsear_rango_semana(titulo: str, anio_base: Optional[int] = None,
+                         paquete: Optional[PaqueteIdioma] = None,
+                         mes_cuaderno: Optional[int] = None) -> Optional[Tuple[date, date]]:
+    """
+    Convierte el título de una semana en fechas de inicio y fin
+
+    Args:
+        titulo: Título de la semana ("3-9 de noviembre", "November 3-9"...)
+        anio_base: Año del cuaderno; si falta se usa el año actual
+        paquete: Paquete de idioma del título
+        mes_cuaderno: Primer mes del cuaderno, para semanas que empiezan en diciembre
+
+    Returns:
+        Tupla (inicio, fin) o None si el título no contiene una fecha válida
+    """
+    paquete = paquete or obtener_paquete()
+
+    fechas = []      # [dia, mes, anio, anio_explicito]
+    pendientes = []  # días que aún esperan su mes (idiomas día-mes)
+    mes_actual = None
+
+    for match in paquete.tokens_fecha.finditer(titulo):
+        anio, dia, mes = match.groups()
+        if anio:
+            for fecha in fechas:
+                if fecha[2] is None:
+                    fecha[2], fecha[3] = int(anio), True
+        elif dia:
+            if paquete.orden_fecha == 'dia_mes':
+                pendientes.append(int(dia))
+            elif mes_actual:
+                fechas.append([int(dia), mes_actual, None, False])
+        else:
+            mes_actual = paquete.meses[mes.lower()]
+            fechas.extend([d, mes_actual, None, False] for d in pendientes)
+            pendientes = []
+
+    if not fechas:
+        return None
+
+    inicio, fin = fechas[0], fechas[-1]
+    if inicio[2] is None:
+        inicio[2] = anio_base or date.today().year
+        # Semana de diciembre al principio del cuaderno enero-febrero
+        if mes_cuaderno and inicio[1] - mes_cuaderno > 6:
+            inicio[2] -= 1
+    if fin[2] is None:
+        fin[2] = inicio[2]
+
+    try:
+        fecha_inicio = date(inicio[2], inicio[1], inicio[0])
+        fecha_fin = date(fin[2], fin[1], fin[0])
+        if fecha_fin < fecha_inicio:
+            if fin[3]:
+                fecha_inicio = fecha_inicio.replace(year=fecha_inicio.year - 1)
+            else:
+                fecha_fin = fecha_fin.replace(year=fecha_fin.year + 1)
+    except ValueError:
+        return None
+
+    return fecha_inicio, fecha_fin
+
+def fechas_semana(titulo: str, url: Optional[str] = None,
+                  paquete: Optional[PaqueteIdioma] = None) -> Optional[Tuple[date, date]]:
+    """Fechas de una semana tomando el idioma y el año de la URL del cuaderno."""
+    paquete = paquete or paquete_desde_url(url)
+    return parsear_rango_semana(
+        titulo,
+        anio_base=anio_desde_url(url),
+        paquete=paquete,
+        mes_cuaderno=mes_cuaderno_desde_url(url, paquete)
+    )
+
+# ==================== ÍNDICE ORDENADO ====================
+
+class IndiceFechas:
+    """
+    Índice de semanas ordenado por fecha de inicio
+
+    Las búsquedas por rango, la semana actual y cada página del listado
+    cuestan O(log n) más el número de resultados. Las semanas sin fecha
+    se guardan al principio (solo aparecen en el listado sin filtros).
+    No es seguro entre hilos: quien lo use debe protegerlo con su propio
+    candado.
+    """
+
+    def __init__(self):
+        self._claves: List[Tuple[int, str]] = []
+        self._fechas: Dict[str, Optional[Tuple[date, date]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def __contains__(self, semana_id: str) -> bool:
+        return semana_id in self._fechas
+
+    @staticmethod
+    def _ordinal(fechas: Optional[Tuple[date, date]]) -> int:
+        return fechas[0].toordinal() if fechas else 0
+
+    def agregar(self, semana_id: str, inicio: Optional[date] = None, fin: Optional[date] = None) -> None:
+        """Agrega (o reemplaza) una semana en el índice."""
+        self.quitar(semana_id)
+        fechas = (inicio, fin) if inicio and fin else None
+        self._fechas[semana_id] = fechas
+        insort(self._claves, (self._ordinal(fechas), semana_id))
+
+    def quitar(self, semana_id: str) -> None:
+        """Quita una semana del índice si existe."""
+        if semana_id not in self._fechas:
+            return
+        clave = (self._ordinal(self._fechas.pop(semana_id)), semana_id)
+        pos = bisect_left(self._claves, clave)
+        if pos < len(self._claves) and self._claves[pos] == clave:
+            del self._claves[pos]
+
+    def fechas(self, semana_id: str) -> Optional[Tuple[date, date]]:
+        """Fechas de inicio y fin registradas para una semana (None si no tiene)."""
+        return self._fechas.get(semana_id)
+
+    def _inicio(self, desde: Optional[date]) -> int:
+        """Primera posición candidata: con fecha, y a lo sumo una semana antes de ``desde``."""
+        if desde:
+            return bisect_left(self._claves, ((desde - DURACION_MAXIMA).toordinal(), ''))
+        return bisect_left(self._claves, (1, ''))
+
+    def _fin(self, hasta: Optional[date]) -> int:
+        return bisect_right(self._claves, (hasta.toordinal(), _ULTIMO)) if hasta else len(self._claves)
+
+    def rango(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[str]:
+        """IDs de las semanas que se solapan con [desde, hasta], en orden cronológico."""
+        semanas = []
+        for _, semana_id in self._claves[self._inicio(desde):self._fin(hasta)]:
+            if desde and self._fechas[semana_id][1] < desde:
+                continue
+            semanas.append(semana_id)
+        return semanas
+
+    def pagina(self, limite: int, despues_de: Optional[Tuple[int, str]] = None,
+               desde: Optional[date] = None,
+               hasta: Optional[date] = None) -> Tuple[List[str], Optional[Tuple[int, str]]]:
+        """
+        Una página del listado en orden cronológico, continuando tras ``despues_de``
+
+        Sin ``desde`` ni ``hasta`` incluye también las semanas sin fecha.
+
+        Returns:
+            (IDs de la página, clave desde la que sigue la próxima o None si no hay más)
+        """
+        inicio = self._inicio(desde) if desde or hasta else 0
+        if despues_de:
+            inicio = max(inicio, bisect_right(self._claves, tuple(despues_de)))
+        fin = self._fin(hasta)
+
+        semanas = []
+        pos = inicio
+        while pos < fin and len(semanas) < limite:
+            _, semana_id = self._claves[pos]
+            pos += 1
+            if desde and self._fechas[semana_id][1] < desde:
+                continue
+            semanas.append(semana_id)
+        return semanas, (self._claves[pos - 1] if pos < fin and semanas else None)
+
+    def actual(self, hoy: Optional[date] = None) -> Optional[str]:
+        """ID de la semana que contiene la fecha indicada (hoy por defecto)."""
+        hoy = hoy or date.today()
+        pos = bisect_right(self._claves, (hoy.toordinal(), _ULTIMO))
+        while pos > 0:
+            pos -= 1
+            ordinal, semana_id = self._claves[pos]
+            if hoy.toordinal() - ordinal > DURACION_MAXIMA.days:
+                break
+            if self._fechas[semana_id][1] >= hoy:
+                return semana_id
+        return None
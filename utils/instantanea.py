@@ -0,0 +1,129 @@
+"""
+Instantánea - Exportar e importar el estado caliente de una instancia
+Guarda en un archivo comprimido las semanas extraídas y los resultados
+recientes de índices y semanas, para que una instancia nueva arranque con
+ellos en lugar de volver a pedirlos a jw.org.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from .almacen import AlmacenSemanas
+from .compresion import escribir_atomico
+from .proteccion import RespaldoLRU
+from .registro import log
+
+# ==================== CONFIGURACIÓN ====================
+RUTA_INSTANTANEA = os.environ.get('JW_INSTANTANEA', os.path.join('cache', 'instantanea.json.gz'))
+PRESUPUESTO_CARGA = float(os.environ.get('JW_INSTANTANEA_PRESUPUESTO', '10'))  # Segundos
+FORMATO = 1
+
+def exportar_instantanea(ruta: str, almacen: AlmacenSemanas, respaldo: RespaldoLRU,
+                         version_extractor: str) -> Dict:
+    """Escribe la instantánea (JSON comprimido, escritura atómica) y devuelve su resumen."""
+    datos = {
+        'formato': FORMATO,
+        'version_extractor': version_extractor,
+        'creado': datetime.now().isoformat(),
+        'semanas': dict(almacen.items()),
+        # Claves ('indice' | 'semana', url) con el instante en que se obtuvieron
+        'respaldo': [[list(clave), valor, instante] for clave, valor, instante in respaldo.items()],
+    }
+    contenido = gzip.compress(
+        json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+        compresslevel=6, mtime=0
+    )
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    escribir_atomico(ruta, contenido)
+    return {'semanas': len(datos['semanas']), 'respaldo': len(datos['respaldo']), 'bytes': len(contenido)}
+
+def importar_instantanea(ruta: str, almacen: AlmacenSemanas, respaldo: RespaldoLRU,
+                         version_extractor: str, presupuesto: float = PRESUPUESTO_CARGA) -> Dict:
+    """
+    Carga una instantánea hasta agotar el presupuesto de tiempo
+
+    Lo más reciente se carga primero, así que si el presupuesto se agota
+    queda fuera lo menos útil. Una instantánea de otra versión del
+    extractor solo aporta las semanas ya extraídas, no los resultados
+    en caché (se volverán a analizar con el código actual).
+    """
+    inicio = time.monotonic()
+    resumen = {'semanas': 0, 'respaldo': 0, 'completa': True}
+
+    with open(ruta, 'rb') as f:
+        datos = json.loads(gzip.decompress(f.read()))
+    if datos.get('formato') != FORMATO:
+        raise ValueError(f"Formato de instantánea no admitido: {datos.get('formato')}")
+
+    def agotado() -> bool:
+        if time.monotonic() - inicio > presupuesto:
+            resumen['completa'] = False
+        return not resumen['completa']
+
+    semanas = sorted(
+        datos['semanas'].items(), key=lambda item: item[1].get('fecha_extraccion', ''), reverse=True
+    )
+    for semana_id, registro in semanas:
+        if agotado():
+            break
+        if semana_id not in almacen:
+            almacen.cargar(semana_id, registro)
+            resumen['semanas'] += 1
+
+    if datos.get('version_extractor') == version_extractor:
+        # El respaldo es una LRU: se inserta de lo más antiguo a lo más reciente
+        entradas = datos['respaldo'][-respaldo.tamano:]
+        for clave, valor, instante in entradas:
+            if agotado():
+                break
+            respaldo.guardar(tuple(clave), valor, instante)
+            resumen['respaldo'] += 1
+
+    resumen['segundos'] = round(time.monotonic() - inicio, 3)
+    return resumen
+
+# ==================== CARGA AL ARRANCAR ====================
+
+class CargaInicial:
+    """Carga la instantánea en segundo plano; ``listo`` indica si ya terminó."""
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resumen: Dict = {'estado': 'sin_instantanea'}
+        self._limite = 0.0
+
+    def esta_listo(self) -> bool:
+        """Terminó la carga o se agotó el presupuesto (la instancia no espera más)."""
+        return self.listo.is_set() or time.monotonic() > self._limite
+
+    def iniciar(self, almacen: AlmacenSemanas, respaldo: RespaldoLRU, version_extractor: str,
+                ruta: Optional[str] = RUTA_INSTANTANEA,
+                presupuesto: float = PRESUPUESTO_CARGA) -> None:
+        if not ruta or not os.path.exists(ruta):
+            self.listo.set()
+            return
+        # Margen: leer y descomprimir el archivo no se puede interrumpir
+        self._limite = time.monotonic() + presupuesto * 1.5
+
+        def cargar():
+            self.resumen = {'estado': 'cargando', 'ruta': ruta}
+            try:
+                resumen = importar_instantanea(ruta, almacen, respaldo, version_extractor, presupuesto)
+                self.resumen = {'estado': 'cargada', 'ruta': ruta, **resumen}
+                log.info('🔥 Instantánea cargada', extra={'ruta': ruta, **resumen})
+            except Exception as e:
+                self.resumen = {'estado': 'error', 'ruta': ruta, 'error': str(e)}
+                log.warning('⚠️ No se pudo cargar la instantánea: %s', e, extra={'ruta': ruta})
+            finally:
+                self.listo.set()
+
+        threading.Thread(target=cargar, name='carga-instantanea', daemon=True).start()
+
+carga_inicial = CargaInicial()
@@ -5,10 +5,26 @@ Extrae datos de reuniones JW.org y genera HTMLs descargables
 
 import requests
 from bs4 import BeautifulSoup
+import codecs
+import copy
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 import os
+from html.parser import HTMLParser
 from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from .fechas import fechas_semana
+from . import fechas, locales
+from .locales import PaqueteIdioma, obtener_paquete, paquete_desde_url
+from .memo import MemoContenido, huella_codigo
+from .archivo import BACKEND, BackendDescarga, EntradaNoArchivadaError, crear_backend
+from .plazo import PlazoVencidoError, acotar, vencido
+from .proteccion import RespaldoLRU, ServicioNoDisponibleError, obtener_proteccion
+from .registro import configurar_registro, etapa, log
+from .vuelo_unico import VueloUnico
 
 # ==================== CONFIGURACIÓN ====================
 HEADERS = {
@@ -19,182 +35,444 @@ HEADERS = {
 }
 
 TIMEOUT = 30
+TIMEOUT_CONEXION = 5
 MAX_REINTENTOS = 3
 
+# Páginas de semana: se leen en trozos y se deja de leer al cerrarse <main>
+TROZO_DESCARGA = 16 * 1024
+PRESUPUESTO_PAGINA = int(os.environ.get('JW_PRESUPUESTO_PAGINA', str(2 * 1024 * 1024)))  # Bytes
+
+# Respuestas del origen que indican que está limitando o sobrecargado
+ESTADOS_LIMITADO = (429, 503)
+
+# Cuánto espera una petición a otra idéntica que ya está en curso
+ESPERA_VUELO_COMPARTIDO = TIMEOUT * MAX_REINTENTOS
+
+# Peticiones idénticas y simultáneas comparten una sola descarga y análisis
+_vuelos = VueloUnico()
+
+# Últimos resultados correctos, servidos mientras el origen no responde
+_respaldo = RespaldoLRU()
+
+# Segundos durante los que un resultado se sirve sin volver a jw.org. Por defecto 0:
+# siempre se descarga (un índice republicado o una semana corregida se ven enseguida)
+# y el respaldo solo se usa si el origen no está disponible.
+FRESCURA = int(os.environ.get('JW_FRESCURA', '0'))
+
+# Versión del extractor: cambia sola cuando cambia el código de extracción
+VERSION_EXTRACTOR = huella_codigo([__file__, locales.__file__, fechas.__file__])
+
+# Semanas ya analizadas, por hash del HTML + versión del extractor
+_memo = MemoContenido(VERSION_EXTRACTOR)
+
 # Crear carpeta de salida
 OUTPUT_DIR = Path("programas_generados")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-LIBROS_BIBLIA = (
-    'ECLESIASTÉS', 'GÉNESIS', 'ÉXODO', 'LEVÍTICO', 'NÚMEROS', 'DEUTERONOMIO',
-    'JOSUÉ', 'JUECES', 'RUT', 'SAMUEL', 'REYES', 'CRÓNICAS', 'ESDRAS',
-    'NEHEMÍAS', 'ESTER', 'JOB', 'SALMOS', 'PROVERBIOS', 'CANTARES',
-    'ISAÍAS', 'JEREMÍAS', 'LAMENTACIONES', 'EZEQUIEL', 'DANIEL',
-    'OSEAS', 'JOEL', 'AMÓS', 'ABDÍAS', 'JONÁS', 'MIQUEAS', 'NAHÚM',
-    'HABACUC', 'SOFONÍAS', 'HAGEO', 'ZACARÍAS', 'MALAQUÍAS',
-    'MATEO', 'MARCOS', 'LUCAS', 'JUAN', 'HECHOS', 'ROMANOS',
-    'CORINTIOS', 'GÁLATAS', 'EFESIOS', 'FILIPENSES', 'COLOSENSES',
-    'TESALONICENSES', 'TIMOTEO', 'TITO', 'FILEMÓN', 'HEBREOS',
-    'SANTIAGO', 'PEDRO', 'JUDAS', 'APOCALIPSIS'
-)
-
-PATRONES = {
-    'fecha': re.compile(r'\d{1,2}\s*(?:-\s*\d{1,2}|de\s+\w+\s+(?:a|al)\s+\d{1,2})\s+de\s+\w+', re.IGNORECASE),
-    'cancion': re.compile(r'Canción\s+(\d+)', re.IGNORECASE),
-    'palabras': re.compile(r'Palabras\s+de\s+(introducción|conclusión)\s*[:\(]?\s*(\d+)\s*min', re.IGNORECASE),
-    'parte_numerada': re.compile(r'^(\d+)\.\s*([^\n(]+?)\s*\((\d+)\s*min', re.MULTILINE | re.IGNORECASE),
-}
+def _cabeceras(paquete: PaqueteIdioma) -> Dict[str, str]:
+    """Cabeceras HTTP con el Accept-Language del idioma solicitado."""
+    return {**HEADERS, 'Accept-Language': paquete.accept_language}
+
+def _segundos_retry_after(response: requests.Response) -> Optional[float]:
+    """Lee la cabecera Retry-After cuando viene en segundos."""
+    valor = response.headers.get('Retry-After', '')
+    return float(valor) if valor.isdigit() else None
+
+def _descargar(url: str, reintentos: int = MAX_REINTENTOS,
+               cabeceras_extra: Optional[Dict[str, str]] = None,
+               flujo: bool = False) -> requests.Response:
+    """
+    Descarga una URL pasando por el cortacircuitos y el limitador del host
+    
+    ``cabeceras_extra`` permite peticiones condicionales; un 304 se devuelve
+    como respuesta correcta (sin cuerpo). Con ``flujo`` el cuerpo no se lee:
+    quien llama lo recorre con ``iter_content`` y cierra la respuesta.
+
+    Raises:
+        ServicioNoDisponibleError: si el circuito está abierto o no hay turno
+        requests.RequestException: si fallan todos los intentos
+    """
+    proteccion = obtener_proteccion(urlparse(url).netloc)
+    cabeceras = {**_cabeceras(paquete_desde_url(url)), **(cabeceras_extra or {})}
+    
+    for intento in range(1, reintentos + 1):
+        # Con un plazo activo (p. ej. extracción masiva) los timeouts se ajustan a lo que queda
+        timeouts = (acotar(TIMEOUT_CONEXION), acotar(TIMEOUT))
+        es_prueba = proteccion.antes_de_pedir()
+        try:
+            response = requests.get(
+                url,
+                headers=cabeceras,
+                timeout=timeouts,
+                allow_redirects=True,
+                stream=flujo
+            )
+        except requests.RequestException:
+            if vencido():
+                # Culpa del plazo, no del host: no cuenta para el cortacircuitos
+                if es_prueba:
+                    proteccion.circuito.cancelar_prueba()
+                raise PlazoVencidoError(f'Plazo agotado descargando {url}')
+            proteccion.registrar_fallo()
+            if intento == reintentos:
+                raise
+            continue
+        except BaseException:
+            if es_prueba:
+                proteccion.circuito.cancelar_prueba()
+            raise
+        
+        if response.status_code in ESTADOS_LIMITADO or response.status_code >= 500:
+            response.close()
+            proteccion.registrar_fallo(
+                limitado=response.status_code in ESTADOS_LIMITADO,
+                reintentar_en=_segundos_retry_after(response)
+            )
+            if intento == reintentos:
+                response.raise_for_status()
+            time.sleep(acotar(min(2 ** intento * 0.25, TIMEOUT_CONEXION)))
+            continue
+        
+        # Un 404 no es culpa del host: cuenta como respuesta correcta
+        proteccion.registrar_exito()
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+        return response
+
+def _descargar_contenido(url: str) -> bytes:
+    """Backend http: cuerpo de la respuesta descargada en vivo."""
+    return _descargar(url).content
+
+class _FinPrincipal(HTMLParser):
+    """Analizador incremental que solo vigila cuándo se cierra el <main> de la página."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.profundidad = 0
+        self.terminado = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'main':
+            self.profundidad += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'main' and self.profundidad:
+            self.profundidad -= 1
+            self.terminado = not self.profundidad
+
+def _descargar_principal(url: str, presupuesto: int = PRESUPUESTO_PAGINA) -> bytes:
+    """
+    Backend http para páginas de semana: lee el cuerpo en trozos y corta
+    al cerrarse </main> (lo que sigue, pie y scripts, no se usa)
+
+    Si la página supera ``presupuesto`` bytes se deja de leer y se
+    analiza lo recibido.
+    """
+    response = _descargar(url, flujo=True)
+    try:
+        detector = _FinPrincipal()
+        decodificador = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        trozos = []
+        leidos = 0
+        for trozo in response.iter_content(TROZO_DESCARGA):
+            excedido = leidos + len(trozo) > presupuesto
+            if excedido:
+                trozo = trozo[:presupuesto - leidos]
+            trozos.append(trozo)
+            leidos += len(trozo)
+            detector.feed(decodificador.decode(trozo))
+            if detector.terminado:
+                break
+            if excedido:
+                log.warning('✂️ Página cortada: supera el presupuesto de %d bytes', presupuesto,
+                            extra={'url': url})
+                break
+        return b''.join(trozos)
+    finally:
+        # Cortar a medias descarta la conexión en lugar de devolverla al pool
+        response.close()
+
+_backend: Optional[BackendDescarga] = None
+_backend_lock = threading.Lock()
+
+def obtener_backend() -> BackendDescarga:
+    """Backend de descarga activo (JW_BACKEND: http, grabar o reproducir)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = crear_backend(BACKEND, _descargar_contenido, funcion_principal=_descargar_principal)
+        return _backend
+
+def usar_backend(backend: BackendDescarga) -> None:
+    """Cambia el backend de descarga (CLI o pruebas)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+def _plazo_ajeno(error: BaseException) -> bool:
+    """El líder agotó su plazo, pero el seguidor (sin plazo o con tiempo) no: debe reintentar."""
+    return isinstance(error, PlazoVencidoError) and not vencido()
+
+def _con_respaldo(clave: tuple, funcion, *args):
+    """
+    Ejecuta con coalescencia; un resultado reciente (``FRESCURA``) se sirve
+    sin descargar y, si el origen no está disponible, se sirve el último.
+    """
+    if FRESCURA:
+        reciente = _respaldo.obtener(clave, max_edad=FRESCURA)
+        if reciente is not None:
+            return copy.deepcopy(reciente)
+    try:
+        resultado = _vuelos.ejecutar(
+            clave, funcion, *args, timeout=acotar(ESPERA_VUELO_COMPARTIDO),
+            reintentar_si=_plazo_ajeno
+        )
+    except ServicioNoDisponibleError:
+        obsoleto = _respaldo.obtener(clave)
+        if obsoleto is None:
+            raise
+        log.warning('⚠️ Origen no disponible, sirviendo copia anterior', extra={'url': clave[1]})
+        return copy.deepcopy(obsoleto)
+    if resultado:
+        _respaldo.guardar(clave, resultado)
+    return resultado
 
 # ==================== EXTRACCIÓN DE ENLACES ====================
 
 def obtener_enlaces_semanas(url_indice: str) -> List[Dict[str, str]]:
-    """Extrae todos los enlaces de semanas desde la URL índice."""
+    """
+    Extrae todos los enlaces de semanas desde la URL índice.
+    
+    Lanza ServicioNoDisponibleError si jw.org no responde y no hay copia anterior.
+    """
     try:
-        print("🔍 Buscando todas las semanas disponibles...\n")
-        response = requests.get(url_indice, headers=HEADERS, timeout=TIMEOUT)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        enlaces = []
-        
-        # Buscar en el contenido principal
-        main_content_div = soup.find('div', class_='docPart')
-        if main_content_div:
-            links = main_content_div.find_all('a', href=True)
-        else:
-            links = soup.find_all('a', href=True)
-        
-        for link in links:
-            href = link.get('href')
-            texto = link.get_text(strip=True)
-            
-            # Filtrar enlaces válidos de semanas
-            if '/es/biblioteca/guia-actividades-reunion-testigos-jehova/' in href and texto:
-                if href != url_indice and not href.endswith('/mwb/'):
-                    if PATRONES['fecha'].search(texto):
-                        if not href.startswith('http'):
-                            href = f"https://www.jw.org{href}"
-                        enlaces.append({'titulo': texto, 'url': href})
-        
-        # Ordenar cronológicamente
-        enlaces.sort(key=lambda x: extraer_fecha_para_ordenar(x['titulo']))
-        
-        print(f"✅ Se encontraron {len(enlaces)} semanas\n")
+        return _con_respaldo(('indice', url_indice), _obtener_enlaces_semanas, url_indice)
+    except TimeoutError as e:
+        log.warning('⏱️ %s', e, extra={'url': url_indice})
+        return []
+
+def refrescar_enlaces_semanas(url_indice: str, validadores: Optional[Dict[str, str]] = None
+                              ) -> Tuple[Optional[List[Dict[str, str]]], Dict[str, str]]:
+    """
+    Vuelve a pedir el índice solo si cambió (If-None-Match / If-Modified-Since)
+    
+    Si cambió, el resultado sustituye al guardado, de modo que
+    ``obtener_enlaces_semanas`` ya devuelve las semanas nuevas.
+    
+    Returns:
+        (enlaces o None si no cambió, validadores ETag/Last-Modified para la próxima vez)
+    """
+    validadores = validadores or {}
+    if obtener_backend().nombre != 'http':
+        # Sin red real (archivo de respuestas): no hay validadores que comparar
+        return obtener_enlaces_semanas(url_indice), {}
+    
+    cabeceras = {}
+    if validadores.get('ETag'):
+        cabeceras['If-None-Match'] = validadores['ETag']
+    if validadores.get('Last-Modified'):
+        cabeceras['If-Modified-Since'] = validadores['Last-Modified']
+    
+    with etapa('descarga', url=url_indice, condicional=bool(cabeceras)) as campos:
+        response = _descargar(url_indice, cabeceras_extra=cabeceras)
+        campos['estado'] = response.status_code
+    nuevos = {k: response.headers[k] for k in ('ETag', 'Last-Modified') if k in response.headers}
+    if response.status_code == 304:
+        return None, nuevos or validadores
+    
+    enlaces = extraer_enlaces_de_html(response.content, url_indice)
+    if enlaces:
+        _respaldo.guardar(('indice', url_indice), enlaces)
+    return enlaces, nuevos
+
+def _obtener_enlaces_semanas(url_indice: str) -> List[Dict[str, str]]:
+    """Descarga y analiza el índice (sin coalescencia)."""
+    try:
+        with etapa('descarga', url=url_indice) as campos:
+            html = obtener_backend().descargar(url_indice)
+            campos['bytes'] = len(html)
+        with etapa('analisis', url=url_indice) as campos:
+            enlaces = extraer_enlaces_de_html(html, url_indice)
+            campos['semanas'] = len(enlaces)
         return enlaces
         
+    except ServicioNoDisponibleError:
+        raise
     except Exception as e:
-        print(f"❌ Error al obtener enlaces: {e}")
+        log.error('❌ Error al obtener enlaces: %s', e, extra={'url': url_indice})
         return []
 
-def extraer_fecha_para_ordenar(titulo: str) -> tuple:
-    """Extrae la fecha inicial para ordenar cronológicamente."""
-    meses = {
-        'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
-        'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
-        'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-    }
-    
-    match = re.search(r'(\d{1,2})[- ].*?de\s+(\w+)', titulo, re.IGNORECASE)
-    if match:
-        dia = int(match.group(1))
-        mes_texto = match.group(2).lower()
-        mes = meses.get(mes_texto, 0)
-        return (mes, dia)
-    return (0, 0)
+def extraer_enlaces_de_html(html: bytes, url_indice: str) -> List[Dict[str, str]]:
+    """Extrae los enlaces de semanas de un índice ya descargado."""
+    paquete = paquete_desde_url(url_indice)
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    enlaces = []
+    
+    # Buscar en el contenido principal
+    main_content_div = soup.find('div', class_='docPart')
+    if main_content_div:
+        links = main_content_div.find_all('a', href=True)
+    else:
+        links = soup.find_all('a', href=True)
+    
+    for link in links:
+        href = link.get('href')
+        texto = link.get_text(strip=True)
+        
+        # Filtrar enlaces válidos de semanas
+        if paquete.ruta_cuaderno in href and texto:
+            if href != url_indice and not href.endswith('/mwb/'):
+                if paquete.fecha.search(texto):
+                    href = urljoin(url_indice, href)
+                    enlace = {'titulo': texto, 'url': href}
+                    rango = fechas_semana(texto, url_indice, paquete)
+                    if rango:
+                        enlace['fecha_inicio'] = rango[0].isoformat()
+                        enlace['fecha_fin'] = rango[1].isoformat()
+                    enlaces.append(enlace)
+    
+    # Ordenar cronológicamente (con el año del cuaderno)
+    enlaces.sort(key=lambda x: extraer_fecha_para_ordenar(x['titulo'], paquete, url_indice))
+    return enlaces
+
+def extraer_cuadernos_de_html(html: bytes, url_biblioteca: str) -> Dict[str, List[str]]:
+    """
+    Extrae de una página de la biblioteca los números del cuaderno
+    (enlaces '...-mwb/') y otras páginas de la biblioteca (filtros por año).
+    """
+    paquete = paquete_desde_url(url_biblioteca)
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    cuadernos, paginas = [], []
+    for link in soup.find_all('a', href=True):
+        href = urljoin(url_biblioteca, link['href']).split('#')[0]
+        partes = urlparse(href)
+        if not partes.path.startswith(paquete.ruta_cuaderno):
+            continue
+        if partes.path.rstrip('/').endswith('-mwb') and not partes.query:
+            if href not in cuadernos:
+                cuadernos.append(href)
+        elif partes.path == paquete.ruta_cuaderno and 'yearFilter=' in partes.query:
+            if href not in paginas and href != url_biblioteca:
+                paginas.append(href)
+    
+    return {'cuadernos': cuadernos, 'paginas': paginas}
+
+def extraer_fecha_para_ordenar(titulo: str, paquete: Optional[PaqueteIdioma] = None,
+                               url: Optional[str] = None) -> tuple:
+    """Extrae la fecha inicial (año, mes, día) para ordenar cronológicamente."""
+    rango = fechas_semana(titulo, url, paquete or obtener_paquete())
+    if rango:
+        return (rango[0].year, rango[0].month, rango[0].day)
+    return (0, 0, 0)
 
 # ==================== EXTRACCIÓN DE CONTENIDO ====================
 
 def obtener_contenido(url: str) -> Optional[str]:
     """Descarga y extrae texto de la página web con reintentos."""
-    for intento in range(1, MAX_REINTENTOS + 1):
-        try:
-            response = requests.get(
-                url,
-                headers=HEADERS,
-                timeout=TIMEOUT,
-                allow_redirects=True
-            )
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            main = soup.find('main') or soup
-            return main.get_text(separator='\n', strip=True)
-        except requests.Timeout:
-            if intento == MAX_REINTENTOS:
-                print(f"⏱️ Timeout en intento {intento}")
-        except requests.RequestException as e:
-            if intento == MAX_REINTENTOS:
-                print(f"❌ Error: {e}")
+    try:
+        return _vuelos.ejecutar(('contenido', url), _obtener_contenido, url,
+                                timeout=ESPERA_VUELO_COMPARTIDO, reintentar_si=_plazo_ajeno)
+    except TimeoutError as e:
+        log.warning('⏱️ %s', e, extra={'url': url})
+        return None
+
+def _obtener_contenido(url: str) -> Optional[str]:
+    """Descarga la página y devuelve el texto del bloque principal (sin coalescencia)."""
+    html = _descargar_html(url)
+    return _texto_principal(html) if html else None
+
+def _descargar_html(url: str) -> Optional[bytes]:
+    """Descarga el HTML de una semana hasta </main>; None si fallan todos los intentos."""
+    try:
+        with etapa('descarga', url=url) as campos:
+            html = obtener_backend().descargar_principal(url)
+            campos['bytes'] = len(html)
+        return html
+    except EntradaNoArchivadaError:
+        log.warning('📼 No está en el archivo de respuestas', extra={'url': url})
+    except requests.Timeout:
+        log.warning('⏱️ Timeout tras %d intentos', MAX_REINTENTOS, extra={'url': url})
+    except requests.RequestException as e:
+        log.error('❌ Error: %s', e, extra={'url': url})
     return None
 
-def extraer_fecha_correcta(contenido: str) -> str:
+def _texto_principal(html: bytes) -> str:
+    """Texto del bloque <main> (o de toda la página si no existe)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    main = soup.find('main') or soup
+    return main.get_text(separator='\n', strip=True)
+
+def extraer_fecha_correcta(contenido: str, paquete: Optional[PaqueteIdioma] = None) -> str:
     """Extrae la fecha de la semana del contenido."""
+    paquete = paquete or obtener_paquete()
     lineas = contenido.split('\n')
     
     for linea in lineas[:20]:
-        fecha_match = PATRONES['fecha'].search(linea)
+        fecha_match = paquete.fecha.search(linea)
         if fecha_match:
             return fecha_match.group(0).strip()
     
-    fecha_match = PATRONES['fecha'].search(contenido)
+    fecha_match = paquete.fecha.search(contenido)
     if fecha_match:
         return fecha_match.group(0).strip()
     
     return 'Fecha no encontrada'
 
-def extraer_lectura_biblica(contenido: str) -> str:
+def extraer_lectura_biblica(contenido: str, paquete: Optional[PaqueteIdioma] = None) -> str:
     """Extrae la lectura bíblica de la semana."""
-    for libro in LIBROS_BIBLIA:
-        patron = rf'({libro})\s*\d+(?::\d+)?(?:[-–]\d+(?::\d+)?)?'
-        match = re.search(patron, contenido, re.IGNORECASE | re.DOTALL)
+    paquete = paquete or obtener_paquete()
+    
+    for libro in paquete.libros:
+        match = libro.search(contenido)
         if match:
             return re.sub(r'\s+', ' ', match.group(0)).strip()
     
-    match2 = re.search(
-        r'Lectura\s+b[ií]blica\s*[:\-]?\s*([A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s:–\-]+)',
-        contenido, re.IGNORECASE
-    )
+    match2 = paquete.lectura.search(contenido)
     return re.sub(r'\s+', ' ', match2.group(1)).strip() if match2 else 'No especificada'
 
-def extraer_canciones(contenido: str) -> Dict[str, str]:
+def extraer_canciones(contenido: str, paquete: Optional[PaqueteIdioma] = None) -> Dict[str, str]:
     """Extrae números de las 3 canciones."""
-    nums = PATRONES['cancion'].findall(contenido)
+    paquete = paquete or obtener_paquete()
+    nums = paquete.cancion.findall(contenido)
     return {
         'inicial': nums[0] if len(nums) > 0 else 'N/A',
         'intermedia': nums[1] if len(nums) > 1 else 'N/A',
         'final': nums[2] if len(nums) > 2 else 'N/A'
     }
 
-def encontrar_posicion_cancion_intermedia(contenido: str) -> int:
+def encontrar_posicion_cancion_intermedia(contenido: str, paquete: Optional[PaqueteIdioma] = None) -> int:
     """Encuentra después de qué número de parte viene la canción intermedia."""
-    canciones = list(PATRONES['cancion'].finditer(contenido))
+    paquete = paquete or obtener_paquete()
+    canciones = list(paquete.cancion.finditer(contenido))
     if len(canciones) < 2:
         return 6
     
     pos_cancion = canciones[1].start()
     partes_antes = []
     
-    for match in PATRONES['parte_numerada'].finditer(contenido):
+    for match in paquete.parte_numerada.finditer(contenido):
         if match.start() < pos_cancion:
             partes_antes.append(int(match.group(1)))
     
     return max(partes_antes) if partes_antes else 6
 
-def determinar_rol(titulo: str) -> str:
+def determinar_rol(titulo: str, paquete: Optional[PaqueteIdioma] = None) -> str:
     """Determina el rol basado en el título de la parte."""
-    titulo_lower = titulo.lower()
+    paquete = paquete or obtener_paquete()
     
-    if 'lectura' in titulo_lower and 'biblia' in titulo_lower:
-        return 'Estudiante:'
-    elif any(palabra in titulo_lower for palabra in ['conversación', 'revisita', 'discípulo']):
-        return 'Est./Ayud.:'
-    elif 'estudio bíblico' in titulo_lower:
-        return 'Conductor/Lector:'
+    for rol, patron in paquete.roles:
+        if patron.match(titulo):
+            return rol
     
     return ''
 
-def extraer_partes(contenido: str) -> Dict[str, List[Dict]]:
+def extraer_partes(contenido: str, paquete: Optional[PaqueteIdioma] = None) -> Dict[str, List[Dict]]:
     """Extrae y clasifica partes dinámicamente."""
-    parte_antes_cancion = encontrar_posicion_cancion_intermedia(contenido)
+    paquete = paquete or obtener_paquete()
+    parte_antes_cancion = encontrar_posicion_cancion_intermedia(contenido, paquete)
     
     secciones = {
         'tesoros_biblia': [],
@@ -204,13 +482,13 @@ def extraer_partes(contenido: str) -> Dict[str, List[Dict]]:
     
     contador_parte = 0
     
-    for match in PATRONES['parte_numerada'].finditer(contenido):
+    for match in paquete.parte_numerada.finditer(contenido):
         num = int(match.group(1))
         contador_parte += 1
         
         titulo = match.group(2).strip()
         duracion = int(match.group(3))
-        rol = determinar_rol(titulo)
+        rol = determinar_rol(titulo, paquete)
         
         parte = {
             'numero': contador_parte,
@@ -228,28 +506,88 @@ def extraer_partes(contenido: str) -> Dict[str, List[Dict]]:
     
     return secciones
 
-def extraer_datos_reunion(url: str) -> Optional[Dict]:
-    """Extrae todos los datos de la reunión desde la URL."""
-    contenido = obtener_contenido(url)
+def extraer_datos_reunion(url: str, analizar: Optional[Callable[[bytes, str], Optional[Dict]]] = None) -> Optional[Dict]:
+    """
+    Extrae todos los datos de la reunión desde la URL.
+    
+    ``analizar`` sustituye a extraer_datos_de_html (p. ej. para analizar en
+    otro proceso); la descarga sigue pasando por la coalescencia y el respaldo.
+    Lanza ServicioNoDisponibleError si jw.org no responde y no hay copia anterior.
+    """
+    try:
+        return _con_respaldo(('semana', url), _extraer_datos_reunion, url, analizar or extraer_datos_de_html)
+    except PlazoVencidoError:
+        raise
+    except TimeoutError as e:
+        log.warning('⏱️ %s', e, extra={'url': url})
+        return None
+
+def _extraer_datos_reunion(url: str, analizar: Callable[[bytes, str], Optional[Dict]]) -> Optional[Dict]:
+    """Descarga y analiza una semana (sin coalescencia)."""
+    html = _descargar_html(url)
+    if not html:
+        return None
+    return analizar(html, url)
+
+def extraer_datos_de_html(html: bytes, url: str) -> Optional[Dict]:
+    """
+    Extrae los datos de la reunión de un HTML ya descargado.
+    
+    Si el mismo HTML ya se analizó con esta versión del extractor,
+    se devuelve el resultado memorizado sin volver a analizarlo.
+    """
+    clave = _memo.clave(html, url)
+    datos = _memo.obtener(clave)
+    if datos is not None:
+        log.info('♻️ Semana sin cambios', extra={'url': url, 'fecha': datos['fecha']})
+        return datos
+    
+    datos = analizar_html(html, url)
+    if datos is not None:
+        _memo.guardar(clave, datos)
+    return datos
+
+def analizar_html(html: bytes, url: str) -> Optional[Dict]:
+    """Analiza el HTML de una semana siempre, sin pasar por el memo."""
+    with etapa('analisis', url=url):
+        contenido = _texto_principal(html)
     if not contenido:
         return None
     
-    partes_data = extraer_partes(contenido)
-    
-    datos = {
-        'fecha': extraer_fecha_correcta(contenido),
-        'lectura_biblica': extraer_lectura_biblica(contenido),
-        'canciones': extraer_canciones(contenido),
-        'tesoros_biblia': partes_data['tesoros_biblia'],
-        'seamos_maestros': partes_data['seamos_maestros'],
-        'vida_cristiana': partes_data['vida_cristiana']
-    }
-    
-    print(f"  📅 {datos['fecha']}")
-    print(f"  📋 Tesoros={len(datos['tesoros_biblia'])}, Maestros={len(datos['seamos_maestros'])}, Vida={len(datos['vida_cristiana'])}")
-    
+    with etapa('extraccion', url=url) as campos:
+        paquete = paquete_desde_url(url)
+        partes_data = extraer_partes(contenido, paquete)
+        
+        fecha = extraer_fecha_correcta(contenido, paquete)
+        rango = fechas_semana(fecha, url, paquete)
+        
+        datos = {
+            'fecha': fecha,
+            'fecha_inicio': rango[0].isoformat() if rango else None,
+            'fecha_fin': rango[1].isoformat() if rango else None,
+            'idioma': paquete.codigo,
+            'lectura_biblica': extraer_lectura_biblica(contenido, paquete),
+            'canciones': extraer_canciones(contenido, paquete),
+            'tesoros_biblia': partes_data['tesoros_biblia'],
+            'seamos_maestros': partes_data['seamos_maestros'],
+            'vida_cristiana': partes_data['vida_cristiana']
+        }
+        campos.update(
+            fecha=fecha, tesoros=len(datos['tesoros_biblia']),
+            maestros=len(datos['seamos_maestros']), vida=len(datos['vida_cristiana'])
+        )
     return datos
 
+# ==================== API PARA LA APLICACIÓN WEB ====================
+
+def extraer_indice_semanas(url_indice: str) -> List[Dict[str, str]]:
+    """Lista las semanas de un índice; el idioma se toma de la URL."""
+    return obtener_enlaces_semanas(url_indice)
+
+def extraer_datos_semana(url: str, analizar: Optional[Callable[[bytes, str], Optional[Dict]]] = None) -> Optional[Dict]:
+    """Extrae los datos estructurados de una semana; el idioma se toma de la URL."""
+    return extraer_datos_reunion(url, analizar)
+
 # ==================== GENERACIÓN DE HTML ====================
 
 def calcular_horas(partes: List[Dict], hora_inicio: str = "19:06") -> List[Dict]:
@@ -458,6 +796,7 @@ def generar_html(datos: Dict, congregacion: str = "CONGREGACIÓN CORDIALIDAD") -
 
 def main():
     """Función principal para Replit."""
+    configurar_registro(formato='texto')
     print("\n" + "="*70)
     print("🚀 EXTRACTOR DE REUNIONES JW.ORG - Versión Replit")
     print("="*70)
@@ -482,7 +821,11 @@ def main():
     print()
     
     # Obtener enlaces
-    enlaces = obtener_enlaces_semanas(url_indice)
+    try:
+        enlaces = obtener_enlaces_semanas(url_indice)
+    except ServicioNoDisponibleError as e:
+        print(f"❌ {e}. Reintenta en {e.reintentar_en} s")
+        return
     
     if not enlaces:
         print("❌ No se encontraron semanas")
@@ -507,6 +850,8 @@ def main():
     print(f"\n⏳ Procesando {len(enlaces)} semana(s)...\n")
     
     # Procesar semanas
+    from .artefactos import AlmacenArtefactos
+    artefactos = AlmacenArtefactos(str(OUTPUT_DIR))
     datos_todas = []
     errores = []
     
@@ -521,12 +866,12 @@ def main():
                 
                 # Nombre de archivo seguro
                 fecha_limpia = datos['fecha'].replace(' ', '_').replace('/', '-')
-                nombre_archivo = OUTPUT_DIR / f"reunion_{fecha_limpia}.html"
-                
-                with open(nombre_archivo, 'w', encoding='utf-8') as f:
-                    f.write(html)
+                artefacto = artefactos.guardar(
+                    html.encode('utf-8'), semana['url'], congregacion, f"reunion_{fecha_limpia}.html"
+                )
                 
-                print(f"  ✅ Guardado: {nombre_archivo}\n")
+                ruta = artefactos.enlazar(artefacto, str(OUTPUT_DIR))
+                print(f"  ✅ Guardado: {ruta}\n")
                 datos_todas.append(datos)
             else:
                 print(f"  ❌ Sin datos\n")
@@ -547,7 +892,7 @@ def main():
             print(f"  • {err}")
     
     print("="*70)
-    print("\n💡 Los archivos HTML están listos para descargar desde la carpeta 'programas_generados'")
+    print("\n💡 Los archivos HTML están listos para descargar desde la carpeta 'programas_generados/objetos'")
     print("   Puedes abrirlos directamente en el navegador o imprimirlos como PDF")
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+"""
+Locales - Paquetes de idioma para la extracción
+Patrones, meses, libros bíblicos y palabras clave de cada idioma.
+Los paquetes se compilan la primera vez que se piden y quedan en caché.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Pattern, Tuple
+from urllib.parse import urlparse
+
+IDIOMA_POR_DEFECTO = 'es'
+
+# Patrón común a todos los idiomas: "4. Título de la parte (5 min.)"
+PATRON_PARTE_NUMERADA = r'^(\d+)\.\s*([^\n(]+?)\s*\((\d+)\s*min'
+
+# ==================== DATOS POR IDIOMA ====================
+# Solo datos crudos: nada se compila al importar el módulo.
+
+LOCALES = {
+    'es': {
+        'accept_language': 'es-ES,es;q=0.9',
+        'orden_fecha': 'dia_mes',
+        'ruta_cuaderno': '/es/biblioteca/guia-actividades-reunion-testigos-jehova/',
+        'meses': {
+            'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
+            'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
+            'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
+        },
+        'libros': (
+            'ECLESIASTÉS', 'GÉNESIS', 'ÉXODO', 'LEVÍTICO', 'NÚMEROS', 'DEUTERONOMIO',
+            'JOSUÉ', 'JUECES', 'RUT', 'SAMUEL', 'REYES', 'CRÓNICAS', 'ESDRAS',
+            'NEHEMÍAS', 'ESTER', 'JOB', 'SALMOS', 'PROVERBIOS', 'CANTARES',
+            'ISAÍAS', 'JEREMÍAS', 'LAMENTACIONES', 'EZEQUIEL', 'DANIEL',
+            'OSEAS', 'JOEL', 'AMÓS', 'ABDÍAS', 'JONÁS', 'MIQUEAS', 'NAHÚM',
+            'HABACUC', 'SOFONÍAS', 'HAGEO', 'ZACARÍAS', 'MALAQUÍAS',
+            'MATEO', 'MARCOS', 'LUCAS', 'JUAN', 'HECHOS', 'ROMANOS',
+            'CORINTIOS', 'GÁLATAS', 'EFESIOS', 'FILIPENSES', 'COLOSENSES',
+            'TESALONICENSES', 'TIMOTEO', 'TITO', 'FILEMÓN', 'HEBREOS',
+            'SANTIAGO', 'PEDRO', 'JUDAS', 'APOCALIPSIS'
+        ),
+        'fecha': r'\d{1,2}\s*(?:-\s*\d{1,2}|de\s+\w+\s+(?:a|al)\s+\d{1,2})\s+de\s+\w+',
+        'cancion': r'Canción\s+(\d+)',
+        'palabras': r'Palabras\s+de\s+(introducción|conclusión)\s*[:\(]?\s*(\d+)\s*min',
+        'lectura': r'Lectura\s+b[ií]blica\s*[:\-]?\s*([A-Za-zÁÉÍÓÚáéíóúñÑ0-9\s:–\-]+)',
+        'roles': (
+            ('Estudiante:', (('lectura', 'biblia'),)),
+            ('Est./Ayud.:', (('conversación',), ('revisita',), ('discípulo',))),
+            ('Conductor/Lector:', (('estudio bíblico',),)),
+        ),
+    },
+    'en': {
+        'accept_language': 'en-US,en;q=0.9',
+        'orden_fecha': 'mes_dia',
+        'ruta_cuaderno': '/en/library/jw-meeting-workbook/',
+        'meses': {
+            'january': 1, 'february': 2, 'march': 3, 'april': 4,
+            'may': 5, 'june': 6, 'july': 7, 'august': 8,
+            'september': 9, 'october': 10, 'november': 11, 'december': 12
+        },
+        'libros': (
+            'ECCLESIASTES', 'GENESIS', 'EXODUS', 'LEVITICUS', 'NUMBERS', 'DEUTERONOMY',
+            'JOSHUA', 'JUDGES', 'RUTH', 'SAMUEL', 'KINGS', 'CHRONICLES', 'EZRA',
+            'NEHEMIAH', 'ESTHER', 'JOB', 'PSALMS', 'PROVERBS', 'SONG OF SOLOMON',
+            'ISAIAH', 'JEREMIAH', 'LAMENTATIONS', 'EZEKIEL', 'DANIEL',
+            'HOSEA', 'JOEL', 'AMOS', 'OBADIAH', 'JONAH', 'MICAH', 'NAHUM',
+            'HABAKKUK', 'ZEPHANIAH', 'HAGGAI', 'ZECHARIAH', 'MALACHI',
+            'MATTHEW', 'MARK', 'LUKE', 'JOHN', 'ACTS', 'ROMANS',
+            'CORINTHIANS', 'GALATIANS', 'EPHESIANS', 'PHILIPPIANS', 'COLOSSIANS',
+            'THESSALONIANS', 'TIMOTHY', 'TITUS', 'PHILEMON', 'HEBREWS',
+            'JAMES', 'PETER', 'JUDE', 'REVELATION'
+        ),
+        'fecha': r'(?:{meses})\s+\d{1,2}\s*[-–]\s*(?:(?:{meses})\s+)?\d{1,2}',
+        'cancion': r'Song\s+(\d+)',
+        'palabras': r'(Opening|Concluding)\s+Comments\s*[:\(]?\s*(\d+)\s*min',
+        'lectura': r'Bible\s+Reading\s*[:\-]?\s*([A-Za-z0-9\s:–\-]+)',
+        'roles': (
+            ('Student:', (('bible reading',),)),
+            ('Student/Assistant:', (('conversation',), ('following up',), ('disciples',))),
+            ('Conductor/Reader:', (('congregation bible study',),)),
+        ),
+    },
+    'pt': {
+        'accept_language': 'pt-BR,pt;q=0.9',
+        'orden_fecha': 'dia_mes',
+        'ruta_cuaderno': '/pt/biblioteca/apostila-reuniao-vida-ministerio/',
+        'meses': {
+            'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4,
+            'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
+            'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+        },
+        'libros': (
+            'ECLESIASTES', 'GÊNESIS', 'ÊXODO', 'LEVÍTICO', 'NÚMEROS', 'DEUTERONÔMIO',
+            'JOSUÉ', 'JUÍZES', 'RUTE', 'SAMUEL', 'REIS', 'CRÔNICAS', 'ESDRAS',
+            'NEEMIAS', 'ESTER', 'JÓ', 'SALMOS', 'PROVÉRBIOS', 'CÂNTICO DE SALOMÃO',
+            'ISAÍAS', 'JEREMIAS', 'LAMENTAÇÕES', 'EZEQUIEL', 'DANIEL',
+            'OSEIAS', 'JOEL', 'AMÓS', 'OBADIAS', 'JONAS', 'MIQUEIAS', 'NAUM',
+            'HABACUQUE', 'SOFONIAS', 'AGEU', 'ZACARIAS', 'MALAQUIAS',
+            'MATEUS', 'MARCOS', 'LUCAS', 'JOÃO', 'ATOS', 'ROMANOS',
+            'CORÍNTIOS', 'GÁLATAS', 'EFÉSIOS', 'FILIPENSES', 'COLOSSENSES',
+            'TESSALONICENSES', 'TIMÓTEO', 'TITO', 'FILEMOM', 'HEBREUS',
+            'TIAGO', 'PEDRO', 'JUDAS', 'APOCALIPSE'
+        ),
+        'fecha': r'\d{1,2}\s*(?:[-–]\s*\d{1,2}|de\s+\w+\s+(?:a|[-–])\s*\d{1,2})\s+de\s+\w+',
+        'cancion': r'Cântico\s+(\d+)',
+        'palabras': r'Comentários\s+(iniciais|finais)\s*[:\(]?\s*(\d+)\s*min',
+        'lectura': r'Leitura\s+da\s+B[ií]blia\s*[:\-]?\s*([A-Za-zÀ-ÿ0-9\s:–\-]+)',
+        'roles': (
+            ('Estudante:', (('leitura', 'bíblia'),)),
+            ('Est./Ajud.:', (('conversa',), ('revisita',), ('discípulos',))),
+            ('Dirigente/Leitor:', (('estudo bíblico',),)),
+        ),
+    },
+}
+
+# ==================== PAQUETES COMPILADOS ====================
+
+@dataclass(frozen=True)
+class PaqueteIdioma:
+    """Patrones y autómatas de palabras clave ya compilados para un idioma."""
+    codigo: str
+    accept_language: str
+    ruta_cuaderno: str
+    orden_fecha: str
+    meses: Dict[str, int]
+    fecha: Pattern
+    mes: Pattern
+    tokens_fecha: Pattern
+    cancion: Pattern
+    palabras: Pattern
+    parte_numerada: Pattern
+    libros: Tuple[Pattern, ...]
+    lectura: Pattern
+    roles: Tuple[Tuple[str, Pattern], ...]
+
+def _alternativas(palabras) -> str:
+    """Une palabras en una sola alternancia, primero las más largas."""
+    return '|'.join(re.escape(p) for p in sorted(palabras, key=len, reverse=True))
+
+def _compilar_rol(alternativas) -> Pattern:
+    """Compila una regla de rol: basta una alternativa con todas sus palabras."""
+    ramas = (''.join(f'(?=.*{re.escape(p)})' for p in palabras) for palabras in alternativas)
+    return re.compile('^(?:' + '|'.join(ramas) + ')', re.IGNORECASE | re.DOTALL)
+
+def obtener_paquete(idioma: str = IDIOMA_POR_DEFECTO) -> PaqueteIdioma:
+    """Devuelve el paquete compilado del idioma (o el de por defecto)."""
+    return _compilar_paquete(idioma if idioma in LOCALES else IDIOMA_POR_DEFECTO)
+
+@lru_cache(maxsize=None)
+def _compilar_paquete(idioma: str) -> PaqueteIdioma:
+    """Compila un paquete una sola vez por idioma conocido."""
+    datos = LOCALES[idioma]
+    meses = _alternativas(datos['meses'])
+
+    return PaqueteIdioma(
+        codigo=idioma,
+        accept_language=datos['accept_language'],
+        ruta_cuaderno=datos['ruta_cuaderno'],
+        orden_fecha=datos['orden_fecha'],
+        meses=datos['meses'],
+        fecha=re.compile(datos['fecha'].replace('{meses}', meses), re.IGNORECASE),
+        mes=re.compile(rf'\b({meses})\b', re.IGNORECASE),
+        tokens_fecha=re.compile(
+            rf'(?<!\d)(\d{{4}})(?!\d)|(?<!\d)(\d{{1,2}})(?!\d)|\b({meses})\b',
+            re.IGNORECASE
+        ),
+        cancion=re.compile(datos['cancion'], re.IGNORECASE),
+        palabras=re.compile(datos['palabras'], re.IGNORECASE),
+        parte_numerada=re.compile(PATRON_PARTE_NUMERADA, re.MULTILINE | re.IGNORECASE),
+        # Uno por libro y en el orden de la lista: gana el primer libro, no el primer texto
+        libros=tuple(
+            re.compile(rf'({re.escape(libro)})\s*\d+(?::\d+)?(?:[-–]\d+(?::\d+)?)?', re.IGNORECASE)
+            for libro in datos['libros']
+        ),
+        lectura=re.compile(datos['lectura'], re.IGNORECASE),
+        roles=tuple((rol, _compilar_rol(alternativas)) for rol, alternativas in datos['roles']),
+    )
+
+def idioma_desde_url(url: str) -> str:
+    """Obtiene el código de idioma del primer segmento de la URL de jw.org."""
+    segmentos = [s for s in urlparse(url or '').path.split('/') if s]
+    if segmentos and segmentos[0].lower() in LOCALES:
+        return segmentos[0].lower()
+    return IDIOMA_POR_DEFECTO
+
+def paquete_desde_url(url: str) -> PaqueteIdioma:
+    """Atajo: paquete compilado correspondiente al idioma de la URL."""
+    return obtener_paquete(idioma_desde_url(url))
@@ -0,0 +1,121 @@
+"""
+Memo - Resultados de extracción memorizados por contenido
+La clave es un hash del HTML descargado más la versión del extractor,
+así que una página idéntica no se vuelve a analizar y cualquier cambio
+en el código de extracción invalida los resultados anteriores.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .registro import log
+
+# ==================== CONFIGURACIÓN ====================
+RUTA_MEMO = os.environ.get('JW_MEMO_RUTA', os.path.join('cache', 'memo_extraccion.sqlite3'))
+MAX_MEMORIA = 256        # Entradas en la LRU en memoria
+MAX_DISCO = 5000         # Entradas en SQLite antes de desalojar las menos usadas
+
+def huella_codigo(rutas: Iterable[str]) -> str:
+    """Versión automática: hash del código fuente de los módulos de extracción."""
+    h = hashlib.sha256()
+    for ruta in sorted(rutas):
+        with open(ruta, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+class MemoContenido:
+    """
+    Memo de dos niveles: LRU en memoria y SQLite en disco
+
+    Los valores se guardan como JSON, de modo que cada acierto devuelve
+    una copia nueva que el llamador puede modificar sin riesgo.
+    """
+
+    def __init__(self, version: str, ruta: Optional[str] = RUTA_MEMO,
+                 max_memoria: int = MAX_MEMORIA, max_disco: int = MAX_DISCO):
+        self.version = version
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self._memoria: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._inserciones = 0
+        self._ruta = ruta
+        self._db = None
+        self._pid = None
+
+    def _conexion(self) -> Optional[sqlite3.Connection]:
+        """Abre SQLite la primera vez que se usa (y de nuevo en cada proceso hijo)."""
+        if not self._ruta or self._pid == os.getpid():
+            return self._db
+        self._pid = os.getpid()
+        try:
+            Path(self._ruta).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self._ruta, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS memo ('
+                'clave TEXT PRIMARY KEY, version TEXT, datos TEXT, usado REAL)'
+            )
+            # Lo calculado con otra versión del extractor ya no sirve
+            self._db.execute('DELETE FROM memo WHERE version != ?', (self.version,))
+        except sqlite3.Error as e:
+            log.warning('⚠️ Memo en disco no disponible (%s), solo se usará memoria', e)
+            self._db = None
+        return self._db
+
+    def clave(self, contenido: bytes, url: str) -> str:
+        """Clave del memo: versión del extractor + URL + cuerpo de la respuesta."""
+        h = hashlib.sha256(self.version.encode())
+        h.update(url.encode('utf-8'))
+        h.update(b'\0')
+        h.update(contenido)
+        return h.hexdigest()
+
+    def obtener(self, clave: str) -> Optional[Dict]:
+        with self._lock:
+            texto = self._memoria.get(clave)
+            db = self._conexion()
+            if texto is not None:
+                self._memoria.move_to_end(clave)
+            elif db:
+                fila = db.execute('SELECT datos FROM memo WHERE clave = ?', (clave,)).fetchone()
+                if fila:
+                    texto = fila[0]
+                    db.execute('UPDATE memo SET usado = ? WHERE clave = ?', (time.time(), clave))
+                    self._recordar(clave, texto)
+        return json.loads(texto) if texto is not None else None
+
+    def guardar(self, clave: str, datos: Dict) -> None:
+        texto = json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._recordar(clave, texto)
+            db = self._conexion()
+            if db:
+                db.execute(
+                    'INSERT OR REPLACE INTO memo (clave, version, datos, usado) VALUES (?, ?, ?, ?)',
+                    (clave, self.version, texto, time.time())
+                )
+                self._inserciones += 1
+                if self._inserciones % 100 == 0:
+                    self._podar(db)
+
+    def _podar(self, db: sqlite3.Connection) -> None:
+        """Desaloja del disco las entradas menos usadas por encima del límite."""
+        db.execute(
+            'DELETE FROM memo WHERE clave IN ('
+            'SELECT clave FROM memo ORDER BY usado DESC LIMIT -1 OFFSET ?)',
+            (self.max_disco,)
+        )
+
+    def _recordar(self, clave: str, texto: str) -> None:
+        self._memoria[clave] = texto
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
@@ -0,0 +1,60 @@
+"""
+Plazo - Tiempo límite de una petición propagado a todas sus descargas
+El plazo viaja en una variable de contexto; cada descarga ajusta sus
+timeouts, reintentos y esperas al tiempo que queda en lugar de usar
+los valores fijos, y se rinde en cuanto el plazo vence.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+class PlazoVencidoError(TimeoutError):
+    """Se agotó el tiempo de la petición antes de terminar esta tarea."""
+
+class Plazo:
+    """Instante límite en el reloj monotónico."""
+
+    def __init__(self, segundos: float):
+        self.limite = time.monotonic() + segundos
+
+    def restante(self) -> float:
+        return max(0.0, self.limite - time.monotonic())
+
+    def vencido(self) -> bool:
+        return time.monotonic() >= self.limite
+
+_plazo_actual: ContextVar[Optional[Plazo]] = ContextVar('plazo', default=None)
+
+def plazo_actual() -> Optional[Plazo]:
+    return _plazo_actual.get()
+
+@contextmanager
+def con_plazo(plazo: Plazo) -> Iterator[Plazo]:
+    """Ejecuta el bloque con ``plazo`` como plazo actual."""
+    token = _plazo_actual.set(plazo)
+    try:
+        yield plazo
+    finally:
+        _plazo_actual.reset(token)
+
+def acotar(segundos: float) -> float:
+    """
+    ``segundos`` recortado al tiempo que le queda al plazo actual
+
+    Raises:
+        PlazoVencidoError: si el plazo actual ya venció
+    """
+    plazo = _plazo_actual.get()
+    if plazo is None:
+        return segundos
+    restante = plazo.restante()
+    if restante <= 0:
+        raise PlazoVencidoError('Plazo de la petición agotado')
+    return min(segundos, restante)
+
+def vencido() -> bool:
+    """True si hay un plazo actual y ya venció."""
+    plazo = _plazo_actual.get()
+    return plazo is not None and plazo.vencido()
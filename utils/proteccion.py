@@ -0,0 +1,218 @@
+"""
+Protección del servidor de origen (jw.org)
+Cortacircuitos por host, limitador de tasa adaptativo y copia de respaldo
+para servir datos anteriores mientras el origen no responde.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# ==================== CONFIGURACIÓN ====================
+UMBRAL_FALLOS = 5          # Fallos seguidos que abren el circuito
+TIEMPO_ABIERTO = 30        # Segundos antes de dejar pasar una petición de prueba
+TASA_PETICIONES = 5.0      # Peticiones por segundo en condiciones normales
+TASA_MINIMA = 0.5          # Nunca se baja de esta tasa al frenar
+RAFAGA = 10                # Capacidad del cubo de fichas
+ESPERA_MAXIMA_FICHA = 5    # Segundos que una petición espera turno antes de rendirse
+TAMANO_RESPALDO = 512      # Resultados anteriores guardados para servir obsoletos
+
+class ServicioNoDisponibleError(Exception):
+    """El origen está caído o limitando: se falla rápido en lugar de esperar."""
+
+    def __init__(self, mensaje: str, reintentar_en: float = TIEMPO_ABIERTO):
+        super().__init__(mensaje)
+        self.reintentar_en = max(1, int(reintentar_en + 0.999))
+
+# ==================== CORTACIRCUITOS ====================
+
+class Cortacircuitos:
+    """
+    Cortacircuitos clásico: cerrado → abierto → semiabierto
+
+    Tras ``umbral`` fallos seguidos se abre y rechaza todo durante
+    ``tiempo_abierto`` segundos; después deja pasar una única petición
+    de prueba que decide si se vuelve a cerrar o a abrir.
+    """
+
+    CERRADO, ABIERTO, SEMIABIERTO = 'cerrado', 'abierto', 'semiabierto'
+
+    def __init__(self, umbral: int = UMBRAL_FALLOS, tiempo_abierto: float = TIEMPO_ABIERTO):
+        self.umbral = umbral
+        self.tiempo_abierto = tiempo_abierto
+        self.estado = self.CERRADO
+        self._fallos = 0
+        self._abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """
+        Lanza ServicioNoDisponibleError si la petición no debe salir
+
+        Returns:
+            True si es la petición de prueba del estado semiabierto: quien
+            la lleva debe registrar éxito, fallo o ``cancelar_prueba``
+        """
+        with self._lock:
+            if self.estado == self.CERRADO:
+                return False
+            restante = self._abierto_desde + self.tiempo_abierto - time.monotonic()
+            if self.estado == self.ABIERTO and restante <= 0:
+                self.estado = self.SEMIABIERTO
+            if self.estado == self.SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            raise ServicioNoDisponibleError('Circuito abierto: el origen no responde', max(restante, 1))
+
+    def registrar_exito(self) -> None:
+        with self._lock:
+            self.estado = self.CERRADO
+            self._fallos = 0
+            self._prueba_en_curso = False
+
+    def cancelar_prueba(self) -> None:
+        """La prueba terminó sin decir nada del origen (plazo agotado, cancelación): otra puede probar."""
+        with self._lock:
+            self._prueba_en_curso = False
+
+    def registrar_fallo(self) -> None:
+        with self._lock:
+            self._fallos += 1
+            if self.estado == self.SEMIABIERTO or self._fallos >= self.umbral:
+                self.estado = self.ABIERTO
+                self._abierto_desde = time.monotonic()
+            self._prueba_en_curso = False
+
+# ==================== LIMITADOR DE TASA ====================
+
+class LimitadorTasa:
+    """
+    Cubo de fichas con tasa adaptativa
+
+    Ante un 429/503 la tasa se reduce a la mitad y se respeta Retry-After;
+    cada respuesta correcta la va recuperando poco a poco.
+    """
+
+    def __init__(self, tasa: float = TASA_PETICIONES, capacidad: int = RAFAGA):
+        self.tasa_base = tasa
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._fichas = float(capacidad)
+        self._ultima = time.monotonic()
+        self._pausa_hasta = 0.0
+        self._lock = threading.Lock()
+
+    def intentar(self) -> float:
+        """Toma una ficha si la hay (devuelve 0) o dice cuántos segundos faltan para la siguiente."""
+        with self._lock:
+            ahora = time.monotonic()
+            self._fichas = min(self.capacidad, self._fichas + (ahora - self._ultima) * self.tasa)
+            self._ultima = ahora
+            if ahora >= self._pausa_hasta and self._fichas >= 1:
+                self._fichas -= 1
+                return 0.0
+            return max(self._pausa_hasta - ahora, (1 - self._fichas) / self.tasa)
+
+    def adquirir(self, espera_maxima: float = ESPERA_MAXIMA_FICHA) -> None:
+        """Toma una ficha esperando como mucho ``espera_maxima`` segundos."""
+        limite = time.monotonic() + espera_maxima
+        while True:
+            espera = self.intentar()
+            if not espera:
+                return
+            if time.monotonic() + espera > limite:
+                raise ServicioNoDisponibleError('Límite de peticiones al origen alcanzado', espera)
+            time.sleep(espera)
+
+    def frenar(self, reintentar_en: Optional[float] = None) -> None:
+        """El origen pidió calma: baja la tasa y pausa si indicó Retry-After."""
+        with self._lock:
+            self.tasa = max(TASA_MINIMA, self.tasa / 2)
+            self._fichas = 0.0
+            if reintentar_en:
+                self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + reintentar_en)
+
+    def recuperar(self) -> None:
+        """Respuesta correcta: recupera la tasa de forma gradual."""
+        with self._lock:
+            self.tasa = min(self.tasa_base, self.tasa + self.tasa_base / 10)
+
+# ==================== REGISTRO POR HOST ====================
+
+class ProteccionHost:
+    """Cortacircuitos y limitador de un host."""
+
+    def __init__(self):
+        self.circuito = Cortacircuitos()
+        self.limitador = LimitadorTasa()
+
+    def antes_de_pedir(self) -> bool:
+        """Ficha y permiso del circuito; True si la petición es la prueba del semiabierto."""
+        # Primero la ficha: si no hay turno, el circuito no llega a reservar la petición de prueba
+        self.limitador.adquirir()
+        return self.circuito.permitir()
+
+    def registrar_exito(self) -> None:
+        self.circuito.registrar_exito()
+        self.limitador.recuperar()
+
+    def registrar_fallo(self, limitado: bool = False, reintentar_en: Optional[float] = None) -> None:
+        if limitado:
+            self.limitador.frenar(reintentar_en)
+        self.circuito.registrar_fallo()
+
+_protecciones: Dict[str, ProteccionHost] = {}
+_protecciones_lock = threading.Lock()
+
+def obtener_proteccion(host: str) -> ProteccionHost:
+    """Protección compartida por todas las peticiones a un mismo host."""
+    with _protecciones_lock:
+        if host not in _protecciones:
+            _protecciones[host] = ProteccionHost()
+        return _protecciones[host]
+
+def estado_protecciones() -> Dict[str, Dict[str, Any]]:
+    """Resumen del estado de cada host, para el health check."""
+    with _protecciones_lock:
+        return {
+            host: {'circuito': p.circuito.estado, 'tasa': round(p.limitador.tasa, 2)}
+            for host, p in _protecciones.items()
+        }
+
+# ==================== RESPALDO (DATOS OBSOLETOS) ====================
+
+class RespaldoLRU:
+    """Últimos resultados correctos, para servirlos mientras el origen no responde."""
+
+    def __init__(self, tamano: int = TAMANO_RESPALDO):
+        self.tamano = tamano
+        self._datos: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def guardar(self, clave: Hashable, valor: Any, instante: Optional[float] = None) -> None:
+        with self._lock:
+            self._datos[clave] = (valor, instante or time.time())
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.tamano:
+                self._datos.popitem(last=False)
+
+    def obtener(self, clave: Hashable, max_edad: Optional[float] = None) -> Optional[Any]:
+        """Valor guardado; con ``max_edad``, solo si no tiene más de esos segundos."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+        if entrada is None:
+            return None
+        valor, instante = entrada
+        if max_edad is not None and time.time() - instante > max_edad:
+            return None
+        return valor
+
+    def items(self) -> List[Tuple[Hashable, Any, float]]:
+        """Copia de las entradas (clave, valor, instante), de la más antigua a la más reciente."""
+        with self._lock:
+            return [(clave, valor, instante) for clave, (valor, instante) in self._datos.items()]
+
+    def __len__(self) -> int:
+        return len(self._datos)
@@ -0,0 +1,262 @@
+"""
+Rastreo asíncrono - Motor asyncio para rastrear bibliotecas completas
+Un solo hilo mantiene las descargas en curso; el análisis se delega a las
+funciones de extracción existentes en un ejecutor aparte. Cada petición
+toma una ficha del limitador del host, el mismo que usan las descargas
+síncronas, así que el rastreo nunca supera la tasa de proteccion.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from . import jw_scraper
+from .archivo import BackendGrabacion, BackendReproduccion
+from .locales import paquete_desde_url
+from .proteccion import TASA_PETICIONES, obtener_proteccion
+
+# ==================== CONFIGURACIÓN ====================
+CONCURRENCIA = 8                   # Descargas en curso como máximo (todas juntas)
+POR_HOST = 4                       # Conexiones simultáneas a un mismo host
+CORTESIA = 1 / TASA_PETICIONES     # Segundos mínimos entre dos peticiones al mismo host
+
+BIBLIOTECA = 'biblioteca'
+INDICE = 'indice'
+SEMANA = 'semana'
+
+# ==================== FRONTERA ====================
+
+class Frontera:
+    """
+    URLs pendientes (índices y semanas) compartidas por todos los trabajadores
+
+    Cada URL se encola una sola vez. ``siguiente()`` devuelve None cuando
+    no queda nada pendiente ni en curso, que es la señal de fin del rastreo.
+    """
+
+    def __init__(self):
+        self.pendientes: Deque[Tuple[str, str]] = deque()
+        self.vistos: Dict[str, str] = {}
+        self._en_curso = 0
+        self._cambio = asyncio.Event()
+
+    def agregar(self, tipo: str, url: str) -> bool:
+        if url in self.vistos:
+            return False
+        self.vistos[url] = tipo
+        self.pendientes.append((tipo, url))
+        self._cambio.set()
+        return True
+
+    def restaurar(self, vistos: Dict[str, str], completados: Set[str]) -> None:
+        """Reanuda desde un punto de control: vuelve a encolar lo no completado."""
+        for url, tipo in vistos.items():
+            self.vistos[url] = tipo
+            if url not in completados:
+                self.pendientes.append((tipo, url))
+        self._cambio.set()
+
+    async def siguiente(self) -> Optional[Tuple[str, str]]:
+        while True:
+            if self.pendientes:
+                self._en_curso += 1
+                return self.pendientes.popleft()
+            if self._en_curso == 0:
+                self._cambio.set()
+                return None
+            self._cambio.clear()
+            await self._cambio.wait()
+
+    def terminado(self) -> None:
+        self._en_curso -= 1
+        self._cambio.set()
+
+# ==================== CORTESÍA POR HOST ====================
+
+class _Host:
+    """Semáforo y turno de cortesía de un host."""
+
+    def __init__(self, por_host: int):
+        self.semaforo = asyncio.Semaphore(por_host)
+        self._proximo_turno = 0.0
+
+    async def turno(self, cortesia: float) -> None:
+        """Espera hasta que toque: como mucho una petición cada ``cortesia`` segundos."""
+        ahora = asyncio.get_running_loop().time()
+        turno = max(ahora, self._proximo_turno)
+        self._proximo_turno = turno + cortesia
+        if turno > ahora:
+            await asyncio.sleep(turno - ahora)
+
+    def pausar(self, segundos: float) -> None:
+        """Retrasa todas las peticiones futuras al host (429/503)."""
+        ahora = asyncio.get_running_loop().time()
+        self._proximo_turno = max(self._proximo_turno, ahora + segundos)
+
+# ==================== MOTOR ====================
+
+class MotorRastreo:
+    """
+    Rastreador asíncrono de índices y semanas
+
+    Args:
+        concurrencia: Trabajadores (descargas en curso) como máximo
+        por_host: Conexiones simultáneas por host
+        cortesia: Pausa mínima entre peticiones a un mismo host
+        ejecutor: Donde se analiza el HTML (None = hilos del bucle; se
+            puede pasar el pool de procesos de extraccion_paralela)
+        al_indice: Llamada con (url, enlaces) por cada índice analizado
+        al_extraer: Llamada con (url, datos) por cada semana extraída
+        al_completar: Llamada con (tipo, url, resultado) por cada URL terminada
+        extraer_semanas: Si es False, las semanas se descubren pero no se descargan
+    """
+
+    def __init__(self, concurrencia: int = CONCURRENCIA, por_host: int = POR_HOST,
+                 cortesia: float = CORTESIA, ejecutor: Optional[Executor] = None,
+                 al_indice: Optional[Callable[[str, List[Dict]], None]] = None,
+                 al_extraer: Optional[Callable[[str, Dict], None]] = None,
+                 al_completar: Optional[Callable[[str, str, Any], None]] = None,
+                 extraer_semanas: bool = True):
+        self.concurrencia = concurrencia
+        self.por_host = por_host
+        self.cortesia = cortesia
+        self.ejecutor = ejecutor
+        self.al_indice = al_indice
+        self.al_extraer = al_extraer
+        self.al_completar = al_completar
+        self.extraer_semanas = extraer_semanas
+        self.frontera = Frontera()
+        self.resultados: Dict[str, Dict] = {}
+        self.errores: Dict[str, str] = {}
+        self._hosts: Dict[str, _Host] = {}
+
+    def sembrar(self, urls: Iterable[str], tipo: str = INDICE) -> None:
+        """Agrega URLs iniciales a la frontera."""
+        for url in urls:
+            self.frontera.agregar(tipo, url)
+
+    async def ejecutar(self) -> Dict[str, Dict]:
+        """Rastrea hasta vaciar la frontera y devuelve {url_semana: datos}."""
+        conector = aiohttp.TCPConnector(limit=self.concurrencia, limit_per_host=self.por_host)
+        timeout = aiohttp.ClientTimeout(total=jw_scraper.TIMEOUT, connect=jw_scraper.TIMEOUT_CONEXION)
+        async with aiohttp.ClientSession(connector=conector, timeout=timeout) as sesion:
+            await asyncio.gather(*(self._trabajador(sesion) for _ in range(self.concurrencia)))
+        return self.resultados
+
+    async def _trabajador(self, sesion: aiohttp.ClientSession) -> None:
+        while True:
+            item = await self.frontera.siguiente()
+            if item is None:
+                return
+            tipo, url = item
+            try:
+                resultado = await self._procesar(sesion, tipo, url)
+                self.errores.pop(url, None)
+                if self.al_completar:
+                    self.al_completar(tipo, url, resultado)
+            except Exception as e:
+                self.errores[url] = str(e) or type(e).__name__
+            finally:
+                self.frontera.terminado()
+
+    async def _procesar(self, sesion: aiohttp.ClientSession, tipo: str, url: str) -> Any:
+        html = await self._descargar(sesion, url)
+        loop = asyncio.get_running_loop()
+
+        if tipo == BIBLIOTECA:
+            encontrados = await loop.run_in_executor(self.ejecutor, jw_scraper.extraer_cuadernos_de_html, html, url)
+            for pagina in encontrados['paginas']:
+                self.frontera.agregar(BIBLIOTECA, pagina)
+            for cuaderno in encontrados['cuadernos']:
+                self.frontera.agregar(INDICE, cuaderno)
+            return encontrados
+
+        if tipo == INDICE:
+            enlaces = await loop.run_in_executor(self.ejecutor, jw_scraper.extraer_enlaces_de_html, html, url)
+            if self.extraer_semanas:
+                for enlace in enlaces:
+                    self.frontera.agregar(SEMANA, enlace['url'])
+            if self.al_indice:
+                self.al_indice(url, enlaces)
+            return enlaces
+
+        datos = await loop.run_in_executor(self.ejecutor, jw_scraper.extraer_datos_de_html, html, url)
+        if not datos:
+            raise ValueError('No se pudieron extraer datos')
+        self.resultados[url] = datos
+        if self.al_extraer:
+            self.al_extraer(url, datos)
+        return datos
+
+    async def _descargar(self, sesion: aiohttp.ClientSession, url: str) -> bytes:
+        """Obtiene la página según el backend activo (archivo de respuestas o red)."""
+        backend = jw_scraper.obtener_backend()
+        if isinstance(backend, BackendReproduccion):
+            return backend.descargar(url)
+        contenido = await self._descargar_red(sesion, url)
+        if isinstance(backend, BackendGrabacion):
+            backend.archivo.guardar(url, contenido)
+        return contenido
+
+    async def _descargar_red(self, sesion: aiohttp.ClientSession, url: str) -> bytes:
+        """Descarga con cortesía por host, limitador, cortacircuitos y reintentos."""
+        nombre_host = urlparse(url).netloc
+        host = self._hosts.setdefault(nombre_host, _Host(self.por_host))
+        proteccion = obtener_proteccion(nombre_host)
+        cabeceras = jw_scraper._cabeceras(paquete_desde_url(url))
+
+        for intento in range(1, jw_scraper.MAX_REINTENTOS + 1):
+            async with host.semaforo:
+                await host.turno(self.cortesia)
+                # Ficha del limitador compartido (frena con 429/503), sin bloquear el bucle
+                espera = proteccion.limitador.intentar()
+                while espera:
+                    await asyncio.sleep(espera)
+                    espera = proteccion.limitador.intentar()
+                es_prueba = proteccion.circuito.permitir()
+                registrado = False  # Éxito o fallo ya contado en el cortacircuitos
+                try:
+                    async with sesion.get(url, headers=cabeceras) as resp:
+                        if resp.status in jw_scraper.ESTADOS_LIMITADO or resp.status >= 500:
+                            espera = resp.headers.get('Retry-After', '')
+                            espera = float(espera) if espera.isdigit() else 2 ** intento * 0.25
+                            proteccion.registrar_fallo(
+                                limitado=resp.status in jw_scraper.ESTADOS_LIMITADO,
+                                reintentar_en=espera
+                            )
+                            registrado = True
+                            host.pausar(espera)
+                            if intento == jw_scraper.MAX_REINTENTOS:
+                                resp.raise_for_status()
+                            continue
+                        if not resp.ok:
+                            # Un 404 no es culpa del host: cuenta como respuesta correcta
+                            proteccion.registrar_exito()
+                            registrado = True
+                            resp.raise_for_status()
+                        contenido = await resp.read()
+                        proteccion.registrar_exito()
+                        registrado = True
+                        return contenido
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                    if not registrado:
+                        proteccion.registrar_fallo()
+                        registrado = True
+                    if intento == jw_scraper.MAX_REINTENTOS:
+                        raise
+                finally:
+                    # Cualquier otra salida (URL inválida, cancelación...) no dice nada del
+                    # host, pero la prueba del semiabierto no puede quedarse reservada
+                    if es_prueba and not registrado:
+                        proteccion.circuito.cancelar_prueba()
+        raise RuntimeError(f'Sin respuesta de {url}')
+
+def rastrear(urls_indice: Iterable[str], **opciones) -> Dict[str, Dict]:
+    """Atajo síncrono: rastrea los índices y devuelve {url_semana: datos}."""
+    motor = MotorRastreo(**opciones)
+    motor.sembrar(urls_indice)
+    return asyncio.run(motor.ejecutar())
@@ -0,0 +1,159 @@
+"""
+Registro - Logs estructurados por petición y por etapa
+Cada petición recibe un id que viaja en una variable de contexto por la
+descarga, el análisis, la extracción y la generación; cada etapa registra
+su duración. Los registros se encolan y un hilo aparte los escribe, así
+que registrar no añade esperas de E/S a la petición.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional
+
+# ==================== CONFIGURACIÓN ====================
+FORMATO = os.environ.get('JW_LOG_FORMATO', 'json')  # 'json' o 'texto'
+NIVEL = os.environ.get('JW_LOG_NIVEL', 'INFO')
+
+log = logging.getLogger('jw')
+
+_id_peticion: ContextVar[Optional[str]] = ContextVar('id_peticion', default=None)
+_listener: Optional[QueueListener] = None
+
+# Atributos propios de LogRecord: todo lo demás son campos añadidos con extra=
+_ATRIBUTOS_BASE = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+def id_peticion() -> Optional[str]:
+    return _id_peticion.get()
+
+def _campos(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _ATRIBUTOS_BASE}
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: instante, nivel, mensaje, id de petición y campos extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'mensaje': record.getMessage(),
+            **_campos(record),
+        }
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+class FormatoTexto(logging.Formatter):
+    """Mensaje legible para la consola y la línea de órdenes."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        campos = _campos(record)
+        texto = record.getMessage()
+        if 'duracion_ms' in campos:
+            texto += f" ({campos['duracion_ms']} ms)"
+        if campos.get('id_peticion'):
+            texto = f"[{campos['id_peticion']}] {texto}"
+        return texto
+
+class _FiltroPeticion(logging.Filter):
+    """Añade el id de la petición actual (se lee antes de encolar, en el hilo que registra)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'id_peticion'):
+            record.id_peticion = _id_peticion.get()
+        return True
+
+def configurar_registro(formato: str = FORMATO, nivel: str = NIVEL) -> None:
+    """Envía los registros de 'jw' a una cola; un hilo los escribe en stdout (idempotente)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    salida = logging.StreamHandler(sys.stdout)
+    salida.setFormatter(FormatoJSON() if formato == 'json' else FormatoTexto())
+
+    cola = queue.SimpleQueue()
+    manejador = QueueHandler(cola)
+    manejador.addFilter(_FiltroPeticion())
+
+    log.addHandler(manejador)
+    log.setLevel(nivel)
+    log.propagate = False
+
+    _listener = QueueListener(cola, salida)
+    _listener.start()
+    atexit.register(_detener)
+
+def _detener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+def _reiniciar_tras_fork() -> None:
+    """En un proceso bifurcado (trabajador de gunicorn) el hilo escritor no existe: se crea otro."""
+    global _listener
+    if _listener is not None:
+        _listener = QueueListener(_listener.queue, *_listener.handlers)
+        _listener.start()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+@contextmanager
+def etapa(nombre: str, **campos) -> Iterator[dict]:
+    """
+    Registra la duración del bloque como etapa ``nombre``
+
+    El bloque puede añadir campos al diccionario que recibe; si lanza una
+    excepción, la etapa se registra con ok=False y la excepción sigue.
+    """
+    inicio = time.perf_counter()
+    ok = True
+    try:
+        yield campos
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        if log.isEnabledFor(logging.INFO):
+            log.info(nombre, extra={
+                'etapa': nombre, 'ok': ok,
+                'duracion_ms': round((time.perf_counter() - inicio) * 1000, 2), **campos
+            })
+
+# ==================== FLASK ====================
+
+def init_registro(app) -> None:
+    """Id por petición (o el de X-Request-ID) y una línea de registro al terminar cada una."""
+    from flask import g, request
+
+    configurar_registro()
+
+    @app.before_request
+    def _iniciar_peticion():
+        identificador = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex[:16]
+        g.token_peticion = _id_peticion.set(identificador)
+        g.inicio_peticion = time.perf_counter()
+
+    @app.after_request
+    def _registrar_peticion(respuesta):
+        inicio = g.pop('inicio_peticion', None)
+        if inicio is not None:
+            respuesta.headers['X-Request-ID'] = _id_peticion.get()
+            log.info('peticion', extra={
+                'metodo': request.method, 'ruta': request.path, 'estado': respuesta.status_code,
+                'duracion_ms': round((time.perf_counter() - inicio) * 1000, 2),
+            })
+        return respuesta
+
+    @app.teardown_request
+    def _terminar_peticion(_error=None):
+        token = g.pop('token_peticion', None)
+        if token is not None:
+            _id_peticion.reset(token)
@@ -0,0 +1,150 @@
+"""
+Resistencia - Prueba de memoria con miles de ciclos de extracción y plantilla
+Repite descarga (desde el archivo de respuestas, sin red), análisis,
+almacenamiento y generación de plantillas como lo haría el servidor
+durante días, midiendo la memoria residente (RSS) y, con tracemalloc,
+dónde se queda la memoria que crece.
+"""
+
+import gc
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from . import jw_scraper
+from .almacen import AlmacenSemanas, generar_id_semana
+from .archivo import ArchivoRespuestas
+from .template_generator import generar_plantilla_editable
+
+# ==================== CONFIGURACIÓN ====================
+CICLOS = 2000
+CALENTAMIENTO = 100         # Ciclos antes de tomar la referencia (cachés llenas, imports hechos)
+PRESUPUESTO_MB = 32.0       # Crecimiento máximo admitido tras el calentamiento
+MUESTRAS = 20               # Mediciones de RSS a lo largo de la prueba
+CONGREGACIONES = 25         # Nombres distintos con los que se generan las plantillas
+
+def rss_mb() -> float:
+    """Memoria residente actual del proceso en MB."""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        # Fuera de Linux: el máximo histórico es lo único disponible (KB en Linux, bytes en macOS)
+        import resource
+        import sys
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maximo / (1024 * 1024) if sys.platform == 'darwin' else maximo / 1024
+
+def _sitios(antes: tracemalloc.Snapshot, despues: tracemalloc.Snapshot, top: int) -> List[Dict]:
+    """Líneas que más memoria han sumado entre dos instantáneas."""
+    filtros = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ]
+    diferencias = despues.filter_traces(filtros).compare_to(antes.filter_traces(filtros), 'lineno')
+    return [
+        {
+            'sitio': f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+            'kb': round(d.size_diff / 1024, 1),
+            'bloques': d.count_diff,
+        }
+        for d in diferencias[:top] if d.size_diff > 0
+    ]
+
+def prueba_resistencia(ruta_archivo: str, ciclos: int = CICLOS, calentamiento: int = CALENTAMIENTO,
+                       presupuesto_mb: float = PRESUPUESTO_MB, trazar: bool = True, top: int = 10,
+                       al_muestrear: Optional[Callable[[int, float], None]] = None) -> Dict:
+    """
+    Ejecuta ``ciclos`` ciclos descarga → análisis → almacén → plantilla
+
+    Las semanas se toman del archivo de respuestas en rueda; las páginas
+    que no son semanas (índices) se descartan durante el calentamiento.
+    El análisis no usa el memo, para que cada ciclo cree su árbol HTML.
+
+    Returns:
+        Resumen con RSS inicial, estable y final, crecimiento, los
+        sitios que más memoria han sumado y ``superado`` si el
+        crecimiento pasa de ``presupuesto_mb``
+    """
+    archivo = ArchivoRespuestas(ruta_archivo)
+    urls = archivo.urls()
+    if not urls:
+        raise ValueError(f"{ruta_archivo} no tiene respuestas grabadas")
+
+    almacen = AlmacenSemanas()
+    descartadas = set()
+    total = calentamiento + ciclos
+    cada = max(1, ciclos // MUESTRAS)
+    muestras: List[float] = []
+    referencia = None
+    rss_inicial = 0.0
+
+    if trazar:
+        tracemalloc.start()
+    inicio = time.monotonic()
+    try:
+        for ciclo in range(total):
+            if ciclo == calentamiento:
+                urls = [u for u in urls if u not in descartadas]
+                if not urls:
+                    raise ValueError(f"{ruta_archivo} no contiene ninguna semana")
+                gc.collect()
+                rss_inicial = rss_mb()
+                if trazar:
+                    referencia = tracemalloc.take_snapshot()
+                inicio = time.monotonic()
+
+            url = urls[ciclo % len(urls)]
+            if url in descartadas:
+                continue
+            datos = jw_scraper.analizar_html(archivo.obtener(url), url)
+            if datos is None:
+                descartadas.add(url)
+                continue
+            jw_scraper._respaldo.guardar(('semana', url), datos)
+            almacen.guardar(generar_id_semana(datos['fecha'], datos.get('fecha_inicio')), datos, url)
+            generar_plantilla_editable(datos, f"Congregación {ciclo % CONGREGACIONES}", modo='cdn')
+
+            hechos = ciclo - calentamiento + 1
+            if hechos > 0 and hechos % cada == 0:
+                muestras.append(rss_mb())
+                if al_muestrear:
+                    al_muestrear(hechos, muestras[-1])
+
+        segundos = time.monotonic() - inicio
+        gc.collect()
+        rss_final = rss_mb()
+        sitios: List[Dict] = []
+        crecimiento_trazado = 0.0
+        if trazar:
+            final = tracemalloc.take_snapshot()
+            sitios = _sitios(referencia, final, top)
+            crecimiento_trazado = sum(
+                s.size_diff for s in final.compare_to(referencia, 'filename')
+            ) / (1024 * 1024)
+    finally:
+        if trazar:
+            tracemalloc.stop()
+        archivo.cerrar()
+
+    # RSS estable: mediana del último cuarto de las muestras
+    ultimas = muestras[-max(1, len(muestras) // 4):] or [rss_final]
+    rss_estable = statistics.median(ultimas)
+    crecimiento = max(rss_estable - rss_inicial, crecimiento_trazado)
+    return {
+        'ciclos': ciclos,
+        'semanas': len(urls),
+        'segundos': round(segundos, 2),
+        'ciclos_por_segundo': round(ciclos / segundos, 1) if segundos else None,
+        'rss_inicial_mb': round(rss_inicial, 1),
+        'rss_estable_mb': round(rss_estable, 1),
+        'rss_final_mb': round(rss_final, 1),
+        'crecimiento_rss_mb': round(rss_estable - rss_inicial, 2),
+        'crecimiento_trazado_mb': round(crecimiento_trazado, 2),
+        'presupuesto_mb': presupuesto_mb,
+        'superado': crecimiento > presupuesto_mb,
+        'sitios': sitios,
+    }
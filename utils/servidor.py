@@ -0,0 +1,132 @@
+"""
+Servidor - Modo de producción con gunicorn
+La aplicación, los patrones de idioma, las plantillas compiladas y la
+instantánea se preparan una sola vez en el proceso principal; los
+trabajadores los heredan al bifurcarse y atienden varias peticiones a la
+vez con hilos. Con SIGTERM cada trabajador termina lo que tiene en curso.
+
+Las semanas extraídas y el grabador de respuestas viven en la memoria de
+cada proceso, así que por defecto hay un solo trabajador con varios hilos:
+con más, una semana extraída en un proceso no existe en los demás.
+"""
+
+import os
+from datetime import date, timedelta
+from typing import Callable, Dict, Optional
+
+from .almacen import AlmacenSemanas
+from .archivo import BACKEND
+from .instantanea import PRESUPUESTO_CARGA, carga_inicial
+from .locales import LOCALES, obtener_paquete
+from .registro import etapa, log
+from .template_generator import (
+    MODO_POR_DEFECTO, TAMANO_CACHE_SEMANAS, compilable_por_adelantado, compilar_plantillas,
+    compilar_semana
+)
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # Sin gunicorn (o en Windows) solo queda el servidor de desarrollo
+    BaseApplication = object
+
+# ==================== CONFIGURACIÓN ====================
+HOST = os.environ.get('HOST', '0.0.0.0')
+PUERTO = int(os.environ.get('PORT', '5000'))
+TRABAJADORES = int(os.environ.get('JW_TRABAJADORES', '1'))         # Más de uno: cada proceso con sus semanas
+HILOS = int(os.environ.get('JW_HILOS', '8'))                        # Peticiones a la vez por trabajador
+TIMEOUT = int(os.environ.get('JW_TIMEOUT_TRABAJADOR', '120'))       # Sin responder tanto tiempo, se reinicia
+GRACIA = int(os.environ.get('JW_GRACIA', '30'))                     # Segundos para terminar al apagar
+
+def precargar(app, almacen: AlmacenSemanas) -> Dict:
+    """
+    Hace en el proceso principal lo que cada trabajador haría en su primera petición
+
+    Espera a la instantánea (hasta su presupuesto), compila los paquetes
+    de idioma, las plantillas base, la página principal y las semanas
+    de hoy en adelante.
+
+    Returns:
+        Resumen con lo precargado
+    """
+    with etapa('precarga') as campos:
+        carga_inicial.listo.wait(PRESUPUESTO_CARGA * 1.5)
+        for idioma in LOCALES:
+            obtener_paquete(idioma)
+        for minificar in (True, False):
+            compilar_plantillas(minificar)
+        app.jinja_env.get_template('index.html')
+
+        semanas = 0
+        # 'servido' depende de la URL de cada petición: no se puede compilar aquí
+        if compilable_por_adelantado(MODO_POR_DEFECTO):
+            for _, registro in almacen.iterar(desde=date.today() - timedelta(days=7)):
+                compilar_semana(registro['datos'], MODO_POR_DEFECTO)
+                semanas += 1
+                if semanas == TAMANO_CACHE_SEMANAS:
+                    break
+        campos.update(idiomas=len(LOCALES), semanas=semanas, almacen=len(almacen))
+    return campos
+
+class ServidorProduccion(BaseApplication):
+    """Aplicación gunicorn que sirve una app Flask ya creada (preload_app)."""
+
+    def __init__(self, app, opciones: Dict):
+        self.app = app
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self):
+        for clave, valor in self.opciones.items():
+            self.cfg.set(clave, valor)
+
+    def load(self):
+        return self.app
+
+def servir(app, almacen: AlmacenSemanas, host: str = HOST, puerto: int = PUERTO,
+           trabajadores: int = TRABAJADORES, hilos: int = HILOS,
+           al_bifurcar: Optional[Callable[[], None]] = None,
+           al_salir: Optional[Callable[[], None]] = None) -> None:
+    """
+    Precarga y arranca gunicorn (bloquea hasta que se detiene)
+
+    Args:
+        al_bifurcar: se ejecuta en cada trabajador recién creado (hilos de fondo)
+        al_salir: se ejecuta en cada trabajador al terminar
+
+    Raises:
+        RuntimeError: si gunicorn no está instalado, o si se graba con varios trabajadores
+    """
+    if BaseApplication is object:
+        raise RuntimeError('gunicorn no está instalado (pip install gunicorn); usa python main.py')
+    if BACKEND == 'grabar' and trabajadores > 1:
+        # Cada proceso añadiría sus registros al mismo archivo y escribiría su propio índice
+        raise RuntimeError('JW_BACKEND=grabar necesita un solo trabajador (--trabajadores 1)')
+    if trabajadores > 1:
+        log.warning('⚠️ Varios trabajadores: cada uno tiene sus propias semanas extraídas', extra={
+            'trabajadores': trabajadores
+        })
+
+    precarga = precargar(app, almacen)
+    log.info('🚀 Servidor de producción', extra={
+        'trabajadores': trabajadores, 'hilos': hilos, 'puerto': puerto, 'precarga': precarga
+    })
+
+    def post_fork(server, worker):
+        if al_bifurcar:
+            al_bifurcar()
+
+    def worker_exit(server, worker):
+        if al_salir:
+            al_salir()
+
+    ServidorProduccion(app, {
+        'bind': f'{host}:{puerto}',
+        'workers': trabajadores,
+        'threads': hilos,
+        'worker_class': 'gthread' if hilos > 1 else 'sync',
+        'preload_app': True,
+        'timeout': TIMEOUT,
+        'graceful_timeout': GRACIA,
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }).run()
@@ -3,236 +3,237 @@ Template Generator
 Genera plantillas HTML editables para programas de reunión
 """
 
-from typing import Dict, List
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from html import escape
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-def generar_plantilla_editable(datos: Dict, nombre_congregacion: str = "CONGREGACIÓN") -> str:
-    """
-    Genera HTML editable completo
-    
-    Args:
-        datos: Diccionario con datos extraídos de la semana
-        nombre_congregacion: Nombre de la congregación
-        
-    Returns:
-        String con HTML completo
-    """
-    
-    fecha = datos.get('fecha', 'Fecha no disponible')
-    lectura = datos.get('lectura_biblica', 'N/A')
-    cancion_inicial = datos.get('cancion_inicial', 'N/A')
-    cancion_intermedia = datos.get('cancion_intermedia', 'N/A')
-    cancion_final = datos.get('cancion_final', 'N/A')
-    
-    tesoros = datos.get('tesoros_biblia', [])
-    maestros = datos.get('seamos_maestros', [])
-    vida = datos.get('vida_cristiana', [])
-    
-    filename = fecha.lower().replace(' de ', '-').replace(' ', '-')
-    
-    html = f'''<!DOCTYPE html>
+from .congregaciones import HORA_INICIO_POR_DEFECTO, PerfilCongregacion
+from .proteccion import RespaldoLRU
+
+# ==================== CONFIGURACIÓN ====================
+# cdn: html2canvas desde cdnjs (formato original, sin minificar)
+# servido: html2canvas desde esta aplicación (/recursos/...), caché de larga duración
+# autonomo: html2canvas incrustado; la plantilla no hace ninguna petición externa
+MODOS = ('cdn', 'servido', 'autonomo')
+MODO_POR_DEFECTO = os.environ.get('JW_MODO_PLANTILLA', 'cdn')  # Los otros necesitan preparar-recursos
+
+VERSION_HTML2CANVAS = '1.4.1'
+URL_HTML2CANVAS_CDN = f"https://cdnjs.cloudflare.com/ajax/libs/html2canvas/{VERSION_HTML2CANVAS}/html2canvas.min.js"
+NOMBRE_HTML2CANVAS = f"html2canvas-{VERSION_HTML2CANVAS}.min.js"
+DIRECTORIO_RECURSOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'vendor')
+RUTA_HTML2CANVAS = os.path.join(DIRECTORIO_RECURSOS, NOMBRE_HTML2CANVAS)
+
+_CSS = '''
+@page { size: letter; margin: 0.5in; }
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: Arial, sans-serif;
+    background: #f5f5f5;
+    padding: 10px;
+    font-size: 11pt;
+    color: #000;
+}
+.container {
+    max-width: 8.5in;
+    margin: 0 auto;
+    background: white;
+    box-shadow: 0 0 10px rgba(0,0,0,0.1);
+    border-radius: 8px;
+    overflow: hidden;
+}
+.header {
+    background: linear-gradient(135deg, #0a3ab1, #1e58e7);
+    color: white;
+    text-align: center;
+    padding: 12px;
+}
+.header h1 { margin: 3px 0; font-size: 1.4em; }
+.header .subtitle { font-size: 0.95em; margin-top: 5px; }
+.info-section {
+    padding: 10px 15px;
+    background: #fafafa;
+    font-size: 10pt;
+}
+.info-row {
+    margin: 5px 0;
+    display: flex;
+    justify-content: flex-start;
+    align-items: center;
+    flex-wrap: wrap;
+    gap: 8px;
+}
+.info-label { 
+    font-weight: bold; 
+    min-width: 180px; 
+    text-align: left;
+}
+.name-field {
+    display: inline;
+    outline: none;
+    color: inherit;
+    font-family: inherit;
+    font-size: inherit;
+    padding: 0;
+    margin: 0;
+    background: transparent;
+    min-width: 30px;
+}
+.name-field:empty::before {
+    content: attr(data-placeholder);
+    color: #999;
+    font-style: italic;
+}
+.section-header {
+    color: white;
+    font-weight: bold;
+    padding: 8px 10px;
+    font-size: 11pt;
+}
+.section-header.tesoros { 
+    background: linear-gradient(135deg, #6c757d, #868e96); 
+}
+.section-header.maestros { background: linear-gradient(135deg, #b8860b, #daa520); }
+.section-header.vida { background: linear-gradient(135deg, #8b0000, #b22222); }
+
+.program-row {
+    display: grid;
+    grid-template-columns: 60px 1fr 120px 200px 200px;
+    font-size: 10pt;
+    min-height: 35px;
+    padding: 6px 0;
+}
+.program-row.no-rol {
+    grid-template-columns: 60px 1fr 120px 1fr;
+}
+.program-row div {
+    padding: 6px 8px;
+    display: flex;
+    align-items: center;
+    flex-wrap: wrap;
+    gap: 4px;
+}
+.program-row:not(.no-rol) div:nth-child(4),
+.program-row:not(.no-rol) div:nth-child(5) {
+    justify-content: center;
+    text-align: center;
+}
+.program-row.no-rol div:nth-child(4) {
+    justify-content: flex-end;
+    text-align: right;
+    padding-right: 12px;
+}
+.time {
+    text-align: center;
+    font-weight: bold;
+    background: #f9f9f9;
+    justify-content: center;
+}
+
+.print-buttons {
+    display: flex;
+    gap: 10px;
+    justify-content: center;
+    padding: 15px;
+    background: #f0f0f0;
+    border-top: 2px solid #ddd;
+}
+.btn-print {
+    padding: 10px 20px;
+    font-size: 11pt;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+    cursor: pointer;
+    transition: all 0.3s;
+    display: flex;
+    align-items: center;
+    gap: 8px;
+}
+.btn-pdf {
+    background: linear-gradient(135deg, #dc3545, #c82333);
+    color: white;
+}
+.btn-pdf:hover {
+    background: linear-gradient(135deg, #c82333, #bd2130);
+    transform: translateY(-2px);
+    box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+}
+.btn-image {
+    background: linear-gradient(135deg, #28a745, #218838);
+    color: white;
+}
+.btn-image:hover {
+    background: linear-gradient(135deg, #218838, #1e7e34);
+    transform: translateY(-2px);
+    box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+}
+
+@media print {
+    body { background: white; padding: 0; color: black; }
+    .container { 
+        box-shadow: none; 
+        border-radius: 0; 
+        max-width: 8.5in; 
+        width: 8.5in;
+    }
+    .name-field {
+        color: black;
+        background: transparent;
+    }
+    .name-field:empty::before { content: ""; }
+    .print-buttons { display: none; }
+}
+
+@media (max-width: 600px) {
+    .container {
+        max-width: 100%;
+        border-radius: 0;
+    }
+    body { padding: 8px; font-size: 9pt; }
+    .header h1 { font-size: 1.2em; }
+    .program-row,
+    .program-row.no-rol {
+        display: block;
+        padding: 8px 0;
+        border-bottom: 1px solid #eee;
+    }
+    .program-row div {
+        display: block;
+        padding: 4px 0;
+    }
+    .time {
+        background: #f0f0f0;
+        text-align: center;
+        font-weight: bold;
+        padding: 6px 0;
+        margin-bottom: 6px;
+        border-radius: 4px;
+    }
+}
+'''
+
+# Los {{ }} son llaves literales; los {campo} se rellenan al generar
+_DOCUMENTO = '''<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Programa de reunión - {fecha}</title>
-    <style>
-        @page {{ size: letter; margin: 0.5in; }}
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: Arial, sans-serif;
-            background: #f5f5f5;
-            padding: 10px;
-            font-size: 11pt;
-            color: #000;
-        }}
-        .container {{
-            max-width: 8.5in;
-            margin: 0 auto;
-            background: white;
-            box-shadow: 0 0 10px rgba(0,0,0,0.1);
-            border-radius: 8px;
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #0a3ab1, #1e58e7);
-            color: white;
-            text-align: center;
-            padding: 12px;
-        }}
-        .header h1 {{ margin: 3px 0; font-size: 1.4em; }}
-        .header .subtitle {{ font-size: 0.95em; margin-top: 5px; }}
-        .info-section {{
-            padding: 10px 15px;
-            background: #fafafa;
-            font-size: 10pt;
-        }}
-        .info-row {{
-            margin: 5px 0;
-            display: flex;
-            justify-content: flex-start;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 8px;
-        }}
-        .info-label {{ 
-            font-weight: bold; 
-            min-width: 180px; 
-            text-align: left;
-        }}
-        .name-field {{
-            display: inline;
-            outline: none;
-            color: inherit;
-            font-family: inherit;
-            font-size: inherit;
-            padding: 0;
-            margin: 0;
-            background: transparent;
-            min-width: 30px;
-        }}
-        .name-field:empty::before {{
-            content: attr(data-placeholder);
-            color: #999;
-            font-style: italic;
-        }}
-        .section-header {{
-            color: white;
-            font-weight: bold;
-            padding: 8px 10px;
-            font-size: 11pt;
-        }}
-        .section-header.tesoros {{ 
-            background: linear-gradient(135deg, #6c757d, #868e96); 
-        }}
-        .section-header.maestros {{ background: linear-gradient(135deg, #b8860b, #daa520); }}
-        .section-header.vida {{ background: linear-gradient(135deg, #8b0000, #b22222); }}
-        
-        .program-row {{
-            display: grid;
-            grid-template-columns: 60px 1fr 120px 200px 200px;
-            font-size: 10pt;
-            min-height: 35px;
-            padding: 6px 0;
-        }}
-        .program-row.no-rol {{
-            grid-template-columns: 60px 1fr 120px 1fr;
-        }}
-        .program-row div {{
-            padding: 6px 8px;
-            display: flex;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 4px;
-        }}
-        .program-row:not(.no-rol) div:nth-child(4),
-        .program-row:not(.no-rol) div:nth-child(5) {{
-            justify-content: center;
-            text-align: center;
-        }}
-        .program-row.no-rol div:nth-child(4) {{
-            justify-content: flex-end;
-            text-align: right;
-            padding-right: 12px;
-        }}
-        .time {{
-            text-align: center;
-            font-weight: bold;
-            background: #f9f9f9;
-            justify-content: center;
-        }}
-        
-        .print-buttons {{
-            display: flex;
-            gap: 10px;
-            justify-content: center;
-            padding: 15px;
-            background: #f0f0f0;
-            border-top: 2px solid #ddd;
-        }}
-        .btn-print {{
-            padding: 10px 20px;
-            font-size: 11pt;
-            font-weight: bold;
-            border: none;
-            border-radius: 5px;
-            cursor: pointer;
-            transition: all 0.3s;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        .btn-pdf {{
-            background: linear-gradient(135deg, #dc3545, #c82333);
-            color: white;
-        }}
-        .btn-pdf:hover {{
-            background: linear-gradient(135deg, #c82333, #bd2130);
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }}
-        .btn-image {{
-            background: linear-gradient(135deg, #28a745, #218838);
-            color: white;
-        }}
-        .btn-image:hover {{
-            background: linear-gradient(135deg, #218838, #1e7e34);
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }}
-        
-        @media print {{
-            body {{ background: white; padding: 0; color: black; }}
-            .container {{ 
-                box-shadow: none; 
-                border-radius: 0; 
-                max-width: 8.5in; 
-                width: 8.5in;
-            }}
-            .name-field {{
-                color: black;
-                background: transparent;
-            }}
-            .name-field:empty::before {{ content: ""; }}
-            .print-buttons {{ display: none; }}
-        }}
-        
-        @media (max-width: 600px) {{
-            .container {{
-                max-width: 100%;
-                border-radius: 0;
-            }}
-            body {{ padding: 8px; font-size: 9pt; }}
-            .header h1 {{ font-size: 1.2em; }}
-            .program-row,
-            .program-row.no-rol {{
-                display: block;
-                padding: 8px 0;
-                border-bottom: 1px solid #eee;
-            }}
-            .program-row div {{
-                display: block;
-                padding: 4px 0;
-            }}
-            .time {{
-                background: #f0f0f0;
-                text-align: center;
-                font-weight: bold;
-                padding: 6px 0;
-                margin-bottom: 6px;
-                border-radius: 4px;
-            }}
-        }}
-    </style>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+    <style>{css}</style>
+    {script_cabecera}
 </head>
 <body>
     <div class="container">
         <div class="header">
-            <div><strong>{nombre_congregacion.upper()}</strong></div>
+            <div><strong>{congregacion}</strong></div>
             <h1>Programa para la reunión de entre semana</h1>
             <div class="subtitle">{fecha} | Lectura: {lectura}</div>
         </div>
-        
+
         <div class="info-section">
             <div class="info-row">
                 <span class="info-label">Presidente:</span>
@@ -243,60 +244,45 @@ def generar_plantilla_editable(datos: Dict, nombre_congregacion: str = "CONGREGA
                 <span contenteditable="true" class="name-field" data-placeholder="Nombre"></span>
             </div>
         </div>
-        
+
         <div class="program-row no-rol">
-            <div class="time">19:00</div>
+            <div class="time">{hora_inicial}</div>
             <div>• Canción {cancion_inicial}</div>
             <div></div>
             <div>Oración: <span contenteditable="true" class="name-field" data-placeholder="Nombre"></span></div>
         </div>
         <div class="program-row no-rol">
-            <div class="time">19:05</div>
+            <div class="time">{hora_introduccion}</div>
             <div>• Palabras de introducción (1 min.)</div>
             <div></div>
             <div></div>
         </div>
-        
+
         <div class="section-header tesoros">TESOROS DE LA BIBLIA</div>
-'''
-    
-    for parte in tesoros:
-        html += generar_fila_parte(parte)
-    
-    html += '''
+{filas_tesoros}
         <div class="section-header maestros">SEAMOS MEJORES MAESTROS</div>
-'''
-    
-    for parte in maestros:
-        html += generar_fila_parte(parte)
-    
-    html += f'''
+{filas_maestros}
         <div class="section-header vida">NUESTRA VIDA CRISTIANA</div>
         <div class="program-row no-rol">
-            <div class="time">{calcular_hora_cancion_intermedia(tesoros, maestros)}</div>
+            <div class="time">{hora_intermedia}</div>
             <div>• Canción {cancion_intermedia}</div>
             <div></div>
             <div></div>
         </div>
-'''
-    
-    for parte in vida:
-        html += generar_fila_parte(parte)
-    
-    html += f'''
+{filas_vida}
         <div class="program-row no-rol">
-            <div class="time">{calcular_hora_final(tesoros, maestros, vida)}</div>
+            <div class="time">{hora_conclusion}</div>
             <div>• Palabras de conclusión (3 mins.)</div>
             <div></div>
             <div></div>
         </div>
         <div class="program-row no-rol">
-            <div class="time">{calcular_hora_final(tesoros, maestros, vida, extra=3)}</div>
+            <div class="time">{hora_final}</div>
             <div>• Canción {cancion_final}</div>
             <div></div>
             <div>Oración: <span contenteditable="true" class="name-field" data-placeholder="Nombre"></span></div>
         </div>
-        
+
         <div class="print-buttons">
             <button class="btn-print btn-pdf" onclick="imprimirPDF()">
                 <span>📄</span> Imprimir como PDF
@@ -306,18 +292,18 @@ def generar_plantilla_editable(datos: Dict, nombre_congregacion: str = "CONGREGA
             </button>
         </div>
     </div>
-    
+    {script_cuerpo}
     <script>
         function imprimirPDF() {{
             window.print();
         }}
-        
+
         async function guardarImagen() {{
             const container = document.querySelector('.container');
             const buttons = document.querySelector('.print-buttons');
-            
+
             buttons.style.display = 'none';
-            
+
             try {{
                 const canvas = await html2canvas(container, {{
                     scale: 2,
@@ -325,7 +311,7 @@ def generar_plantilla_editable(datos: Dict, nombre_congregacion: str = "CONGREGA
                     logging: false,
                     useCORS: true
                 }});
-                
+
                 const link = document.createElement('a');
                 link.download = 'programa-reunion-{filename}.png';
                 link.href = canvas.toDataURL('image/png');
@@ -340,19 +326,8 @@ def generar_plantilla_editable(datos: Dict, nombre_congregacion: str = "CONGREGA
     </script>
 </body>
 </html>'''
-    
-    return html
 
-def generar_fila_parte(parte: Dict) -> str:
-    """Genera una fila HTML para una parte del programa"""
-    hora = parte.get('hora', '00:00')
-    titulo = parte.get('titulo', 'Sin título')
-    duracion = parte.get('duracion', '0')
-    rol = parte.get('rol')
-    numero = parte.get('numero', '')
-    
-    if rol:
-        return f'''
+_FILA_CON_ROL = '''
         <div class="program-row">
             <div class="time">{hora}</div>
             <div>{numero}. {titulo} ({duracion} mins.)</div>
@@ -361,8 +336,8 @@ def generar_fila_parte(parte: Dict) -> str:
             <div><span contenteditable="true" class="name-field" data-placeholder="Nombre"></span></div>
         </div>
 '''
-    else:
-        return f'''
+
+_FILA_SIN_ROL = '''
         <div class="program-row">
             <div class="time">{hora}</div>
             <div>{numero}. {titulo} ({duracion} mins.)</div>
@@ -372,32 +347,318 @@ def generar_fila_parte(parte: Dict) -> str:
         </div>
 '''
 
-def calcular_hora_cancion_intermedia(tesoros: List, maestros: List) -> str:
-    """Calcula hora de canción intermedia"""
-    minutos = 19 * 60 + 6
-    
-    for parte in tesoros:
-        minutos += int(parte.get('duracion', 0))
-    for parte in maestros:
-        minutos += int(parte.get('duracion', 0))
-    
-    h = minutos // 60
-    m = minutos % 60
-    return f"{h:02d}:{m:02d}"
-
-def calcular_hora_final(tesoros: List, maestros: List, vida: List, extra: int = 0) -> str:
-    """Calcula hora final"""
-    minutos = 19 * 60 + 6
-    
-    for parte in tesoros:
-        minutos += int(parte.get('duracion', 0))
-    for parte in maestros:
-        minutos += int(parte.get('duracion', 0))
+# ==================== MINIFICACIÓN ====================
+
+_COMENTARIOS_CSS = re.compile(r'/\*.*?\*/', re.S)
+_ESPACIOS_CSS = re.compile(r'\s*([{}:;,>])\s*')
+_ESPACIOS = re.compile(r'\s+')
+# Solo el espacio de sangría (con salto de línea) entre etiquetas: el texto no se toca
+_SANGRIA_HTML = re.compile(r'>\s*\n\s*<')
+_SANGRIA_JS = re.compile(r'\n\s*')
+
+def minificar_css(css: str) -> str:
+    css = _COMENTARIOS_CSS.sub('', css)
+    css = _ESPACIOS.sub(' ', css)
+    css = _ESPACIOS_CSS.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+def minificar_html(html: str) -> str:
+    """Quita la sangría entre etiquetas y en los scripts (conserva los saltos de línea del JS)."""
+    html = _SANGRIA_HTML.sub('><', html)
+    return _SANGRIA_JS.sub('\n', html).strip()
+
+@lru_cache(maxsize=None)
+def compilar_plantillas(minificar: bool) -> Tuple[str, str, str, str]:
+    """
+    Prepara una sola vez (por proceso) el documento, las filas y el CSS
+
+    Returns:
+        (documento, fila_con_rol, fila_sin_rol, css)
+    """
+    if not minificar:
+        return _DOCUMENTO, _FILA_CON_ROL, _FILA_SIN_ROL, _CSS
+    return (
+        minificar_html(_DOCUMENTO),
+        minificar_html(_FILA_CON_ROL),
+        minificar_html(_FILA_SIN_ROL),
+        minificar_css(_CSS),
+    )
+
+class RecursoFaltanteError(RuntimeError):
+    """El modo pide la copia local de html2canvas y no está en static/vendor."""
+
+    def __init__(self, modo: str):
+        super().__init__(
+            f"El modo '{modo}' necesita {NOMBRE_HTML2CANVAS} en static/vendor: "
+            f"ejecuta python cli.py preparar-recursos (o usa modo=cdn)"
+        )
+        self.modo = modo
+
+_html2canvas: Optional[str] = None
+
+def recursos_disponibles() -> bool:
+    return os.path.isfile(RUTA_HTML2CANVAS)
+
+def compilable_por_adelantado(modo: str) -> bool:
+    """
+    Si una semana se puede compilar en este modo fuera de una petición
+
+    'servido' depende de la URL base de la petición (no coincidiría con la
+    que usan las rutas) y 'autonomo' necesita la copia local de html2canvas.
+    """
+    return modo == 'cdn' or (modo == 'autonomo' and recursos_disponibles())
+
+def _html2canvas_local(modo: str = 'autonomo') -> str:
+    """
+    Contenido de html2canvas guardado en static/vendor
+
+    Solo se recuerda cuando existe: tras ``preparar-recursos`` se usa sin reiniciar.
+
+    Raises:
+        RecursoFaltanteError: si no está (nunca se cae al CDN en silencio)
+    """
+    global _html2canvas
+    if _html2canvas is None:
+        try:
+            with open(RUTA_HTML2CANVAS, encoding='utf-8') as f:
+                # Que el código incrustado no pueda cerrar la etiqueta <script>
+                _html2canvas = f.read().replace('</script', '<\\/script')
+        except FileNotFoundError:
+            raise RecursoFaltanteError(modo) from None
+    return _html2canvas
+
+def _scripts_html2canvas(modo: str, url_recursos: str) -> Tuple[str, str]:
+    """Etiquetas <script> de html2canvas para la cabecera y el final del cuerpo."""
+    if modo == 'servido':
+        if not recursos_disponibles():
+            raise RecursoFaltanteError(modo)
+        return '', f'<script src="{url_recursos}/recursos/{NOMBRE_HTML2CANVAS}" defer></script>'
+    if modo == 'autonomo':
+        return '', f'<script>{_html2canvas_local(modo)}</script>'
+    return f'<script src="{URL_HTML2CANVAS_CDN}"></script>', ''
+
+def preparar_recursos() -> str:
+    """
+    Descarga html2canvas una vez a static/vendor (con su variante comprimida)
+    para que las plantillas autónomas no dependan del CDN.
+
+    Returns:
+        Ruta del archivo guardado
+    """
+    global _html2canvas
+    import requests
+    from .compresion import guardar_precomprimido
+
+    respuesta = requests.get(URL_HTML2CANVAS_CDN, timeout=30)
+    respuesta.raise_for_status()
+    if b'html2canvas' not in respuesta.content:
+        raise ValueError('La descarga no parece ser html2canvas')
+
+    os.makedirs(DIRECTORIO_RECURSOS, exist_ok=True)
+    guardar_precomprimido(RUTA_HTML2CANVAS, respuesta.content)
+    _html2canvas = None
+    return RUTA_HTML2CANVAS
+
+# ==================== HORARIO ====================
+
+# Minutos de cada momento fijo de la reunión
+DURACION_CANCION_Y_ORACION = 5
+DURACION_INTRODUCCION = 1
+DURACION_CANCION_INTERMEDIA = 5
+DURACION_CONCLUSION = 3
+
+def calcular_horario(tesoros: List[Dict], maestros: List[Dict], vida: List[Dict]) -> List[int]:
+    """
+    Minutos desde el inicio de cada fila del programa, en una sola pasada
+
+    Returns:
+        Desplazamientos en el orden del documento: canción inicial,
+        introducción, partes de tesoros y maestros, canción intermedia,
+        partes de vida cristiana, conclusión y canción final
+    """
+    minutos = 0
+    horario = []
+
+    def avanzar(duracion) -> None:
+        nonlocal minutos
+        horario.append(minutos)
+        minutos += int(duracion or 0)
+
+    avanzar(DURACION_CANCION_Y_ORACION)
+    avanzar(DURACION_INTRODUCCION)
+    for parte in tesoros + maestros:
+        avanzar(parte.get('duracion', 0))
+    avanzar(DURACION_CANCION_INTERMEDIA)
     for parte in vida:
-        minutos += int(parte.get('duracion', 0))
-    
-    minutos += extra
-    
-    h = minutos // 60
-    m = minutos % 60
-    return f"{h:02d}:{m:02d}"
+        avanzar(parte.get('duracion', 0))
+    avanzar(DURACION_CONCLUSION)
+    avanzar(0)
+    return horario
+
+def minutos_de_hora(hora: str) -> int:
+    h, m = map(int, hora.split(':'))
+    return h * 60 + m
+
+def formato_hora(minutos: int) -> str:
+    minutos %= 24 * 60
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+# ==================== GENERACIÓN ====================
+
+# Marcas que separan lo común a la semana de lo propio de cada congregación
+_MARCA = '\x00'
+_HUECO = re.compile(f'{_MARCA}([^{_MARCA}]*){_MARCA}')
+_HUECO_CONGREGACION = 'c'
+_INICIO_SECCION = 'class="section-header'
+TAMANO_CACHE_SEMANAS = 64
+
+class PlantillaSemana:
+    """
+    Documento de una semana ya generado salvo la congregación y las horas
+
+    ``piezas`` es el HTML fijo y entre cada par de piezas hay un hueco:
+    el nombre de la congregación (None) o una hora (minutos desde el inicio).
+    """
+
+    def __init__(self, piezas: List[str], huecos: List[Optional[int]]):
+        self.piezas = piezas
+        self.huecos = huecos
+        # Piezas con las que empieza un trozo del flujo: cada sección arranca uno nuevo
+        self._cortes = {i for i, pieza in enumerate(piezas) if i and _INICIO_SECCION in pieza}
+
+    def renderizar(self, nombre_congregacion: str, hora_inicio: str = HORA_INICIO_POR_DEFECTO) -> str:
+        return ''.join(self.renderizar_por_partes(nombre_congregacion, hora_inicio))
+
+    def renderizar_por_partes(self, nombre_congregacion: str,
+                              hora_inicio: str = HORA_INICIO_POR_DEFECTO) -> Iterator[str]:
+        """
+        El documento en trozos: primero la cabecera con el CSS (sin esperar
+        a nada más) y después una sección con sus filas en cada trozo
+        """
+        nombre = escape(nombre_congregacion.upper())
+        inicio = minutos_de_hora(hora_inicio)
+        yield self.piezas[0]
+        partes = []
+        for i, (hueco, pieza) in enumerate(zip(self.huecos, self.piezas[1:]), start=1):
+            if i in self._cortes and partes:
+                yield ''.join(partes)
+                partes = []
+            partes.append(nombre if hueco is None else formato_hora(inicio + hueco))
+            partes.append(pieza)
+        if partes:
+            yield ''.join(partes)
+
+_cache_semanas = RespaldoLRU(TAMANO_CACHE_SEMANAS)
+
+def _huella(datos: Dict) -> str:
+    texto = json.dumps(datos, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+def compilar_semana(datos: Dict, modo: str = MODO_POR_DEFECTO, url_recursos: str = '') -> PlantillaSemana:
+    """
+    Genera una vez por semana (y modo) todo lo que no depende de la congregación
+
+    Partes, títulos, canciones, CSS y scripts quedan en las piezas fijas;
+    el resultado se guarda en una caché LRU por contenido de la semana.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de plantilla desconocido: {modo}")
+
+    # url_recursos solo cambia el documento en modo 'servido'
+    clave = (_huella(datos), modo, url_recursos if modo == 'servido' else '')
+    plantilla = _cache_semanas.obtener(clave)
+    if plantilla is not None:
+        return plantilla
+
+    documento, _, _, css = compilar_plantillas(modo != 'cdn')
+    script_cabecera, script_cuerpo = _scripts_html2canvas(modo, url_recursos)
+
+    fecha = datos.get('fecha', 'Fecha no disponible')
+    tesoros = datos.get('tesoros_biblia', [])
+    maestros = datos.get('seamos_maestros', [])
+    vida = datos.get('vida_cristiana', [])
+    canciones = datos.get('canciones') or {}
+
+    horario = calcular_horario(tesoros, maestros, vida)
+    marcas = [f'{_MARCA}{i}{_MARCA}' for i in range(len(horario))]
+    hora_tesoros = 2
+    hora_vida = hora_tesoros + len(tesoros) + len(maestros) + 1
+
+    def filas(partes: List[Dict], primera: int) -> str:
+        return ''.join(
+            generar_fila_parte(parte, modo, hora=marcas[primera + i]) for i, parte in enumerate(partes)
+        )
+
+    html = documento.format(
+        css=css,
+        script_cabecera=script_cabecera,
+        script_cuerpo=script_cuerpo,
+        congregacion=f'{_MARCA}{_HUECO_CONGREGACION}{_MARCA}',
+        fecha=fecha,
+        lectura=datos.get('lectura_biblica', 'N/A'),
+        # Formato anterior (cancion_*) por compatibilidad con datos guardados
+        cancion_inicial=canciones.get('inicial') or datos.get('cancion_inicial', 'N/A'),
+        cancion_intermedia=canciones.get('intermedia') or datos.get('cancion_intermedia', 'N/A'),
+        cancion_final=canciones.get('final') or datos.get('cancion_final', 'N/A'),
+        hora_inicial=marcas[0],
+        hora_introduccion=marcas[1],
+        filas_tesoros=filas(tesoros, hora_tesoros),
+        filas_maestros=filas(maestros, hora_tesoros + len(tesoros)),
+        hora_intermedia=marcas[hora_vida - 1],
+        filas_vida=filas(vida, hora_vida),
+        hora_conclusion=marcas[-2],
+        hora_final=marcas[-1],
+        filename=fecha.lower().replace(' de ', '-').replace(' ', '-'),
+    )
+
+    trozos = _HUECO.split(html)
+    plantilla = PlantillaSemana(
+        piezas=trozos[0::2],
+        huecos=[None if h == _HUECO_CONGREGACION else horario[int(h)] for h in trozos[1::2]],
+    )
+    _cache_semanas.guardar(clave, plantilla)
+    return plantilla
+
+def generar_plantilla_editable(datos: Dict, nombre_congregacion: str = "CONGREGACIÓN",
+                               modo: str = MODO_POR_DEFECTO, url_recursos: str = '',
+                               hora_inicio: str = HORA_INICIO_POR_DEFECTO) -> str:
+    """
+    Genera HTML editable completo
+
+    Args:
+        datos: Diccionario con datos extraídos de la semana
+        nombre_congregacion: Nombre de la congregación
+        modo: 'cdn', 'servido' o 'autonomo' (ver MODOS)
+        url_recursos: Origen de la aplicación, para el modo 'servido'
+        hora_inicio: Hora de inicio de la reunión ('HH:MM')
+
+    Returns:
+        String con HTML completo
+    """
+    return compilar_semana(datos, modo, url_recursos).renderizar(nombre_congregacion, hora_inicio)
+
+def generar_plantilla_por_partes(datos: Dict, nombre_congregacion: str = "CONGREGACIÓN",
+                                 modo: str = MODO_POR_DEFECTO, url_recursos: str = '',
+                                 hora_inicio: str = HORA_INICIO_POR_DEFECTO) -> Iterator[str]:
+    """Como generar_plantilla_editable, pero en trozos para enviarla en flujo."""
+    return compilar_semana(datos, modo, url_recursos).renderizar_por_partes(nombre_congregacion, hora_inicio)
+
+def generar_lote(datos: Dict, perfiles: Iterable[PerfilCongregacion], modo: str = MODO_POR_DEFECTO,
+                 url_recursos: str = '') -> Iterator[Tuple[PerfilCongregacion, str]]:
+    """Una plantilla por perfil; la semana se compila una sola vez para todas."""
+    plantilla = compilar_semana(datos, modo, url_recursos)
+    for perfil in perfiles:
+        yield perfil, plantilla.renderizar(perfil.nombre, perfil.hora_inicio)
+
+def generar_fila_parte(parte: Dict, modo: str = 'cdn', hora: Optional[str] = None) -> str:
+    """Genera una fila HTML para una parte del programa"""
+    _, fila_con_rol, fila_sin_rol, _ = compilar_plantillas(modo != 'cdn')
+    rol = parte.get('rol')
+
+    return (fila_con_rol if rol else fila_sin_rol).format(
+        hora=hora or parte.get('hora', '00:00'),
+        titulo=parte.get('titulo', 'Sin título'),
+        duracion=parte.get('duracion', '0'),
+        rol=rol,
+        numero=parte.get('numero', ''),
+    )
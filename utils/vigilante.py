@@ -0,0 +1,174 @@
+"""
+Vigilante - Extracción anticipada de los cuadernos recién publicados
+Un hilo revisa cada cierto tiempo (con variación aleatoria) los índices
+configurados con peticiones condicionales; cuando aparecen semanas nuevas
+las extrae, las guarda y deja su plantilla compilada, para que el primer
+usuario no pague la extracción en frío. Con varios procesos (gunicorn),
+un archivo de bloqueo garantiza que solo uno vigila.
+"""
+
+import json
+import os
+import random
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from . import jw_scraper
+from .almacen import AlmacenSemanas, generar_id_semana
+from .compresion import escribir_atomico
+from .registro import etapa, log
+from .template_generator import MODO_POR_DEFECTO, compilable_por_adelantado, compilar_semana
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# ==================== CONFIGURACIÓN ====================
+URLS_VIGILADAS = [u.strip() for u in os.environ.get('JW_VIGILAR', '').split(',') if u.strip()]
+INTERVALO = float(os.environ.get('JW_VIGILAR_INTERVALO', '3600'))   # Segundos entre revisiones
+VARIACION = float(os.environ.get('JW_VIGILAR_VARIACION', '0.2'))    # ±20 % para no sincronizarse
+RUTA_ESTADO = os.environ.get('JW_VIGILAR_ESTADO', os.path.join('cache', 'vigilante.json'))
+PRIMERA_REVISION = 30                                               # Segundos máximos tras arrancar
+
+class Vigilante:
+    """Revisa los índices periódicamente; solo actúa el proceso que tiene el bloqueo."""
+
+    def __init__(self, urls: List[str], intervalo: float = INTERVALO, variacion: float = VARIACION,
+                 ruta_estado: str = RUTA_ESTADO):
+        self.urls = urls
+        self.intervalo = intervalo
+        self.variacion = variacion
+        self.ruta_estado = ruta_estado
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._bloqueo = None
+        # Por URL de índice: validadores (ETag/Last-Modified) y sus semanas
+        self._validadores: Dict[str, Dict[str, str]] = {}
+        self._enlaces: Dict[str, List[str]] = {}
+        self.resumen: Dict = {'activo': False, 'lider': False, 'urls': urls}
+
+    # ---------- Estado en disco ----------
+
+    def _cargar_estado(self) -> None:
+        try:
+            with open(self.ruta_estado, encoding='utf-8') as f:
+                estado = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._enlaces = estado.get('enlaces', {})
+        # Sin la lista de semanas de un índice, un 304 no diría nada: se vuelve a pedir entero
+        self._validadores = {
+            url: validadores for url, validadores in estado.get('validadores', {}).items()
+            if url in self._enlaces
+        }
+
+    def _guardar_estado(self) -> None:
+        directorio = os.path.dirname(self.ruta_estado)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        contenido = json.dumps({
+            'validadores': self._validadores,
+            'enlaces': self._enlaces,
+        }, ensure_ascii=False)
+        escribir_atomico(self.ruta_estado, contenido.encode('utf-8'))
+
+    def _tomar_bloqueo(self) -> bool:
+        """True si este proceso es (o pasa a ser) el único vigilante."""
+        if self._bloqueo is not None or fcntl is None:
+            return True
+        directorio = os.path.dirname(self.ruta_estado)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        archivo = open(self.ruta_estado + '.lock', 'a')
+        try:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            archivo.close()
+            return False
+        # El bloqueo dura lo que el archivo abierto: se libera solo si el proceso muere
+        self._bloqueo = archivo
+        return True
+
+    # ---------- Revisión ----------
+
+    def revisar(self, almacen: AlmacenSemanas) -> List[str]:
+        """
+        Una pasada por todos los índices
+
+        Returns:
+            IDs de las semanas nuevas extraídas
+        """
+        nuevas = []
+        # Conocida es la semana que está en el almacén: tras reiniciar (almacén vacío
+        # o solo con la instantánea) se vuelve a extraer lo que falte
+        en_almacen = {registro.get('url') for _, registro in almacen.items()}
+        for url_indice in self.urls:
+            try:
+                enlaces, validadores = jw_scraper.refrescar_enlaces_semanas(
+                    url_indice, self._validadores.get(url_indice)
+                )
+            except Exception as e:
+                log.warning('👀 No se pudo revisar el índice: %s', e, extra={'url': url_indice})
+                continue
+            self._validadores[url_indice] = validadores
+            if enlaces is not None:
+                self._enlaces[url_indice] = [enlace['url'] for enlace in enlaces]
+            # Con un 304 se recorren las semanas ya conocidas del índice: las que
+            # fallaron (p. ej. con el circuito abierto) se reintentan
+            for url in self._enlaces.get(url_indice, []):
+                if url in en_almacen:
+                    continue
+                try:
+                    datos = jw_scraper.extraer_datos_semana(url)
+                except Exception as e:
+                    log.warning('👀 No se pudo extraer: %s', e, extra={'url': url})
+                    continue
+                if not datos:
+                    continue
+                semana_id = generar_id_semana(datos['fecha'], datos.get('fecha_inicio'))
+                almacen.guardar(semana_id, datos, url)
+                if compilable_por_adelantado(MODO_POR_DEFECTO):
+                    with etapa('plantilla', fecha=datos['fecha'], modo=MODO_POR_DEFECTO, anticipada=True):
+                        compilar_semana(datos, MODO_POR_DEFECTO)
+                en_almacen.add(url)
+                nuevas.append(semana_id)
+
+        self._guardar_estado()
+        self.resumen.update(
+            ultima_revision=datetime.now().isoformat(timespec='seconds'),
+            nuevas=len(nuevas)
+        )
+        if nuevas:
+            log.info('👀 Semanas nuevas extraídas por adelantado', extra={'semanas': nuevas})
+        return nuevas
+
+    def _espera(self) -> float:
+        return self.intervalo * random.uniform(1 - self.variacion, 1 + self.variacion)
+
+    def _bucle(self, almacen: AlmacenSemanas) -> None:
+        self._parar.wait(random.uniform(0, min(PRIMERA_REVISION, self.intervalo)))
+        while not self._parar.is_set():
+            if self._tomar_bloqueo():
+                if not self.resumen['lider']:
+                    self.resumen['lider'] = True
+                    self._cargar_estado()
+                try:
+                    self.revisar(almacen)
+                except Exception as e:
+                    log.exception('👀 Error en la revisión: %s', e)
+            self._parar.wait(self._espera())
+
+    def iniciar(self, almacen: AlmacenSemanas) -> None:
+        """Arranca el hilo (sin URLs configuradas no hace nada)."""
+        if not self.urls or self._hilo is not None:
+            return
+        self.resumen['activo'] = True
+        self._hilo = threading.Thread(target=self._bucle, args=(almacen,), name='vigilante', daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._parar.set()
+
+vigilante = Vigilante(URLS_VIGILADAS)
@@ -0,0 +1,87 @@
+"""
+Vuelo único - Agrupa llamadas idénticas que ocurren al mismo tiempo
+Si varios hilos piden la misma clave mientras hay una llamada en curso,
+esperan a esa llamada y reciben su resultado (o su excepción).
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class _Vuelo:
+    """Llamada en curso compartida por todos los que piden la misma clave."""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado: Any = None
+        self.error: Optional[BaseException] = None
+
+class VueloUnico:
+    """
+    Coalescencia de peticiones en el proceso
+
+    Solo el primer hilo (el líder) ejecuta la función; los demás esperan
+    hasta ``timeout`` segundos y reciben una copia del mismo resultado,
+    para que nadie modifique los datos de otro. Si el líder falla, todos
+    reciben la misma excepción, salvo las que ``reintentar_si`` acepte:
+    con esas el seguidor vuelve a intentarlo por su cuenta.
+    """
+
+    def __init__(self, copiar: Callable[[Any], Any] = copy.deepcopy):
+        self._lock = threading.Lock()
+        self._vuelos: Dict[Hashable, _Vuelo] = {}
+        self._copiar = copiar
+
+    def ejecutar(self, clave: Hashable, funcion: Callable, *args,
+                 timeout: Optional[float] = None,
+                 reintentar_si: Optional[Callable[[BaseException], bool]] = None, **kwargs) -> Any:
+        """
+        Ejecuta la función una sola vez por clave entre los hilos concurrentes
+
+        Args:
+            reintentar_si: se evalúa en el seguidor con el error del líder; si
+                devuelve True, el error no era suyo (p. ej. el plazo de otra
+                petición) y el seguidor vuelve a ejecutar o a seguir otro vuelo
+
+        Raises:
+            TimeoutError: si un seguidor espera más de ``timeout`` segundos
+        """
+        while True:
+            vuelo, lider = self._unirse(clave)
+            if lider:
+                return self._liderar(clave, vuelo, funcion, args, kwargs)
+
+            if not vuelo.evento.wait(timeout):
+                raise TimeoutError(f"Tiempo de espera agotado para {clave!r}")
+            if vuelo.error:
+                if reintentar_si is not None and reintentar_si(vuelo.error):
+                    continue
+                raise vuelo.error
+            return self._copiar(vuelo.resultado)
+
+    def _unirse(self, clave: Hashable) -> Tuple[_Vuelo, bool]:
+        """(vuelo, True si este hilo es el líder)."""
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+        return vuelo, lider
+
+    def _liderar(self, clave: Hashable, vuelo: _Vuelo, funcion: Callable, args, kwargs) -> Any:
+        try:
+            vuelo.resultado = funcion(*args, **kwargs)
+        except BaseException as e:
+            vuelo.error = e
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+            vuelo.evento.set()
+        if vuelo.error:
+            raise vuelo.error
+        return vuelo.resultado
+
+    def en_curso(self) -> int:
+        """Número de claves con una llamada en curso."""
+        with self._lock:
+            return len(self._vuelos)